@@ -0,0 +1,150 @@
+"""
+Launcher for the API
+
+    python -m app --host 0.0.0.0 --port 8000 --workers 4
+
+Imports the app and warms every calculator route once in the parent, then
+binds the socket and forks the workers. Workers inherit the preloaded,
+warmed process (copy-on-write), so none of them takes traffic cold, and a
+worker that dies is replaced. Workers publish their metrics to a shared
+directory, so /metrics on whichever worker takes the scrape covers them all.
+Startup timings are printed and reported by /health. Where fork isn't
+available (Windows) a single process is served.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+START = time.perf_counter()
+
+
+def notify_systemd(message: str) -> None:
+    """sd_notify for Type=notify units; a no-op outside systemd"""
+    address = os.getenv("NOTIFY_SOCKET")
+    if not address:
+        return
+    if address.startswith("@"):
+        address = "\0" + address[1:]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.connect(address)
+        sock.sendall(message.encode())
+
+
+def serve_forked(config, workers: int) -> None:
+    """Bind once, fork `workers` uvicorn servers on the shared socket and supervise them"""
+    import uvicorn
+    from app.config import METRICS_SHARED_DIR
+    from app.metrics import registry
+
+    metrics_dir = METRICS_SHARED_DIR or tempfile.mkdtemp(prefix="calculator-metrics-")
+    registry.share_across_workers(metrics_dir)
+    for name in os.listdir(metrics_dir):
+        # Snapshots left by an earlier run
+        if name.endswith(".json"):
+            os.remove(os.path.join(metrics_dir, name))
+
+    sock = config.bind_socket()
+    children = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                uvicorn.Server(config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    print(f"Started {workers} workers on {config.host}:{config.port}", flush=True)
+    notify_systemd("READY=1")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {status}; restarting", flush=True)
+        if time.monotonic() - started < 1:
+            # Crashing on startup; don't spin
+            time.sleep(1)
+        spawn()
+    sock.close()
+    if not METRICS_SHARED_DIR:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    from app.config import WEB_WORKERS, WARMUP_ON_STARTUP
+
+    parser = argparse.ArgumentParser(prog="python -m app", description="Financial Calculators API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS, help="Worker processes (default: WEB_WORKERS)")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", default=WARMUP_ON_STARTUP,
+                        help="Skip the warmup pass")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    from app.main import app
+    from app.warmup import warmup, startup_report
+    from app.services.executor import shutdown_executor
+    from app.services.monte_carlo import shutdown_pool
+
+    startup_report["import_seconds"] = time.perf_counter() - START
+    if args.warmup:
+        startup_report.update(asyncio.run(warmup(app)))
+        # Pools started by offloaded warmup requests belong to the parent;
+        # workers start their own (forked children also drop inherited ones)
+        shutdown_executor()
+        shutdown_pool()
+    else:
+        # Recorded so the app's startup hook doesn't warm up either
+        startup_report.update(warmup_requests=0, warmup_failures=0, warmup_seconds=0.0)
+    startup_report["startup_seconds"] = time.perf_counter() - START
+    print(
+        f"Startup: import {startup_report['import_seconds']:.2f}s, "
+        f"warmup {startup_report['warmup_seconds']:.2f}s ({startup_report['warmup_requests']} requests), "
+        f"total {startup_report['startup_seconds']:.2f}s",
+        flush=True
+    )
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level=args.log_level, proxy_headers=True)
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        notify_systemd("READY=1")
+        uvicorn.Server(config).run()
+    else:
+        serve_forked(config, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
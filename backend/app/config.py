@@ -0,0 +1,70 @@
+"""
+Runtime configuration
+Tunables read from environment variables
+"""
+import os
+
+# Maximum number of inputs accepted by a single /batch request
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# Maximum number of goals in a household plan
+MAX_PLAN_GOALS = int(os.getenv("MAX_PLAN_GOALS", "50"))
+
+# Irregular cash flows: most flows per calculation (JSON body or upload), and
+# the largest upload body accepted, in bytes
+MAX_CASH_FLOWS = int(os.getenv("MAX_CASH_FLOWS", "200000"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(32 * 1024 * 1024)))
+
+# Maximum number of holdings in a projected portfolio
+MAX_PORTFOLIO_ASSETS = int(os.getenv("MAX_PORTFOLIO_ASSETS", "500"))
+
+# Maximum number of cells (x points * y points) in a sensitivity grid
+MAX_GRID_CELLS = int(os.getenv("MAX_GRID_CELLS", "10000"))
+
+# Monte Carlo simulations: upper bound on paths per request, and the size at
+# which paths are split across a process pool (0 workers keeps them inline)
+MAX_SIMULATION_PATHS = int(os.getenv("MAX_SIMULATION_PATHS", "50000"))
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", "0"))
+SIMULATION_PARALLEL_PATHS = int(os.getenv("SIMULATION_PARALLEL_PATHS", "20000"))
+
+# Result cache for calculator outputs: in-process LRU tier, plus an optional
+# shared tier (a directory visible to every worker) when CACHE_SHARED_DIR is set
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "4096"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_SHARED_DIR = os.getenv("CACHE_SHARED_DIR", "")
+# Inputs with more list entries than this (cash flow ledgers) aren't cached:
+# hashing them costs about as much as the calculation
+CACHE_MAX_LIST_ENTRIES = int(os.getenv("CACHE_MAX_LIST_ENTRIES", "1000"))
+
+# Cache-Control max-age (seconds) on the cacheable GET calculator endpoints
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "3600"))
+
+# Memoized unit SIP factors, keyed on (rate, years, step-up)
+FACTOR_CACHE_SIZE = int(os.getenv("FACTOR_CACHE_SIZE", "65536"))
+
+# Live calculator sessions (WebSocket): seconds without a client message before
+# a session is closed
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "300"))
+
+# Prometheus metrics at /metrics, and how often the event-loop lag probe wakes (seconds)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
+# Workers forked by the launcher publish metric snapshots to a shared directory
+# (a temporary one unless METRICS_SHARED_DIR is set) every METRICS_PUBLISH_INTERVAL
+# seconds, and /metrics on any worker renders the totals over all of them
+METRICS_SHARED_DIR = os.getenv("METRICS_SHARED_DIR", "")
+METRICS_PUBLISH_INTERVAL = float(os.getenv("METRICS_PUBLISH_INTERVAL", "5"))
+
+# Calculation executor: calls whose estimated cost (microseconds) reaches the
+# threshold run in a "thread" or "process" pool; "inline" runs everything on
+# the event loop
+EXECUTOR_MODE = os.getenv("EXECUTOR_MODE", "thread")
+EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+OFFLOAD_COST_THRESHOLD = float(os.getenv("OFFLOAD_COST_THRESHOLD", "1000"))
+
+# Startup: warm every calculator route before taking traffic, and the number
+# of worker processes started by the launcher (python -m app)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(min(4, os.cpu_count() or 1))))
@@ -2,10 +2,18 @@
 FastAPI application for Financial Calculators
 Production-ready with comprehensive endpoints
 """
+import asyncio
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import life_goal, financial, quick_tools
+from fastapi.responses import PlainTextResponse
+from app.config import METRICS_ENABLED, EVENT_LOOP_LAG_INTERVAL, METRICS_PUBLISH_INTERVAL, WARMUP_ON_STARTUP
+from app.metrics import registry, monitor_event_loop_lag, publish_metrics
+from app.services.cache import calculation_cache
+from app.services.executor import shutdown_executor
+from app.services.monte_carlo import shutdown_pool
+from app.warmup import warmup, startup_report
+from app.routers import life_goal, financial, quick_tools, analysis, sessions
 
 # Environment configuration
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -32,6 +40,34 @@ app.add_middleware(
 app.include_router(life_goal.router, prefix="/api/life-goal", tags=["Life Goal Calculators"])
 app.include_router(financial.router, prefix="/api/financial", tags=["Financial Calculators"])
 app.include_router(quick_tools.router, prefix="/api/quick-tools", tags=["Quick Tools"])
+app.include_router(analysis.router, prefix="/api/analysis", tags=["Analysis"])
+app.include_router(sessions.router, prefix="/api/sessions", tags=["Live Sessions"])
+
+_background_tasks = []
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Workers forked by the launcher (python -m app) inherit a warm parent
+    if WARMUP_ON_STARTUP and "warmup_seconds" not in startup_report:
+        startup_report.update(await warmup(app))
+    if METRICS_ENABLED:
+        _background_tasks.append(asyncio.create_task(monitor_event_loop_lag(EVENT_LOOP_LAG_INTERVAL)))
+        if registry.shared_dir is not None:
+            _background_tasks.append(asyncio.create_task(publish_metrics(METRICS_PUBLISH_INTERVAL)))
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    if METRICS_ENABLED:
+        # The last snapshot keeps this worker's counts in the totals after it exits
+        registry.publish()
+    shutdown_executor()
+    shutdown_pool()
+
 
 @app.get("/")
 async def root():
@@ -47,5 +83,14 @@ async def health_check():
     return {
         "status": "healthy",
         "environment": ENVIRONMENT,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "cache": calculation_cache.stats(),
+        "startup": startup_report
     }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    if not METRICS_ENABLED:
+        return PlainTextResponse("Metrics are disabled\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,402 @@
+"""
+Runtime metrics
+Counters and histograms rendered in the Prometheus text exposition format,
+per-route latency split into validation, compute and serialization phases,
+kernel work counters and event-loop lag. Warmup traffic is not counted, and
+workers forked by the launcher are rendered as one (see Registry)
+"""
+import asyncio
+import functools
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from app.config import METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _value_lines(name: str, label_names: Tuple[str, ...], values: Dict[tuple, float]) -> List[str]:
+    return [f"{name}{_labels(label_names, labels)} {_number(value)}" for labels, value in values.items()]
+
+
+class Counter:
+    """Monotonic counter, optionally labelled"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> Dict[tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self, values: Dict[tuple, float], label_names: Tuple[str, ...]) -> List[str]:
+        return _value_lines(self.name, label_names, values)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally labelled"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = tuple(buckets)
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                # Per-bucket counts (plus +Inf), sum
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> Dict[tuple, list]:
+        with self._lock:
+            return {labels: [list(counts), total] for labels, (counts, total) in self._values.items()}
+
+    def samples(self, values: Dict[tuple, list], label_names: Tuple[str, ...]) -> List[str]:
+        lines = []
+        for labels, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(label_names, labels)} {cumulative}")
+        return lines
+
+
+class Collected:
+    """
+    Metric whose samples are read from a callback at scrape time
+    reset() only affects counters, which then count from the values at the reset
+    """
+
+    def __init__(self, name: str, help: str, type: str, labels: Tuple[str, ...],
+                 collect: Callable[[], Dict[tuple, float]]):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.label_names = labels
+        self.collect = collect
+        self._baseline: Dict[tuple, float] = {}
+
+    def reset(self) -> None:
+        if self.type == "counter":
+            self._baseline = self.collect()
+
+    def snapshot(self) -> Dict[tuple, float]:
+        return {labels: value - self._baseline.get(labels, 0) for labels, value in self.collect().items()}
+
+    def samples(self, values: Dict[tuple, float], label_names: Tuple[str, ...]) -> List[str]:
+        return _value_lines(self.name, label_names, values)
+
+
+def _merge(metric, snapshots: List[Tuple[int, bool, dict]]) -> Tuple[dict, Tuple[str, ...]]:
+    """
+    One metric's values summed over worker snapshots
+    Counters and histograms include workers that have exited, so totals
+    never go back; gauges are current state, so each live worker's are
+    kept apart under a worker label
+    """
+    merged = {}
+    if metric.type == "gauge":
+        for pid, alive, values in snapshots:
+            if alive:
+                merged.update({labels + (str(pid),): value for labels, value in values.items()})
+        return merged, metric.label_names + ("worker",)
+    for pid, alive, values in snapshots:
+        for labels, value in values.items():
+            if labels not in merged:
+                merged[labels] = value if metric.type != "histogram" else [list(value[0]), value[1]]
+            elif metric.type == "histogram":
+                counts, total = merged[labels]
+                merged[labels] = [[a + b for a, b in zip(counts, value[0])], total + value[1]]
+            else:
+                merged[labels] += value
+    return merged, metric.label_names
+
+
+class Registry:
+    """
+    Ordered set of metrics rendered together
+    Worker processes forked by the launcher each count their own traffic;
+    with share_across_workers() each one publishes snapshots to a shared
+    directory and /metrics on any worker renders the sum over all of them
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self.shared_dir: Optional[str] = None
+        # (pid, file name) of this process's snapshot file
+        self._worker: Optional[Tuple[int, str]] = None
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def reset(self) -> None:
+        """Start counting from zero, e.g. after warmup traffic"""
+        for metric in self._metrics:
+            metric.reset()
+
+    def share_across_workers(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.shared_dir = directory
+
+    def publish(self) -> None:
+        """Write this process's snapshot to the shared directory"""
+        if self.shared_dir is None:
+            return
+        pid = os.getpid()
+        if self._worker is None or self._worker[0] != pid:
+            # Named per process rather than per pid, so a replacement worker
+            # that reuses a pid doesn't overwrite the totals of the one before
+            self._worker = (pid, f"{pid}-{time.time_ns()}.json")
+        snapshot = {
+            metric.name: [[list(labels), value] for labels, value in metric.snapshot().items()]
+            for metric in self._metrics
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.shared_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(snapshot, handle)
+        os.replace(temp_path, os.path.join(self.shared_dir, self._worker[1]))
+
+    def _worker_snapshots(self) -> List[Tuple[int, bool, dict]]:
+        snapshots = []
+        for name in os.listdir(self.shared_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.shared_dir, name)) as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            pid = int(name.partition("-")[0])
+            values = {
+                metric: {tuple(labels): value for labels, value in samples}
+                for metric, samples in data.items()
+            }
+            snapshots.append((pid, _is_alive(pid), values))
+        return snapshots
+
+    def render(self) -> str:
+        if self.shared_dir is not None:
+            self.publish()
+            snapshots = self._worker_snapshots()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            if self.shared_dir is None:
+                lines.extend(metric.samples(metric.snapshot(), metric.label_names))
+            else:
+                worker_values = [(pid, alive, values.get(metric.name, {})) for pid, alive, values in snapshots]
+                lines.extend(metric.samples(*_merge(metric, worker_values)))
+        return "\n".join(lines) + "\n"
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests_total", "Requests handled, by route, method and status", ("route", "method", "status")))
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Time spent handling a request", ("route", "method")))
+PHASE_LATENCY = registry.register(Histogram(
+    "http_request_phase_seconds",
+    "Request time split into validation (body parsing, input models), compute (the endpoint) "
+    "and serialization (response model and JSON encoding)",
+    ("route", "phase")))
+KERNEL_CALLS = registry.register(Counter(
+    "kernel_calls_total", "Calls to instrumented calculation kernels", ("kernel",)))
+KERNEL_ITERATIONS = registry.register(Counter(
+    "kernel_iterations_total",
+    "Work done by instrumented kernels: year steps for SWP, iterations for solvers, paths for simulations",
+    ("kernel",)))
+EVENT_LOOP_LAG = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a periodic timer", buckets=LAG_BUCKETS))
+
+
+def count_kernel(name: str, amount: float = 1) -> None:
+    """Record one call to a kernel and the work it did"""
+    KERNEL_CALLS.inc(name)
+    if amount:
+        KERNEL_ITERATIONS.inc(name, amount=amount)
+
+
+def counted_solver(func: Callable) -> Callable:
+    """Count calls and iterations of a solver returning a SolverResult"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        count_kernel(name, result.iterations)
+        return result
+
+    return wrapper
+
+
+# Phase timestamps of the request being handled: [start, compute start, compute end]
+_phases: ContextVar[Optional[list]] = ContextVar("request_phases", default=None)
+
+
+def timed_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so the route handler can tell compute apart from validation and serialization"""
+    if getattr(endpoint, "_timed", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            phases = _phases.get()
+            if phases is not None:
+                phases[1] = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if phases is not None:
+                    phases[2] = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            phases = _phases.get()
+            if phases is not None:
+                phases[1] = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if phases is not None:
+                    phases[2] = time.perf_counter()
+
+    wrapper._timed = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that records request counts and phase latencies per route
+    Streamed bodies are produced after the handler returns, so their
+    serialization time is not included
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if METRICS_ENABLED:
+            endpoint = timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not METRICS_ENABLED:
+            return handler
+        route = self.path
+
+        async def timed_handler(request: Request):
+            start = time.perf_counter()
+            phases = [start, None, None]
+            token = _phases.set(phases)
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                end = time.perf_counter()
+                _phases.reset(token)
+                REQUESTS.inc(route, request.method, str(status))
+                REQUEST_LATENCY.observe(end - start, route, request.method)
+                compute_start, compute_end = phases[1], phases[2]
+                if compute_start is None:
+                    PHASE_LATENCY.observe(end - start, route, "validation")
+                else:
+                    PHASE_LATENCY.observe(compute_start - start, route, "validation")
+                    PHASE_LATENCY.observe((compute_end or end) - compute_start, route, "compute")
+                    if compute_end is not None:
+                        PHASE_LATENCY.observe(end - compute_end, route, "serialization")
+
+        return timed_handler
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """Sleep for `interval` seconds in a loop and record how late each wake-up is"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+
+
+async def publish_metrics(interval: float) -> None:
+    """Publish this worker's snapshot every `interval` seconds, so the others can render it"""
+    while True:
+        await asyncio.sleep(interval)
+        registry.publish()
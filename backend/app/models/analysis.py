@@ -0,0 +1,75 @@
+"""
+Pydantic models for Analysis endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+
+GridCalculator = Literal["sip-growth", "sip-need", "retirement", "education", "marriage", "other-goal"]
+
+
+class GridAxis(BaseModel):
+    """One axis of a sensitivity grid"""
+    field: str = Field(..., description="Input field to vary, e.g. 'expected_returns'")
+    start: float = Field(..., description="First value on the axis")
+    stop: float = Field(..., description="Last value on the axis (inclusive)")
+    step: float = Field(..., gt=0, description="Spacing between axis values")
+
+
+class SensitivityGridInput(BaseModel):
+    """Sensitivity Grid Input"""
+    calculator: GridCalculator = Field(..., description="Calculator to evaluate")
+    inputs: Dict[str, Any] = Field(..., description="Base inputs for the calculator")
+    x: GridAxis = Field(..., description="Axis varied along each row")
+    y: GridAxis = Field(..., description="Axis varied down each column")
+    outputs: Optional[List[str]] = Field(default=None, description="Output fields to return (default: all)")
+
+
+class GridCellError(BaseModel):
+    """A grid cell whose inputs are invalid together (its results are null)"""
+    x: float
+    y: float
+    error: str
+
+
+class SensitivityGridOutput(BaseModel):
+    """Sensitivity Grid Output"""
+    calculator: str
+    x_field: str
+    x_values: List[float]
+    y_field: str
+    y_values: List[float]
+    results: Dict[str, List[List[Optional[float]]]]
+    errors: List[GridCellError] = []
+
+
+class GoalSeekInput(BaseModel):
+    """Goal Seek Input"""
+    calculator: GridCalculator = Field(..., description="Calculator to invert")
+    inputs: Dict[str, Any] = Field(..., description="Inputs for the calculator, apart from the free field")
+    field: str = Field(..., description="Input field to solve for, e.g. 'expected_returns'")
+    output: str = Field(..., description="Output field to match, e.g. 'future_value'")
+    target: float = Field(..., description="Value the output should reach")
+    low: Optional[float] = Field(default=None, description="Lowest value to search (default: the field's lower bound)")
+    high: Optional[float] = Field(default=None, description="Highest value to search (default: the field's upper bound)")
+
+
+class GoalSeekOutput(BaseModel):
+    """Goal Seek Output"""
+    calculator: str
+    field: str
+    output: str
+    target: float
+    value: float
+    achieved: float
+    residual: float
+    converged: bool
+    method: str
+    iterations: int = Field(..., description="Solver iterations across both stages: the vectorized scan counts as one, "
+                                             "plus Brent's iterations when the bracket is refined")
+    function_calls: int = Field(..., description="Calculator evaluations across both stages: every scan point, "
+                                                 "plus Brent's evaluations when the bracket is refined")
+    scan_points: int
+    bracket_low: float
+    bracket_high: float
+    inputs: Dict[str, Any]
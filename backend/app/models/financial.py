@@ -2,6 +2,7 @@
 Pydantic models for Financial Calculators
 """
 from pydantic import BaseModel, Field
+from datetime import date
 from typing import Optional
 
 
@@ -61,6 +62,7 @@ class SWPInput(BaseModel):
     yearly_increase: float = Field(default=10.0, ge=0, le=20, description="Annual increase in withdrawal %")
     increase_withdrawal: bool = Field(default=False, description="Whether to increase withdrawal yearly")
     swp_start_years: int = Field(default=0, ge=0, le=30, description="Years before starting SWP")
+    start_date: Optional[date] = Field(default=None, description="Investment date (default: today)")
 
 
 class SWPOutput(BaseModel):
@@ -69,3 +71,23 @@ class SWPOutput(BaseModel):
     total_withdrawn: float
     full_instalments: int
     last_instalment_date: str
+
+
+class SWPMaxWithdrawalInput(BaseModel):
+    """SWP Maximum Withdrawal Input"""
+    initial_investment: float = Field(..., gt=0, description="Initial lump sum investment")
+    years: int = Field(..., ge=1, le=50, description="Years the withdrawals must last")
+    residual_value: float = Field(default=0, ge=0, description="Value to leave at the end")
+    expected_returns: float = Field(..., ge=2, le=15, description="Expected annual returns %")
+    yearly_increase: float = Field(default=10.0, ge=0, le=20, description="Annual increase in withdrawal %")
+    increase_withdrawal: bool = Field(default=False, description="Whether to increase withdrawal yearly")
+    swp_start_years: int = Field(default=0, ge=0, le=30, description="Years before starting SWP")
+
+
+class SWPMaxWithdrawalOutput(BaseModel):
+    """SWP Maximum Withdrawal Output"""
+    monthly_withdrawal: float
+    final_monthly_withdrawal: float
+    total_withdrawn: float
+    corpus_at_start: float
+    residual_value: float
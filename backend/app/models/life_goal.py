@@ -1,8 +1,9 @@
 """
 Pydantic models for Life Goal Calculators
 """
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List, Literal, Optional, Tuple, Union
+from app.config import MAX_SIMULATION_PATHS, MAX_PLAN_GOALS
 
 
 class RetirementInput(BaseModel):
@@ -31,6 +32,48 @@ class RetirementOutput(BaseModel):
     years_remaining: int
 
 
+class RetirementTimelineInput(RetirementInput):
+    """Retirement Timeline Input: the plan's inputs, optionally with the SIP actually invested"""
+    monthly_sip: Optional[float] = Field(default=None, ge=0, description="Monthly SIP invested (default: the recommended SIP)")
+
+
+class RetirementTimelineYear(BaseModel):
+    """One year of the retirement timeline"""
+    model_config = ConfigDict(frozen=True)
+
+    year: int
+    age: int
+    phase: str
+    contribution: float
+    withdrawal: float
+    gain: float
+    balance: float
+
+
+class RetirementTimelineOutput(BaseModel):
+    """Retirement Timeline Output (frozen: cached results are shared between requests)"""
+    model_config = ConfigDict(frozen=True)
+
+    monthly_sip: float
+    recommended_corpus: float
+    corpus_at_retirement: float
+    money_lasts: bool
+    depletion_age: Optional[int]
+    years_funded: int
+    final_balance: float
+    years: Tuple[RetirementTimelineYear, ...]
+
+
+class GoalOutput(BaseModel):
+    """Lump-sum Goal Output (education, marriage and other goals)"""
+    target_amount: float
+    monthly_sip: float
+    yearly_sip: float
+    one_time_investment: float
+    future_value_existing: float
+    shortfall: float
+
+
 class EducationInput(BaseModel):
     """Child Education Calculator Input"""
     years_remaining: int = Field(..., ge=1, le=50, description="Years until education starts")
@@ -41,14 +84,8 @@ class EducationInput(BaseModel):
     existing_investments: float = Field(default=0, ge=0, description="Current investments")
 
 
-class EducationOutput(BaseModel):
+class EducationOutput(GoalOutput):
     """Child Education Calculator Output"""
-    target_amount: float
-    monthly_sip: float
-    yearly_sip: float
-    one_time_investment: float
-    future_value_existing: float
-    shortfall: float
 
 
 class MarriageInput(BaseModel):
@@ -61,14 +98,8 @@ class MarriageInput(BaseModel):
     existing_investments: float = Field(default=0, ge=0, description="Current investments")
 
 
-class MarriageOutput(BaseModel):
+class MarriageOutput(GoalOutput):
     """Marriage for Child Calculator Output"""
-    target_amount: float
-    monthly_sip: float
-    yearly_sip: float
-    one_time_investment: float
-    future_value_existing: float
-    shortfall: float
 
 
 class OtherGoalInput(BaseModel):
@@ -82,11 +113,123 @@ class OtherGoalInput(BaseModel):
     existing_investments: float = Field(default=0, ge=0, description="Current investments")
 
 
-class OtherGoalOutput(BaseModel):
+class OtherGoalOutput(GoalOutput):
     """Your Other Goal Calculator Output"""
-    target_amount: float
+
+
+class SimulationSettings(BaseModel):
+    """Monte Carlo Simulation Settings"""
+    paths: int = Field(default=10000, ge=100, le=MAX_SIMULATION_PATHS, description="Number of simulated paths")
+    return_volatility: float = Field(default=12.0, ge=0, le=50, description="Annual volatility of returns %")
+    inflation_volatility: float = Field(default=1.0, ge=0, le=10, description="Annual volatility of inflation %")
+    monthly_sip: Optional[float] = Field(default=None, ge=0, description="Monthly SIP to test (default: recommended SIP)")
+    seed: Optional[int] = Field(default=None, ge=0, description="Random seed for reproducible results")
+
+
+class RetirementSimulationInput(BaseModel):
+    """Retirement Monte Carlo Input"""
+    inputs: RetirementInput
+    simulation: SimulationSettings = Field(default_factory=SimulationSettings)
+
+
+class EducationSimulationInput(BaseModel):
+    """Child Education Monte Carlo Input"""
+    inputs: EducationInput
+    simulation: SimulationSettings = Field(default_factory=SimulationSettings)
+
+
+class MarriageSimulationInput(BaseModel):
+    """Marriage for Child Monte Carlo Input"""
+    inputs: MarriageInput
+    simulation: SimulationSettings = Field(default_factory=SimulationSettings)
+
+
+class OtherGoalSimulationInput(BaseModel):
+    """Your Other Goal Monte Carlo Input"""
+    inputs: OtherGoalInput
+    simulation: SimulationSettings = Field(default_factory=SimulationSettings)
+
+
+class SimulationBand(BaseModel):
+    """Percentile band of the simulated balance at a year end"""
+    year: int
+    p10: float
+    p50: float
+    p90: float
+
+
+class SimulationOutput(BaseModel):
+    """Monte Carlo Simulation Output"""
+    success_probability: float
     monthly_sip: float
-    yearly_sip: float
-    one_time_investment: float
-    future_value_existing: float
+    target_amount: float
+    corpus_p10: float
+    corpus_p50: float
+    corpus_p90: float
+    paths: int
+    seed: int
+    bands: List[SimulationBand]
+
+
+class PlannedGoal(BaseModel):
+    """Goal in a household plan"""
+    name: str = Field(default="", description="Label echoed back in the allocation")
+    priority: int = Field(default=1, ge=1, le=10, description="Funding priority (1 is funded first)")
+
+
+class PlannedRetirement(PlannedGoal):
+    calculator: Literal["retirement"]
+    inputs: RetirementInput
+
+
+class PlannedEducation(PlannedGoal):
+    calculator: Literal["education"]
+    inputs: EducationInput
+
+
+class PlannedMarriage(PlannedGoal):
+    calculator: Literal["marriage"]
+    inputs: MarriageInput
+
+
+class PlannedOtherGoal(PlannedGoal):
+    calculator: Literal["other-goal"]
+    inputs: OtherGoalInput
+
+
+class HouseholdPlanInput(BaseModel):
+    """Household Planner Input"""
+    monthly_budget: float = Field(..., ge=0, description="Monthly savings available for all goals")
+    goals: List[Annotated[
+        Union[PlannedRetirement, PlannedEducation, PlannedMarriage, PlannedOtherGoal],
+        Field(discriminator="calculator")
+    ]] = Field(..., min_length=1, max_length=MAX_PLAN_GOALS, description="Goals, each with its calculator inputs")
+
+
+class GoalAllocation(BaseModel):
+    """Budget allocated to one goal of a household plan"""
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    calculator: str
+    priority: int
+    years_remaining: int
+    target_amount: float
+    required_sip: float
+    allocated_sip: float
+    funded_ratio: float
+    projected_value: float
     shortfall: float
+    one_time_investment: float
+
+
+class HouseholdPlanOutput(BaseModel):
+    """Household Planner Output (frozen: cached results are shared between requests)"""
+    model_config = ConfigDict(frozen=True)
+
+    monthly_budget: float
+    required_sip: float
+    allocated_sip: float
+    unallocated_budget: float
+    fully_funded: bool
+    goals: Tuple[GoalAllocation, ...]
@@ -1,8 +1,10 @@
 """
 Pydantic models for Quick Tools
 """
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from datetime import date
+from typing import List, Literal, Optional, Tuple
+from app.config import MAX_CASH_FLOWS, MAX_PORTFOLIO_ASSETS
 
 
 class SingleAmountInput(BaseModel):
@@ -20,16 +22,25 @@ class SingleAmountOutput(BaseModel):
 
 
 class CashFlow(BaseModel):
-    """Individual cash flow"""
+    """Individual cash flow, timed by exactly one of years, months or payment_date"""
     amount: float = Field(..., description="Cash flow amount")
-    years: int = Field(..., ge=1, le=50, description="Years from now")
+    years: Optional[int] = Field(default=None, ge=1, le=50, description="Years from now")
+    months: Optional[int] = Field(default=None, ge=1, le=600, description="Months from now")
+    payment_date: Optional[date] = Field(default=None, description="Date of the cash flow")
+
+    @model_validator(mode="after")
+    def check_timing(self):
+        if (self.years is not None) + (self.months is not None) + (self.payment_date is not None) != 1:
+            raise ValueError("Give exactly one of years, months or payment_date")
+        return self
 
 
 class IrregularCashFlowInput(BaseModel):
     """Irregular Cash Flow Calculator Input"""
     calculate_type: str = Field(..., description="'present_value' or 'future_value'")
-    cash_flows: List[CashFlow] = Field(..., min_length=1, description="List of cash flows")
+    cash_flows: List[CashFlow] = Field(..., min_length=1, max_length=MAX_CASH_FLOWS, description="List of cash flows")
     discount_rate: float = Field(..., ge=0, le=20, description="Discount rate %")
+    valuation_date: Optional[date] = Field(default=None, description="Date dated cash flows are timed from (default: today)")
 
 
 class IrregularCashFlowOutput(BaseModel):
@@ -38,6 +49,33 @@ class IrregularCashFlowOutput(BaseModel):
     calculation_type: str
 
 
+class DatedCashFlow(BaseModel):
+    """Dated cash flow: negative for money invested, positive for money received"""
+    amount: float = Field(..., description="Cash flow amount (negative = invested, positive = received or current value)")
+    payment_date: date = Field(..., description="Date of the cash flow")
+
+
+class XIRRInput(BaseModel):
+    """XIRR Calculator Input"""
+    cash_flows: List[DatedCashFlow] = Field(..., min_length=2, max_length=MAX_CASH_FLOWS, description="Dated cash flows")
+    guess: float = Field(default=10, ge=-99, le=1000, description="Starting guess for the annual return %")
+
+
+class XIRROutput(BaseModel):
+    """XIRR Calculator Output, with the solver's convergence diagnostics"""
+    xirr: float
+    total_invested: float
+    total_returned: float
+    net_gain: float
+    converged: bool
+    iterations: int
+    function_calls: int
+    residual: float
+    method: str
+    bracket_low: float
+    bracket_high: float
+
+
 class AssetReturn(BaseModel):
     """Individual asset return"""
     investment_amount: float = Field(..., gt=0, description="Investment amount")
@@ -55,3 +93,68 @@ class WeightedReturnsOutput(BaseModel):
     future_value: float
     weighted_return: float
     total_invested: float
+
+
+class PortfolioAsset(BaseModel):
+    """One holding of a projected portfolio"""
+    name: str = Field(default="", max_length=100, description="Asset name")
+    investment_amount: float = Field(default=0, ge=0, description="Amount invested today")
+    monthly_contribution: float = Field(default=0, ge=0, description="Amount added at the start of every month")
+    expected_return: float = Field(..., ge=0, le=30, description="Expected annual return %")
+    target_weight: Optional[float] = Field(
+        default=None, ge=0, le=100, description="Target allocation % (default: today's allocation)"
+    )
+
+
+class PortfolioProjectionInput(BaseModel):
+    """Portfolio Projection Input"""
+    years: int = Field(..., ge=1, le=50, description="Projection period in years")
+    assets: List[PortfolioAsset] = Field(..., min_length=1, max_length=MAX_PORTFOLIO_ASSETS, description="Holdings")
+    rebalance: Literal["none", "monthly", "quarterly", "yearly"] = Field(
+        default="none", description="How often holdings are reset to their target weights"
+    )
+
+    @model_validator(mode="after")
+    def check_allocation(self):
+        if not any(asset.investment_amount or asset.monthly_contribution for asset in self.assets):
+            raise ValueError("Portfolio needs an investment or a monthly contribution")
+        weights = [asset.target_weight for asset in self.assets if asset.target_weight is not None]
+        if weights and len(weights) != len(self.assets):
+            raise ValueError("Give a target_weight for every asset or for none")
+        if weights and abs(sum(weights) - 100) > 0.01:
+            raise ValueError("Target weights must add up to 100")
+        return self
+
+
+class AssetProjection(BaseModel):
+    """One holding at the end of the projection"""
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    future_value: float
+    total_invested: float
+    weight: float
+    target_weight: float
+
+
+class PortfolioYear(BaseModel):
+    """Portfolio at the end of a year, with its allocation and drift from the targets"""
+    model_config = ConfigDict(frozen=True)
+
+    year: int
+    value: float
+    total_invested: float
+    weights: Tuple[float, ...]
+    drift: float
+
+
+class PortfolioProjectionOutput(BaseModel):
+    """Portfolio Projection Output (frozen: cached results are shared between requests)"""
+    model_config = ConfigDict(frozen=True)
+
+    future_value: float
+    total_invested: float
+    wealth_gain: float
+    single_rate_value: float
+    assets: Tuple[AssetProjection, ...]
+    years: Tuple[PortfolioYear, ...]
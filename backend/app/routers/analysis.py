@@ -0,0 +1,46 @@
+"""
+Analysis API Router
+"""
+from fastapi import APIRouter, HTTPException
+from app.routers.routing import CalculatorRoute
+from app.services.executor import run_calculation
+from app.models.analysis import SensitivityGridInput, SensitivityGridOutput, GoalSeekInput, GoalSeekOutput
+from app.services.analysis_service import SensitivityGridCalculator, GoalSeekCalculator
+
+router = APIRouter(route_class=CalculatorRoute)
+
+
+@router.post("/sensitivity-grid", response_model=SensitivityGridOutput)
+async def calculate_sensitivity_grid(data: SensitivityGridInput):
+    """
+    Sensitivity Grid
+    
+    Evaluates a SIP or goal calculator over every combination of two
+    input fields (e.g. expected returns x period) and returns the
+    output matrices for a heatmap in a single call.
+    """
+    try:
+        return await run_calculation(SensitivityGridCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/goal-seek", response_model=GoalSeekOutput)
+async def calculate_goal_seek(data: GoalSeekInput):
+    """
+    Goal Seek
+    
+    Solves one input of a SIP or goal calculator for a target output,
+    e.g. the return needed for a corpus or the years until a target is
+    reached, searching within the field's allowed range. Whole-number
+    fields return the first value that reaches the target. iterations
+    and function_calls count the scan and the Brent refinement together.
+    """
+    try:
+        return await run_calculation(GoalSeekCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
@@ -1,12 +1,25 @@
 """
 Financial Calculators API Router
 """
-from fastapi import APIRouter, HTTPException
+from typing import Annotated, List, Literal
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.config import MAX_BATCH_SIZE, HTTP_CACHE_MAX_AGE
+from app.routers.routing import CalculatorRoute
+from app.services.executor import run_calculation
+from app.routers.responses import (
+    ndjson_response,
+    cacheable_response,
+    query_input,
+    query_parameters,
+    seconds_until_midnight
+)
 from app.models.financial import (
     SIPGrowthInput, SIPGrowthOutput,
     SIPNeedInput, SIPNeedOutput,
     SIPDelayInput, SIPDelayOutput,
-    SWPInput, SWPOutput
+    SWPInput, SWPOutput,
+    SWPMaxWithdrawalInput, SWPMaxWithdrawalOutput
 )
 from app.services.financial_service import (
     SIPGrowthCalculator,
@@ -15,7 +28,7 @@ from app.services.financial_service import (
     SWPCalculator
 )
 
-router = APIRouter()
+router = APIRouter(route_class=CalculatorRoute)
 
 
 @router.post("/sip-growth", response_model=SIPGrowthOutput)
@@ -27,7 +40,55 @@ async def calculate_sip_growth(data: SIPGrowthInput):
     with optional step-up investments.
     """
     try:
-        return SIPGrowthCalculator.calculate(data)
+        return await run_calculation(SIPGrowthCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/sip-growth", response_model=SIPGrowthOutput, openapi_extra=query_parameters(SIPGrowthInput))
+async def get_sip_growth(request: Request, data: SIPGrowthInput = Depends(query_input(SIPGrowthInput))):
+    """
+    SIP Growth Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, SIPGrowthCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/sip-growth/batch", response_model=List[SIPGrowthOutput])
+async def calculate_sip_growth_batch(data: Annotated[List[SIPGrowthInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    SIP Growth Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(SIPGrowthCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/sip-growth/schedule", response_class=StreamingResponse)
+async def calculate_sip_growth_schedule(data: SIPGrowthInput, granularity: Literal["month", "year"] = "year"):
+    """
+    SIP Growth Schedule
+    
+    Streams the SIP period by period as NDJSON: contribution, returns
+    earned, closing balance and running total invested.
+    """
+    try:
+        return ndjson_response(SIPGrowthCalculator.schedule(data, granularity))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -43,7 +104,39 @@ async def calculate_sip_need(data: SIPNeedInput):
     considering inflation and step-up investments.
     """
     try:
-        return SIPNeedCalculator.calculate(data)
+        return await run_calculation(SIPNeedCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/sip-need", response_model=SIPNeedOutput, openapi_extra=query_parameters(SIPNeedInput))
+async def get_sip_need(request: Request, data: SIPNeedInput = Depends(query_input(SIPNeedInput))):
+    """
+    SIP Need Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, SIPNeedCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/sip-need/batch", response_model=List[SIPNeedOutput])
+async def calculate_sip_need_batch(data: Annotated[List[SIPNeedInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    SIP Need Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(SIPNeedCalculator.calculate_batch, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -59,7 +152,39 @@ async def calculate_sip_delay(data: SIPDelayInput):
     by showing the difference in future value.
     """
     try:
-        return SIPDelayCalculator.calculate(data)
+        return await run_calculation(SIPDelayCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/sip-delay", response_model=SIPDelayOutput, openapi_extra=query_parameters(SIPDelayInput))
+async def get_sip_delay(request: Request, data: SIPDelayInput = Depends(query_input(SIPDelayInput))):
+    """
+    SIP Delay Cost Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, SIPDelayCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/sip-delay/batch", response_model=List[SIPDelayOutput])
+async def calculate_sip_delay_batch(data: Annotated[List[SIPDelayInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    SIP Delay Cost Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(SIPDelayCalculator.calculate_batch, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -75,7 +200,97 @@ async def calculate_swp(data: SWPInput):
     systematic monthly withdrawals.
     """
     try:
-        return SWPCalculator.calculate(data)
+        return await run_calculation(SWPCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/swp", response_model=SWPOutput, openapi_extra=query_parameters(SWPInput))
+async def get_swp(request: Request, data: SWPInput = Depends(query_input(SWPInput))):
+    """
+    SWP Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        # Without an explicit start_date the instalment dates follow today's
+        # date, so those responses may only be reused until midnight
+        max_age = HTTP_CACHE_MAX_AGE if data.start_date else min(HTTP_CACHE_MAX_AGE, seconds_until_midnight())
+        return await cacheable_response(request, data, SWPCalculator.calculate, max_age=max_age)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/swp/batch", response_model=List[SWPOutput])
+async def calculate_swp_batch(data: Annotated[List[SWPInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    SWP Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(SWPCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/swp/schedule", response_class=StreamingResponse)
+async def calculate_swp_schedule(data: SWPInput, granularity: Literal["month", "year"] = "year"):
+    """
+    SWP Schedule
+    
+    Streams the withdrawal plan period by period as NDJSON: withdrawal,
+    returns earned, closing balance and running total withdrawn.
+    """
+    try:
+        return ndjson_response(SWPCalculator.schedule(data, granularity))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/swp/max-withdrawal", response_model=SWPMaxWithdrawalOutput)
+async def calculate_swp_max_withdrawal(data: SWPMaxWithdrawalInput):
+    """
+    SWP Maximum Withdrawal
+    
+    Calculates the largest monthly withdrawal (the first year's, when
+    it increases yearly) that lasts the given number of years and
+    leaves the residual value.
+    """
+    try:
+        return await run_calculation(SWPCalculator.max_withdrawal, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get(
+    "/swp/max-withdrawal",
+    response_model=SWPMaxWithdrawalOutput,
+    openapi_extra=query_parameters(SWPMaxWithdrawalInput)
+)
+async def get_swp_max_withdrawal(
+    request: Request, data: SWPMaxWithdrawalInput = Depends(query_input(SWPMaxWithdrawalInput))
+):
+    """
+    SWP Maximum Withdrawal (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, SWPCalculator.max_withdrawal)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1,21 +1,35 @@
 """
 Life Goal Calculators API Router
 """
-from fastapi import APIRouter, HTTPException
+from typing import Annotated, List
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.config import MAX_BATCH_SIZE
+from app.routers.routing import CalculatorRoute
+from app.services.executor import run_calculation
+from app.routers.responses import ndjson_response, cacheable_response, query_input, query_parameters
 from app.models.life_goal import (
     RetirementInput, RetirementOutput,
+    RetirementTimelineInput, RetirementTimelineOutput,
     EducationInput, EducationOutput,
     MarriageInput, MarriageOutput,
-    OtherGoalInput, OtherGoalOutput
+    OtherGoalInput, OtherGoalOutput,
+    SimulationOutput,
+    RetirementSimulationInput,
+    EducationSimulationInput,
+    MarriageSimulationInput,
+    OtherGoalSimulationInput,
+    HouseholdPlanInput, HouseholdPlanOutput
 )
 from app.services.life_goal_service import (
     RetirementCalculator,
     EducationCalculator,
     MarriageCalculator,
-    OtherGoalCalculator
+    OtherGoalCalculator,
+    HouseholdPlanner
 )
 
-router = APIRouter()
+router = APIRouter(route_class=CalculatorRoute)
 
 
 @router.post("/retirement", response_model=RetirementOutput)
@@ -27,7 +41,90 @@ async def calculate_retirement(data: RetirementInput):
     based on current age, expenses, and expected returns.
     """
     try:
-        return RetirementCalculator.calculate(data)
+        return await run_calculation(RetirementCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/retirement", response_model=RetirementOutput, openapi_extra=query_parameters(RetirementInput))
+async def get_retirement(request: Request, data: RetirementInput = Depends(query_input(RetirementInput))):
+    """
+    Retirement Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, RetirementCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/retirement/batch", response_model=List[RetirementOutput])
+async def calculate_retirement_batch(data: Annotated[List[RetirementInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Retirement Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(RetirementCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/retirement/schedule", response_class=StreamingResponse)
+async def calculate_retirement_schedule(data: RetirementInput):
+    """
+    Retirement Schedule
+    
+    Streams the year-by-year corpus trajectory as NDJSON: SIP contributions
+    until retirement, then inflation-growing expenses drawn from the kitty.
+    """
+    try:
+        return ndjson_response(RetirementCalculator.schedule(data))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/retirement/timeline", response_model=RetirementTimelineOutput)
+async def calculate_retirement_timeline(data: RetirementTimelineInput):
+    """
+    Retirement Timeline
+    
+    Runs both phases of the plan: contributions until retirement, then
+    inflation-growing withdrawals until life expectancy. Returns every
+    year's balance and the age at which the money runs out, if it does,
+    for the recommended SIP or the SIP actually invested.
+    """
+    try:
+        return await run_calculation(RetirementCalculator.timeline, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/retirement/simulate", response_model=SimulationOutput)
+async def simulate_retirement(data: RetirementSimulationInput):
+    """
+    Retirement Monte Carlo
+    
+    Simulates thousands of return and inflation paths and reports the
+    probability that the retirement kitty lasts until life expectancy,
+    with P10/P50/P90 corpus bands.
+    """
+    try:
+        return await run_calculation(RetirementCalculator.simulate, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -43,7 +140,55 @@ async def calculate_education(data: EducationInput):
     required monthly/yearly SIP to achieve the goal.
     """
     try:
-        return EducationCalculator.calculate(data)
+        return await run_calculation(EducationCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/education", response_model=EducationOutput, openapi_extra=query_parameters(EducationInput))
+async def get_education(request: Request, data: EducationInput = Depends(query_input(EducationInput))):
+    """
+    Child Education Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, EducationCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/education/batch", response_model=List[EducationOutput])
+async def calculate_education_batch(data: Annotated[List[EducationInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Child Education Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(EducationCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/education/simulate", response_model=SimulationOutput)
+async def simulate_education(data: EducationSimulationInput):
+    """
+    Child Education Monte Carlo
+    
+    Simulates thousands of return and inflation paths and reports the
+    probability of meeting the education cost, with P10/P50/P90 corpus bands.
+    """
+    try:
+        return await run_calculation(EducationCalculator.simulate, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -59,7 +204,55 @@ async def calculate_marriage(data: MarriageInput):
     required investments to achieve the goal.
     """
     try:
-        return MarriageCalculator.calculate(data)
+        return await run_calculation(MarriageCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/marriage", response_model=MarriageOutput, openapi_extra=query_parameters(MarriageInput))
+async def get_marriage(request: Request, data: MarriageInput = Depends(query_input(MarriageInput))):
+    """
+    Marriage for Child Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, MarriageCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/marriage/batch", response_model=List[MarriageOutput])
+async def calculate_marriage_batch(data: Annotated[List[MarriageInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Marriage for Child Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(MarriageCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/marriage/simulate", response_model=SimulationOutput)
+async def simulate_marriage(data: MarriageSimulationInput):
+    """
+    Marriage for Child Monte Carlo
+    
+    Simulates thousands of return and inflation paths and reports the
+    probability of meeting the marriage cost, with P10/P50/P90 corpus bands.
+    """
+    try:
+        return await run_calculation(MarriageCalculator.simulate, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -75,7 +268,74 @@ async def calculate_other_goal(data: OtherGoalInput):
     Calculates required investments based on goal cost and timeline.
     """
     try:
-        return OtherGoalCalculator.calculate(data)
+        return await run_calculation(OtherGoalCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/other-goal", response_model=OtherGoalOutput, openapi_extra=query_parameters(OtherGoalInput))
+async def get_other_goal(request: Request, data: OtherGoalInput = Depends(query_input(OtherGoalInput))):
+    """
+    Other Goal Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, OtherGoalCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/other-goal/batch", response_model=List[OtherGoalOutput])
+async def calculate_other_goal_batch(data: Annotated[List[OtherGoalInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Other Goal Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(OtherGoalCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/other-goal/simulate", response_model=SimulationOutput)
+async def simulate_other_goal(data: OtherGoalSimulationInput):
+    """
+    Other Goal Monte Carlo
+    
+    Simulates thousands of return and inflation paths and reports the
+    probability of meeting the goal, with P10/P50/P90 corpus bands.
+    """
+    try:
+        return await run_calculation(OtherGoalCalculator.simulate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/household-plan", response_model=HouseholdPlanOutput)
+async def calculate_household_plan(data: HouseholdPlanInput):
+    """
+    Household Planner
+    
+    Plans every goal of a household (retirement, education, marriage,
+    other) in one pass and splits a monthly savings budget across them:
+    priority 1 goals are funded first, and goals of a priority the budget
+    can't fully cover get the same share of their required SIP. Returns
+    each goal's allocated SIP and remaining shortfall.
+    """
+    try:
+        return await run_calculation(HouseholdPlanner.calculate, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
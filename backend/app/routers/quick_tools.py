@@ -1,19 +1,60 @@
 """
 Quick Tools API Router
 """
-from fastapi import APIRouter, HTTPException
+import codecs
+from datetime import date
+from functools import partial
+from typing import Annotated, List, Literal, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from app.config import MAX_BATCH_SIZE, MAX_CASH_FLOWS, MAX_UPLOAD_BYTES, HTTP_CACHE_MAX_AGE
+from app.routers.routing import CalculatorRoute
+from app.services.executor import run_calculation
+from app.services.cash_flows import CashFlowColumns, CashFlowReader, UploadTooLarge
+from app.routers.responses import cacheable_response, query_input, query_parameters, seconds_until_midnight
 from app.models.quick_tools import (
     SingleAmountInput, SingleAmountOutput,
     IrregularCashFlowInput, IrregularCashFlowOutput,
-    WeightedReturnsInput, WeightedReturnsOutput
+    XIRRInput, XIRROutput,
+    WeightedReturnsInput, WeightedReturnsOutput,
+    PortfolioProjectionInput, PortfolioProjectionOutput
 )
 from app.services.quick_tools_service import (
     SingleAmountCalculator,
     IrregularCashFlowCalculator,
-    WeightedReturnsCalculator
+    XIRRCalculator,
+    WeightedReturnsCalculator,
+    PortfolioProjectionCalculator
 )
 
-router = APIRouter()
+router = APIRouter(route_class=CalculatorRoute)
+
+# Upload media types and the CashFlowReader format each one is parsed as
+UPLOAD_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json": "json",
+}
+
+
+async def _read_cash_flows(request: Request, valuation_date: date) -> CashFlowColumns:
+    """Parse an uploaded cash flow body chunk by chunk as it arrives"""
+    media_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+    if media_type not in UPLOAD_FORMATS:
+        raise HTTPException(status_code=415, detail=f"Upload as one of: {', '.join(UPLOAD_FORMATS)}")
+    if int(request.headers.get("content-length") or 0) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload is larger than {MAX_UPLOAD_BYTES} bytes")
+
+    reader = CashFlowReader(UPLOAD_FORMATS[media_type], valuation_date, MAX_CASH_FLOWS)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Upload is larger than {MAX_UPLOAD_BYTES} bytes")
+        reader.feed(decoder.decode(chunk))
+    reader.feed(decoder.decode(b"", final=True))
+    return reader.close()
 
 
 @router.post("/single-amount", response_model=SingleAmountOutput)
@@ -25,7 +66,39 @@ async def calculate_single_amount(data: SingleAmountInput):
     based on inflation/discount rate.
     """
     try:
-        return SingleAmountCalculator.calculate(data)
+        return await run_calculation(SingleAmountCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/single-amount", response_model=SingleAmountOutput, openapi_extra=query_parameters(SingleAmountInput))
+async def get_single_amount(request: Request, data: SingleAmountInput = Depends(query_input(SingleAmountInput))):
+    """
+    Single Amount Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, SingleAmountCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/single-amount/batch", response_model=List[SingleAmountOutput])
+async def calculate_single_amount_batch(data: Annotated[List[SingleAmountInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Single Amount Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(SingleAmountCalculator.calculate_batch, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -41,13 +114,135 @@ async def calculate_irregular_cash_flow(data: IrregularCashFlowInput):
     occurring at different points in time.
     """
     try:
-        return IrregularCashFlowCalculator.calculate(data)
+        return await run_calculation(IrregularCashFlowCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/irregular-cash-flow", response_model=IrregularCashFlowOutput, openapi_extra=query_parameters(IrregularCashFlowInput))
+async def get_irregular_cash_flow(request: Request, data: IrregularCashFlowInput = Depends(query_input(IrregularCashFlowInput))):
+    """
+    Irregular Cash Flow Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        # Dated flows without a valuation_date are timed from today, so those
+        # responses may only be reused until midnight
+        dated = data.valuation_date is None and any(flow.payment_date for flow in data.cash_flows)
+        max_age = min(HTTP_CACHE_MAX_AGE, seconds_until_midnight()) if dated else HTTP_CACHE_MAX_AGE
+        return await cacheable_response(request, data, IrregularCashFlowCalculator.calculate, max_age=max_age)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/irregular-cash-flow/batch", response_model=List[IrregularCashFlowOutput])
+async def calculate_irregular_cash_flow_batch(data: Annotated[List[IrregularCashFlowInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Irregular Cash Flow Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(IrregularCashFlowCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/irregular-cash-flow/upload", response_model=IrregularCashFlowOutput)
+async def upload_irregular_cash_flow(
+    request: Request,
+    calculate_type: Literal["present_value", "future_value"],
+    discount_rate: Annotated[float, Query(ge=0, le=20, description="Discount rate %")],
+    valuation_date: Annotated[Optional[date], Query(description="Date dated cash flows are timed from (default: today)")] = None
+):
+    """
+    Irregular Cash Flow Calculator (upload)
+    
+    Values a large ledger sent as the raw request body: CSV with an amount
+    column and a years, months or payment_date column, NDJSON, or a JSON
+    array of cash flows. The body is parsed as it streams in.
+    """
+    try:
+        flows = await _read_cash_flows(request, valuation_date or date.today())
+        calculate = partial(IrregularCashFlowCalculator.calculate_columns, calculate_type, discount_rate)
+        return await run_calculation(calculate, flows)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/xirr", response_model=XIRROutput)
+async def calculate_xirr(data: XIRRInput):
+    """
+    XIRR Calculator
+    
+    Solves for the annualized return of dated investments (negative
+    amounts) and returns or current value (positive amounts), with the
+    solver's convergence diagnostics.
+    """
+    try:
+        return await run_calculation(XIRRCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/xirr", response_model=XIRROutput, openapi_extra=query_parameters(XIRRInput))
+async def get_xirr(request: Request, data: XIRRInput = Depends(query_input(XIRRInput))):
+    """
+    XIRR Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, XIRRCalculator.calculate)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Calculation error")
 
 
+@router.post("/xirr/upload", response_model=XIRROutput)
+async def upload_xirr(
+    request: Request,
+    guess: Annotated[float, Query(ge=-99, le=1000, description="Starting guess for the annual return %")] = 10
+):
+    """
+    XIRR Calculator (upload)
+    
+    Solves for the return on a long transaction history, such as years of
+    SIP instalments, sent as a CSV, NDJSON or JSON-array body like the
+    irregular cash flow upload.
+    """
+    try:
+        flows = await _read_cash_flows(request, date.today())
+        return await run_calculation(partial(XIRRCalculator.calculate_columns, guess), flows)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
 @router.post("/weighted-returns", response_model=WeightedReturnsOutput)
 async def calculate_weighted_returns(data: WeightedReturnsInput):
     """
@@ -57,7 +252,72 @@ async def calculate_weighted_returns(data: WeightedReturnsInput):
     returns of different asset classes.
     """
     try:
-        return WeightedReturnsCalculator.calculate(data)
+        return await run_calculation(WeightedReturnsCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.get("/weighted-returns", response_model=WeightedReturnsOutput, openapi_extra=query_parameters(WeightedReturnsInput))
+async def get_weighted_returns(request: Request, data: WeightedReturnsInput = Depends(query_input(WeightedReturnsInput))):
+    """
+    Weighted Average Returns Calculator (cacheable GET)
+    
+    Same calculation with inputs in the query string. Responses carry
+    ETag and Cache-Control headers so nginx and browsers can serve repeats.
+    """
+    try:
+        return await cacheable_response(request, data, WeightedReturnsCalculator.calculate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/weighted-returns/batch", response_model=List[WeightedReturnsOutput])
+async def calculate_weighted_returns_batch(data: Annotated[List[WeightedReturnsInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Weighted Average Returns Calculator (batch)
+    
+    Evaluates a list of inputs in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(WeightedReturnsCalculator.calculate_batch, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/portfolio-projection", response_model=PortfolioProjectionOutput)
+async def calculate_portfolio_projection(data: PortfolioProjectionInput):
+    """
+    Portfolio Projection
+    
+    Compounds every holding at its own rate with optional monthly
+    contributions and periodic rebalancing to target weights, and returns
+    the year-by-year value, allocation and drift from the targets.
+    """
+    try:
+        return await run_calculation(PortfolioProjectionCalculator.calculate, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Calculation error")
+
+
+@router.post("/portfolio-projection/batch", response_model=List[PortfolioProjectionOutput])
+async def calculate_portfolio_projection_batch(data: Annotated[List[PortfolioProjectionInput], Body(min_length=1, max_length=MAX_BATCH_SIZE)]):
+    """
+    Portfolio Projection (batch)
+    
+    Projects a list of portfolios in one vectorized pass and returns
+    the outputs in the same order.
+    """
+    try:
+        return await run_calculation(PortfolioProjectionCalculator.calculate_batch, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
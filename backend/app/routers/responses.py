@@ -0,0 +1,136 @@
+"""
+Shared response helpers for the API routers
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Iterable, List, Union, get_origin
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from app.config import HTTP_CACHE_MAX_AGE
+from app.services.executor import run_calculation
+from app.services.kernels import Schedule
+
+
+# Rows sent per chunk of a streamed response
+NDJSON_CHUNK_ROWS = 120
+
+
+async def _ndjson_chunks(lines: Iterable[str]) -> AsyncIterator[str]:
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == NDJSON_CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+            # Let other requests run between chunks
+            await asyncio.sleep(0)
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def ndjson_response(rows: Union[Schedule, Iterable[dict]]) -> StreamingResponse:
+    """
+    Stream rows as newline-delimited JSON, one row per line
+    Schedule rows cost about a microsecond each, so they are produced on the
+    event loop in chunks (yielding between chunks) rather than with a
+    threadpool hop per row. Array-backed schedules are encoded without
+    building a dict per row.
+    """
+    lines = rows.json_lines() if isinstance(rows, Schedule) else map(json.dumps, rows)
+    return StreamingResponse(_ndjson_chunks(lines), media_type="application/x-ndjson")
+
+
+def _list_fields(model) -> set:
+    return {
+        name for name, field in model.model_fields.items()
+        if get_origin(field.annotation) in (list, List)
+    }
+
+
+def query_input(model) -> Callable:
+    """
+    Dependency that validates an input model from the query string
+    List fields (cash flows, assets) are passed as JSON-encoded strings
+    """
+    list_fields = _list_fields(model)
+
+    # Validation is cheap, so run it on the event loop rather than in the threadpool
+    async def dependency(request: Request):
+        params = dict(request.query_params)
+        for name in list_fields & params.keys():
+            try:
+                params[name] = json.loads(params[name])
+            except ValueError:
+                raise RequestValidationError([{
+                    "type": "json_invalid",
+                    "loc": ("query", name),
+                    "msg": "Invalid JSON",
+                    "input": params[name]
+                }])
+        try:
+            return model.model_validate(params)
+        except ValidationError as e:
+            errors = e.errors(include_url=False)
+            for error in errors:
+                error["loc"] = ("query",) + tuple(error["loc"])
+                error.pop("ctx", None)
+            raise RequestValidationError(errors)
+
+    return dependency
+
+
+def query_parameters(model) -> dict:
+    """OpenAPI description of the query parameters read by query_input"""
+    schema = model.model_json_schema()
+    required = set(schema.get("required", []))
+    list_fields = _list_fields(model)
+    parameters = []
+    for name, prop in schema["properties"].items():
+        if name in list_fields:
+            prop = {"type": "string", "description": prop.get("description", "") + " (JSON-encoded list)"}
+        parameters.append({
+            "name": name,
+            "in": "query",
+            "required": name in required,
+            "description": prop.get("description", ""),
+            "schema": prop
+        })
+    return {"parameters": parameters}
+
+
+def seconds_until_midnight() -> int:
+    """Seconds until the server's local date changes"""
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def cacheable_response(request: Request, data: BaseModel, calculate: Callable,
+                             max_age: int = HTTP_CACHE_MAX_AGE) -> Response:
+    """
+    JSON response for an idempotent GET calculation
+    The calculation is offloaded like a POST's when it is costly. The ETag
+    is a hash of the serialized output, so identical inputs always produce
+    identical tags; a matching If-None-Match gets a 304
+    """
+    body = (await run_calculation(calculate, data)).model_dump_json().encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding"
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
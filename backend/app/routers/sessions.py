@@ -0,0 +1,76 @@
+"""
+Live Sessions API Router
+"""
+import asyncio
+import json
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from app.config import SESSION_IDLE_SECONDS
+from app.services.sessions import CalculatorSession, SESSION_CALCULATORS
+
+router = APIRouter()
+
+
+@router.websocket("/{calculator}")
+async def calculator_session(websocket: WebSocket, calculator: str):
+    """
+    Live Calculator Session
+
+    Keeps one calculator's inputs on the server while the user edits
+    them. The client sends only the fields that changed; bursts are
+    coalesced so only the latest state is computed, and only the parts
+    (result, schedule, simulation) whose inputs changed are recomputed
+    and pushed back.
+    """
+    if calculator not in SESSION_CALCULATORS:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    session = CalculatorSession(calculator)
+    changed = asyncio.Event()
+    send_lock = asyncio.Lock()
+
+    async def send(message: dict) -> None:
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def push_results() -> None:
+        while True:
+            await changed.wait()
+            changed.clear()
+            message = await session.recompute()
+            if message is None:
+                continue
+            # Input that arrived while computing sets the event again, and
+            # the next pass works from the latest state
+            if changed.is_set():
+                session.dropped()
+                continue
+            await send(message)
+            session.sent()
+
+    pusher = asyncio.create_task(push_results())
+    try:
+        await send(session.describe())
+        while True:
+            frame = await asyncio.wait_for(websocket.receive(), SESSION_IDLE_SECONDS)
+            if frame["type"] == "websocket.disconnect":
+                break
+            try:
+                # Binary frames are accepted as UTF-8 encoded JSON
+                text = frame.get("text")
+                session.apply(json.loads(text if text is not None else frame.get("bytes") or b""))
+            except ValueError as e:
+                await send({"error": str(e)})
+                continue
+            changed.set()
+            if pusher.done():
+                # Surface a failure of the push loop instead of going quiet
+                pusher.result()
+    except asyncio.TimeoutError:
+        await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Session idle")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        pusher.cancel()
+        session.close()
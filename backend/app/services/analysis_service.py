@@ -0,0 +1,312 @@
+"""
+Analysis Services
+Sensitivity grids evaluated over two input fields in one vectorized pass,
+and goal seek: the input value at which a calculator output reaches a target
+"""
+import math
+
+import numpy as np
+from annotated_types import Ge, Gt, Le, Lt
+from app.config import MAX_GRID_CELLS
+from app.services.solver import brent
+from app.services.vectorized_utils import (
+    sip_growth_columns,
+    sip_need_columns,
+    retirement_columns,
+    goal_columns,
+    other_goal_columns
+)
+from app.models.financial import (
+    SIPGrowthInput, SIPGrowthOutput,
+    SIPNeedInput, SIPNeedOutput
+)
+from app.models.life_goal import (
+    RetirementInput, RetirementOutput,
+    EducationInput, EducationOutput,
+    MarriageInput, MarriageOutput,
+    OtherGoalInput, OtherGoalOutput
+)
+from app.models.analysis import (
+    GridAxis, GridCellError, SensitivityGridInput, SensitivityGridOutput,
+    GoalSeekInput, GoalSeekOutput
+)
+
+
+# Calculator name -> (input model, output model, column-wise kernel)
+GRID_CALCULATORS = {
+    "sip-growth": (SIPGrowthInput, SIPGrowthOutput, sip_growth_columns),
+    "sip-need": (SIPNeedInput, SIPNeedOutput, sip_need_columns),
+    "retirement": (RetirementInput, RetirementOutput, retirement_columns),
+    "education": (EducationInput, EducationOutput, goal_columns),
+    "marriage": (MarriageInput, MarriageOutput, goal_columns),
+    "other-goal": (OtherGoalInput, OtherGoalOutput, other_goal_columns),
+}
+
+# Values of the free field evaluated in one vectorized pass to bracket the solution
+GOAL_SEEK_SCAN_POINTS = 64
+
+# Search limit for fields without an upper bound (amounts); their scan is geometric from
+# GOAL_SEEK_MIN_AMOUNT so small and large amounts are bracketed equally well
+GOAL_SEEK_MAX_AMOUNT = 1e15
+GOAL_SEEK_MIN_AMOUNT = 1e-2
+
+
+def numeric_fields(model) -> dict:
+    """Input fields of a model that take int or float values"""
+    return {
+        name: field.annotation
+        for name, field in model.model_fields.items()
+        if field.annotation in (int, float)
+    }
+
+
+def axis_count(axis: GridAxis) -> int:
+    """Number of values along a grid axis, worked out without building them"""
+    if not all(math.isfinite(value) for value in (axis.start, axis.stop, axis.step)):
+        raise ValueError(f"Axis '{axis.field}': start, stop and step must be finite")
+    if axis.step <= 0:
+        raise ValueError(f"Axis '{axis.field}': step must be positive")
+    if axis.stop < axis.start:
+        raise ValueError(f"Axis '{axis.field}': stop must not be less than start")
+    return int(math.floor((axis.stop - axis.start) / axis.step + 1e-9)) + 1
+
+
+def axis_values(axis: GridAxis, field_type) -> np.ndarray:
+    """Inclusive range of values along a grid axis"""
+    values = axis.start + axis.step * np.arange(axis_count(axis))
+
+    if field_type is int:
+        if not (float(axis.start).is_integer() and float(axis.step).is_integer()):
+            raise ValueError(f"Axis '{axis.field}': start and step must be whole numbers")
+        values = np.rint(values).astype(int)
+    return values
+
+
+def field_bounds(model, name: str) -> tuple:
+    """(low, high) allowed by a field's ge/gt/le/lt constraints; open bounds are stepped inside"""
+    low, high = -math.inf, math.inf
+    for constraint in model.model_fields[name].metadata:
+        if isinstance(constraint, Ge):
+            low = max(low, constraint.ge)
+        elif isinstance(constraint, Gt):
+            low = max(low, math.nextafter(constraint.gt, math.inf))
+        elif isinstance(constraint, Le):
+            high = min(high, constraint.le)
+        elif isinstance(constraint, Lt):
+            high = min(high, math.nextafter(constraint.lt, -math.inf))
+    return low, high
+
+
+def _scan_values(low: float, high: float, field_type) -> np.ndarray:
+    """Values of the free field to scan for a sign change"""
+    if field_type is int:
+        low, high = math.ceil(low), math.floor(high)
+        if high - low + 1 > MAX_GRID_CELLS:
+            raise ValueError(f"Search range has {high - low + 1} values; the limit is {MAX_GRID_CELLS}")
+        return np.arange(low, high + 1)
+    if low >= 0 and high / max(low, GOAL_SEEK_MIN_AMOUNT) > 1e3:
+        start = max(low, GOAL_SEEK_MIN_AMOUNT)
+        values = np.geomspace(start, high, GOAL_SEEK_SCAN_POINTS)
+        return np.concatenate(([low], values)) if low < start else values
+    return np.linspace(low, high, GOAL_SEEK_SCAN_POINTS)
+
+
+def _evaluate(kernel, columns: dict, field: str, output: str, values: np.ndarray) -> np.ndarray:
+    """One output of a kernel at each value of the free field; NaN where the inputs are invalid"""
+    try:
+        result = kernel(**{**columns, field: values})[output]
+    except ValueError:
+        if values.size == 1:
+            return np.full(values.shape, np.nan)
+        # A cross-field rule (retirement after the present age) fails for
+        # part of the range; split it so the valid part is still vectorized
+        middle = values.size // 2
+        return np.concatenate((
+            _evaluate(kernel, columns, field, output, values[:middle]),
+            _evaluate(kernel, columns, field, output, values[middle:])
+        ))
+    with np.errstate(invalid="ignore"):
+        result = np.broadcast_to(result, values.shape).astype(float)
+    return np.where(np.isfinite(result), result, np.nan)
+
+
+def _evaluate_grid(kernel, columns: dict, x_field: str, x_values: np.ndarray, y_field: str, y_values: np.ndarray,
+                   outputs: list) -> tuple:
+    """
+    Outputs over the grid (rows along y), NaN in cells whose inputs are
+    invalid, and the errors of those cells
+    """
+    shape = (y_values.size, x_values.size)
+    try:
+        result = kernel(**{**columns, x_field: x_values[np.newaxis, :], y_field: y_values[:, np.newaxis]})
+        return {name: np.broadcast_to(result[name], shape).astype(float) for name in outputs}, []
+    except ValueError:
+        pass
+
+    # A cross-field rule (retirement after the present age) fails for some
+    # cells; evaluate row by row, and cell by cell in the rows that fail
+    grid = {name: np.full(shape, np.nan) for name in outputs}
+    errors = []
+    for row, y in enumerate(y_values):
+        try:
+            result = kernel(**{**columns, x_field: x_values, y_field: y})
+            for name in outputs:
+                grid[name][row] = result[name]
+            continue
+        except ValueError:
+            pass
+        for column, x in enumerate(x_values):
+            try:
+                result = kernel(**{**columns, x_field: x, y_field: y})
+            except ValueError as e:
+                errors.append(GridCellError(x=x.item(), y=y.item(), error=str(e)))
+                continue
+            for name in outputs:
+                grid[name][row, column] = result[name]
+    return grid, errors
+
+
+class SensitivityGridCalculator:
+    """Two-parameter sensitivity surface for SIP and goal calculators"""
+
+    @staticmethod
+    def calculate(data: SensitivityGridInput) -> SensitivityGridOutput:
+        input_model, output_model, kernel = GRID_CALCULATORS[data.calculator]
+        fields = numeric_fields(input_model)
+
+        for axis in (data.x, data.y):
+            if axis.field not in fields:
+                raise ValueError(f"'{axis.field}' is not a numeric input of the {data.calculator} calculator")
+        if data.x.field == data.y.field:
+            raise ValueError("Grid axes must vary two different fields")
+
+        outputs = data.outputs or [
+            name for name, field in output_model.model_fields.items()
+            if field.annotation in (int, float)
+        ]
+        unknown = [name for name in outputs if name not in output_model.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown output fields: {', '.join(unknown)}")
+
+        # The steps come from the client, so the size is checked before any
+        # axis is built
+        cells = axis_count(data.x) * axis_count(data.y)
+        if cells > MAX_GRID_CELLS:
+            raise ValueError(f"Grid has {cells} cells; the limit is {MAX_GRID_CELLS}")
+        x_values = axis_values(data.x, fields[data.x.field])
+        y_values = axis_values(data.y, fields[data.y.field])
+
+        # Field constraints are simple bounds, so validating the four corners
+        # validates every cell without building a model per cell; rules across
+        # fields are the kernel's, and cells breaking them come back as null
+        base = None
+        for x in (x_values[0], x_values[-1]):
+            for y in (y_values[0], y_values[-1]):
+                corner = input_model.model_validate({
+                    **data.inputs,
+                    data.x.field: x.item(),
+                    data.y.field: y.item()
+                })
+                base = base or corner
+
+        grid, errors = _evaluate_grid(kernel, base.model_dump(), data.x.field, x_values, data.y.field, y_values, outputs)
+        if errors:
+            results = {name: np.where(np.isnan(values), None, values).tolist() for name, values in grid.items()}
+        else:
+            results = {name: values.tolist() for name, values in grid.items()}
+
+        return SensitivityGridOutput(
+            calculator=data.calculator,
+            x_field=data.x.field,
+            x_values=x_values.tolist(),
+            y_field=data.y.field,
+            y_values=y_values.tolist(),
+            results=results,
+            errors=errors
+        )
+
+
+class GoalSeekCalculator:
+    """Inverse of a SIP or goal calculator: solves one input for a target output"""
+
+    @staticmethod
+    def calculate(data: GoalSeekInput) -> GoalSeekOutput:
+        input_model, output_model, kernel = GRID_CALCULATORS[data.calculator]
+        fields = numeric_fields(input_model)
+        if data.field not in fields:
+            raise ValueError(f"'{data.field}' is not a numeric input of the {data.calculator} calculator")
+        outputs = numeric_fields(output_model)
+        if data.output not in outputs:
+            raise ValueError(f"'{data.output}' is not a numeric output of the {data.calculator} calculator")
+
+        low, high = field_bounds(input_model, data.field)
+        if data.low is not None:
+            low = max(low, data.low)
+        if data.high is not None:
+            high = min(high, data.high)
+        low, high = max(low, -GOAL_SEEK_MAX_AMOUNT), min(high, GOAL_SEEK_MAX_AMOUNT)
+        if low > high:
+            raise ValueError(f"Search range for '{data.field}' is empty")
+
+        field_type = fields[data.field]
+        values = _scan_values(low, high, field_type)
+        # Validated with the free field at the bottom of the range; only
+        # that field varies, and its range is within the field bounds
+        base = input_model.model_validate({**data.inputs, data.field: values[0].item()})
+        columns = base.model_dump()
+
+        # Bracket the first solution along the range in one vectorized pass
+        gaps = _evaluate(kernel, columns, data.field, data.output, values) - data.target
+        valid = ~np.isnan(gaps)
+        values, gaps = values[valid], gaps[valid]
+        crossings = np.flatnonzero((gaps[:-1] == 0) | (np.sign(gaps[:-1]) != np.sign(gaps[1:])))
+        if gaps.size and gaps[-1] == 0:
+            crossings = np.append(crossings, gaps.size - 1)
+        if not crossings.size:
+            if not gaps.size:
+                raise ValueError(f"No valid '{data.field}' between {low:g} and {high:g}")
+            reached = gaps + data.target
+            raise ValueError(
+                f"No '{data.field}' between {low:g} and {high:g} gives {data.output} = {data.target:g}; "
+                f"it ranges from {reached.min():g} to {reached.max():g}"
+            )
+        index = crossings[0]
+        bracket_low = values[index].item()
+        bracket_high = values[min(index + 1, values.size - 1)].item()
+
+        # Counters are cumulative: the scan is one iteration evaluating every
+        # scan point, and Brent adds its own (the bracket ends come from the scan)
+        iterations, calls = 1, int(valid.size)
+        if gaps[index] == 0:
+            value, converged, method = bracket_low, True, "scan"
+        elif field_type is int:
+            # Whole-number fields: the first value at which the output reaches the target
+            value, converged, method = bracket_high, True, "scan"
+        else:
+            def gap(x: float) -> float:
+                return float(kernel(**{**columns, data.field: x})[data.output]) - data.target
+
+            result = brent(gap, bracket_low, bracket_high, f_low=gaps[index].item(), f_high=gaps[index + 1].item())
+            value, converged, method = result.root, result.converged, result.method
+            iterations += result.iterations
+            calls += result.function_calls
+
+        solved = input_model.model_validate({**data.inputs, data.field: value})
+        achieved = float(kernel(**{**columns, data.field: getattr(solved, data.field)})[data.output])
+        return GoalSeekOutput(
+            calculator=data.calculator,
+            field=data.field,
+            output=data.output,
+            target=data.target,
+            value=value,
+            achieved=achieved,
+            residual=achieved - data.target,
+            converged=converged,
+            method=method,
+            iterations=iterations,
+            function_calls=calls,
+            scan_points=int(valid.size),
+            bracket_low=bracket_low,
+            bracket_high=bracket_high,
+            inputs=solved.model_dump()
+        )
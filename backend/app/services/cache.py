@@ -0,0 +1,238 @@
+"""
+Result cache for calculator outputs
+Calculator outputs are pure functions of their inputs, so results are cached
+under a canonical hash of the normalized input model. A bounded in-process
+LRU tier (with TTL) sits in front of an optional tier shared by all workers.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel
+from app.config import (
+    CACHE_ENABLED, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_SHARED_DIR, CACHE_MAX_LIST_ENTRIES
+)
+from app.metrics import registry, Collected
+
+
+def canonical_json(data: BaseModel) -> str:
+    """Normalized JSON of a model: defaults filled in, keys sorted, no whitespace"""
+    return json.dumps(data.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+
+
+def cache_key(namespace: str, data: BaseModel, *extra: Any) -> str:
+    """Stable hash of a calculator name, its input model and any extra arguments"""
+    payload = namespace + "\n" + canonical_json(data)
+    if extra:
+        payload += "\n" + json.dumps([str(value) for value in extra])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SharedDirectoryCache:
+    """
+    Cross-worker tier backed by a directory of JSON files
+    A local stand-in for a shared store such as Redis; entries are written
+    atomically and expire after ttl seconds
+    """
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.errors = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path) as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):
+            self.errors += 1
+            self.misses += 1
+            return None
+        if entry["expires"] < time.time():
+            self.expirations += 1
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        self.hits += 1
+        return entry["value"]
+
+    def set(self, key: str, value: str) -> None:
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as handle:
+                json.dump({"expires": time.time() + self.ttl, "value": value}, handle)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "errors": self.errors,
+        }
+
+
+class TieredCache:
+    """In-process LRU in front of an optional shared tier"""
+
+    def __init__(self, local: LRUCache, shared: Optional[SharedDirectoryCache] = None):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key: str, model: type) -> Optional[BaseModel]:
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+        payload = self.shared.get(key)
+        if payload is None:
+            return None
+        value = model.model_validate_json(payload)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: BaseModel) -> None:
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value.model_dump_json())
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"enabled": CACHE_ENABLED, "local": self.local.stats()}
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+
+calculation_cache = TieredCache(
+    LRUCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS),
+    SharedDirectoryCache(CACHE_SHARED_DIR, CACHE_TTL_SECONDS) if CACHE_SHARED_DIR else None
+)
+
+
+def _cache_counts(field: str) -> dict:
+    stats = calculation_cache.stats()
+    tiers = {"local": stats["local"]}
+    if "shared" in stats:
+        tiers["shared"] = stats["shared"]
+    return {(tier,): counts[field] for tier, counts in tiers.items() if field in counts}
+
+
+def _cache_hit_ratio() -> dict:
+    ratios = {}
+    for (tier,), hits in _cache_counts("hits").items():
+        lookups = hits + _cache_counts("misses")[(tier,)]
+        ratios[(tier,)] = hits / lookups if lookups else 0.0
+    return ratios
+
+
+registry.register(Collected("calculation_cache_hits_total", "Result cache hits", "counter", ("tier",),
+                            lambda: _cache_counts("hits")))
+registry.register(Collected("calculation_cache_misses_total", "Result cache misses", "counter", ("tier",),
+                            lambda: _cache_counts("misses")))
+registry.register(Collected("calculation_cache_evictions_total", "Result cache LRU evictions", "counter", ("tier",),
+                            lambda: _cache_counts("evictions")))
+registry.register(Collected("calculation_cache_entries", "Entries in the in-process result cache", "gauge", ("tier",),
+                            lambda: _cache_counts("entries")))
+registry.register(Collected("calculation_cache_hit_ratio", "Result cache hits / lookups since start", "gauge", ("tier",),
+                            _cache_hit_ratio))
+
+
+def _list_entries(data: BaseModel) -> int:
+    return sum(len(value) for value in data.__dict__.values() if isinstance(value, list))
+
+
+def cached_calculation(func: Callable) -> Callable:
+    """
+    Cache a calculator method keyed on its input model (and any extra arguments)
+    Cached outputs are shared between callers and must be treated as read-only;
+    outputs with nested lists are frozen models. Inputs with more than
+    CACHE_MAX_LIST_ENTRIES list entries bypass the cache.
+    """
+    output_model = inspect.signature(func).return_annotation
+    namespace = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(data: BaseModel, *args):
+        if not CACHE_ENABLED or _list_entries(data) > CACHE_MAX_LIST_ENTRIES:
+            return func(data, *args)
+        key = cache_key(namespace, data, *args)
+        result = calculation_cache.get(key, output_model)
+        if result is None:
+            result = func(data, *args)
+            calculation_cache.set(key, result)
+        return result
+
+    return wrapper
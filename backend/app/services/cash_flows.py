@@ -0,0 +1,209 @@
+"""
+Irregular cash flow input
+Timing of CashFlow models, and the upload parser: an uploaded CSV, NDJSON or
+JSON-array body is parsed incrementally into two array('d') columns, amounts
+and times in years, so a large ledger never becomes a list of Pydantic objects
+"""
+import csv
+import json
+import math
+from array import array
+from datetime import date
+from typing import Optional
+
+from app.models.quick_tools import CashFlow
+
+# Dated flows are timed Actual/365 from the valuation date
+DAYS_PER_YEAR = 365.0
+
+# Bounds of the whole-number timing fields, as on CashFlow
+_PERIOD_BOUNDS = {"years": (1, 50), "months": (1, 600)}
+
+_WHITESPACE = " \t\r\n"
+
+
+class UploadTooLarge(ValueError):
+    """An upload has more cash flows than MAX_CASH_FLOWS"""
+
+
+def flow_years(flow: CashFlow, valuation_date: date) -> float:
+    """Time of a cash flow in years from the valuation date"""
+    if flow.years is not None:
+        return flow.years
+    if flow.months is not None:
+        return flow.months / 12
+    return (flow.payment_date - valuation_date).days / DAYS_PER_YEAR
+
+
+class CashFlowColumns:
+    """Cash flow amounts and times (years from the valuation date), column-wise"""
+    __slots__ = ("amounts", "times")
+
+    def __init__(self):
+        self.amounts = array("d")
+        self.times = array("d")
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+
+class CashFlowReader:
+    """
+    Incremental parser for uploaded cash flows
+    feed() takes decoded text in chunks of any size and close() returns the
+    columns. Rows name their amount and exactly one of years, months or
+    payment_date, like CashFlow:
+        csv     header row, then one flow per line
+        ndjson  one JSON object per line
+        json    a JSON array of objects
+    Invalid rows raise ValueError naming the row; more than max_flows rows
+    raise UploadTooLarge.
+    """
+
+    def __init__(self, format: str, valuation_date: date, max_flows: int):
+        if format not in ("csv", "ndjson", "json"):
+            raise ValueError(f"Unsupported cash flow format '{format}'")
+        self.format = format
+        self.valuation_date = valuation_date
+        self.max_flows = max_flows
+        self.columns = CashFlowColumns()
+        self._buffer = ""
+        self._header: Optional[list] = None
+        # CSV record still inside a quoted field (one with a line break in it)
+        self._record = ""
+        # JSON array position: before "[", expecting an item, after an item, or past "]"
+        self._state = "start"
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> None:
+        self._buffer += text
+        if self.format == "json":
+            self._parse_array(final=False)
+        else:
+            complete, newline, self._buffer = self._buffer.rpartition("\n")
+            if newline:
+                self._parse_lines(complete.split("\n"))
+
+    def close(self) -> CashFlowColumns:
+        if self.format == "json":
+            self._parse_array(final=True)
+            if self._state != "done":
+                raise ValueError("Cash flow upload ended before the closing ]")
+        elif self._buffer or self._record:
+            self._parse_lines([self._buffer])
+            if self._record:
+                raise ValueError(f"Cash flow {len(self.columns) + 1}: CSV ends inside a quoted field")
+        self._buffer = ""
+        if not len(self.columns):
+            raise ValueError("Upload contains no cash flows")
+        return self.columns
+
+    def _add(self, row: dict) -> None:
+        number = len(self.columns.amounts) + 1
+        if number > self.max_flows:
+            raise UploadTooLarge(f"Upload has more than {self.max_flows} cash flows")
+        try:
+            amount = float(row.get("amount"))
+        except (TypeError, ValueError):
+            raise ValueError(f"Cash flow {number}: amount must be a number")
+        if not math.isfinite(amount):
+            raise ValueError(f"Cash flow {number}: amount must be finite")
+
+        timing = [name for name in ("years", "months", "payment_date") if row.get(name) not in (None, "")]
+        if len(timing) != 1:
+            raise ValueError(f"Cash flow {number}: give exactly one of years, months or payment_date")
+        name = timing[0]
+        value = row[name]
+        if name == "payment_date":
+            try:
+                time = (date.fromisoformat(value) - self.valuation_date).days / DAYS_PER_YEAR
+            except (TypeError, ValueError):
+                raise ValueError(f"Cash flow {number}: payment_date must be a YYYY-MM-DD date")
+        else:
+            low, high = _PERIOD_BOUNDS[name]
+            try:
+                period = int(value) if not isinstance(value, float) or value.is_integer() else None
+            except (TypeError, ValueError):
+                period = None
+            if period is None or not low <= period <= high:
+                raise ValueError(f"Cash flow {number}: {name} must be a whole number from {low} to {high}")
+            time = period if name == "years" else period / 12
+
+        self.columns.amounts.append(amount)
+        self.columns.times.append(time)
+
+    def _parse_lines(self, lines: list) -> None:
+        if self.format == "ndjson":
+            for line in lines:
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        raise ValueError(f"Cash flow {len(self.columns) + 1}: invalid JSON")
+                    if not isinstance(row, dict):
+                        raise ValueError(f"Cash flow {len(self.columns) + 1}: expected a JSON object")
+                    self._add(row)
+            return
+        for cells in csv.reader(record for record in self._csv_records(lines) if record.strip()):
+            cells = [cell.strip() for cell in cells]
+            if self._header is None:
+                self._header = [cell.lower() for cell in cells]
+                if "amount" not in self._header:
+                    raise ValueError("CSV header must name an amount column")
+                continue
+            self._add(dict(zip(self._header, cells)))
+
+    def _csv_records(self, lines: list):
+        """
+        Whole CSV records from lines: a line that leaves a quoted field open is
+        joined with the lines after it (in this or later chunks), so
+        csv.reader sees quoted line breaks. Quotes are balanced at the end
+        of a record; an escaped quote ("") counts twice.
+        """
+        for line in lines:
+            record = self._record + line + "\n"
+            if record.count('"') % 2:
+                self._record = record
+            else:
+                self._record = ""
+                yield record
+
+    def _parse_array(self, final: bool) -> None:
+        buffer = self._buffer
+        position = 0
+        size = len(buffer)
+        while True:
+            while position < size and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == size:
+                break
+            char = buffer[position]
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError("Expected a JSON array of cash flows")
+                self._state = "item"
+                position += 1
+            elif self._state == "after":
+                if char not in ",]":
+                    raise ValueError(f"Cash flow {len(self.columns)}: expected , or ] after it")
+                self._state = "item" if char == "," else "done"
+                position += 1
+            elif self._state == "done":
+                raise ValueError("Unexpected data after the cash flow array")
+            elif char == "]" and not len(self.columns):
+                self._state = "done"
+                position += 1
+            else:
+                try:
+                    row, end = self._decoder.raw_decode(buffer, position)
+                except ValueError:
+                    if final:
+                        raise ValueError(f"Cash flow {len(self.columns) + 1}: invalid JSON")
+                    # Item continues in the next chunk
+                    break
+                if not isinstance(row, dict):
+                    raise ValueError(f"Cash flow {len(self.columns) + 1}: expected a JSON object")
+                self._add(row)
+                self._state = "after"
+                position = end
+        self._buffer = buffer[position:]
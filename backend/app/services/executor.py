@@ -0,0 +1,114 @@
+"""
+Calculation executor
+Runs calculator calls inline when they are cheap and offloads heavy ones
+(large batches, simulations, sensitivity grids) to a thread or process pool,
+so a single expensive request can't stall the event loop
+"""
+import asyncio
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel
+from app.config import EXECUTOR_MODE, EXECUTOR_WORKERS, OFFLOAD_COST_THRESHOLD
+from app.metrics import registry, Counter
+
+# Estimated cost, in microseconds, of the units of work a calculation does
+# (measured with python -m benchmarks)
+CALL_COST = 10.0
+LIST_ENTRY_COST = 0.5
+VECTOR_ENTRY_COST = 0.02
+BATCH_ITEM_COST = 5.0
+PATH_YEAR_COST = 0.12
+GRID_CELL_COST = 3.0
+HOLDING_YEAR_COST = 0.5
+# One scan of the search range plus a Brent refinement
+GOAL_SEEK_COST = 1500.0
+
+CALCULATIONS = registry.register(Counter(
+    "calculations_total", "Calculator calls by where they ran (inline or offloaded)", ("placement",)))
+
+_executor: Optional[Executor] = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if EXECUTOR_MODE == "process":
+            _executor = ProcessPoolExecutor(max_workers=EXECUTOR_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="calculation")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _forget_executor() -> None:
+    # A forked child inherits the pool object but not its worker threads (or
+    # its process pool's management thread); the pool would still believe it
+    # has idle workers and queue every job forever, so the child builds its own
+    global _executor
+    _executor = None
+
+
+os.register_at_fork(after_in_child=_forget_executor)
+
+
+def _list_entries(data: BaseModel) -> int:
+    return sum(len(value) for value in data.__dict__.values() if isinstance(value, list))
+
+
+def _simulated_years(inputs: BaseModel) -> int:
+    if hasattr(inputs, "years_remaining"):
+        return inputs.years_remaining
+    return max(1, inputs.life_expectancy - inputs.present_age)
+
+
+def _axis_points(axis) -> int:
+    # Axes the calculator rejects cost next to nothing
+    if not all(math.isfinite(value) for value in (axis.start, axis.stop, axis.step)):
+        return 1
+    if axis.step <= 0 or axis.stop < axis.start:
+        return 1
+    return int(math.floor((axis.stop - axis.start) / axis.step + 1e-9)) + 1
+
+
+def estimate_cost(data: Any) -> float:
+    """Rough cost of calculating `data`, in microseconds"""
+    if isinstance(data, list):
+        return sum(BATCH_ITEM_COST + LIST_ENTRY_COST * _list_entries(item) for item in data)
+    if not isinstance(data, BaseModel):
+        # Column data, such as uploaded cash flows, valued with NumPy
+        return CALL_COST + VECTOR_ENTRY_COST * len(data)
+    settings = getattr(data, "simulation", None)
+    if settings is not None:
+        return CALL_COST + PATH_YEAR_COST * settings.paths * _simulated_years(data.inputs)
+    if hasattr(data, "x") and hasattr(data, "y"):
+        return CALL_COST + GRID_CELL_COST * _axis_points(data.x) * _axis_points(data.y)
+    if hasattr(data, "target") and hasattr(data, "field"):
+        return CALL_COST + GOAL_SEEK_COST
+    if hasattr(data, "rebalance"):
+        return CALL_COST + HOLDING_YEAR_COST * len(data.assets) * data.years
+    return CALL_COST + LIST_ENTRY_COST * _list_entries(data)
+
+
+async def run_calculation(func: Callable, data: Any, cost: Optional[float] = None) -> Any:
+    """
+    Call func(data), offloading it to the executor when its estimated cost
+    reaches OFFLOAD_COST_THRESHOLD microseconds
+    In process mode func and data must be picklable (module-level functions
+    and staticmethods, Pydantic models)
+    """
+    if cost is None:
+        cost = estimate_cost(data)
+    if EXECUTOR_MODE == "inline" or cost < OFFLOAD_COST_THRESHOLD:
+        CALCULATIONS.inc("inline")
+        return func(data)
+    CALCULATIONS.inc("offloaded")
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, data)
@@ -2,18 +2,35 @@
 Financial Calculators Services
 SIP Growth, SIP Need, SIP Delay Cost, SWP Calculator
 """
-from datetime import datetime, timedelta
-from app.services.financial_utils import (
-    future_value_sip,
-    calculate_sip_needed,
-    total_sip_invested,
-    calculate_swp_duration
+from datetime import date
+from typing import List, Optional
+from app.services.cache import cached_calculation
+from app.services.kernels import (
+    sip_growth,
+    sip_need,
+    sip_delay,
+    swp,
+    swp_max_withdrawal,
+    sip_schedule,
+    swp_schedule,
+    Schedule
+)
+from app.services.financial_utils import future_value_lumpsum
+from app.services.vectorized_utils import (
+    sip_growth_columns,
+    sip_need_columns,
+    sip_delay_columns,
+    swp_columns,
+    batch_calculation,
+    to_columns,
+    from_columns
 )
 from app.models.financial import (
     SIPGrowthInput, SIPGrowthOutput,
     SIPNeedInput, SIPNeedOutput,
     SIPDelayInput, SIPDelayOutput,
-    SWPInput, SWPOutput
+    SWPInput, SWPOutput,
+    SWPMaxWithdrawalInput, SWPMaxWithdrawalOutput
 )
 
 
@@ -21,148 +38,125 @@ class SIPGrowthCalculator:
     """SIP Growth Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: SIPGrowthInput) -> SIPGrowthOutput:
-        # Calculate future value
-        future_value = future_value_sip(
+        result = sip_growth(
             data.monthly_investment,
-            data.expected_returns,
             data.period_years,
+            data.expected_returns,
             data.growth_in_savings
         )
-        
-        # Total invested
-        total_invested = total_sip_invested(
+        return SIPGrowthOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[SIPGrowthInput]) -> List[SIPGrowthOutput]:
+        return from_columns(SIPGrowthOutput, sip_growth_columns(**to_columns(items)))
+    
+    @staticmethod
+    def schedule(data: SIPGrowthInput, granularity: str = "year") -> Schedule:
+        """Month-by-month or year-by-year contributions, returns and balance"""
+        schedule = sip_schedule(
             data.monthly_investment,
+            data.expected_returns,
             data.period_years,
             data.growth_in_savings
         )
-        
-        # Wealth gain
-        wealth_gain = future_value - total_invested
-        
-        # Growth multiple
-        growth_multiple = future_value / total_invested if total_invested > 0 else 0
-        
-        return SIPGrowthOutput(
-            future_value=future_value,
-            total_invested=total_invested,
-            wealth_gain=wealth_gain,
-            growth_multiple=growth_multiple
-        )
+        return schedule.yearly() if granularity == "year" else schedule
 
 
 class SIPNeedCalculator:
     """SIP Need Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: SIPNeedInput) -> SIPNeedOutput:
-        # Adjust target for inflation
-        target_adjusted = data.target_amount * pow(1 + data.inflation / 100, data.period_years)
-        
-        # Calculate monthly SIP needed
-        monthly_sip = calculate_sip_needed(
-            target_adjusted,
-            data.expected_returns,
-            data.period_years,
-            data.growth_in_savings
-        )
-        
-        # Total investment
-        projected_investment = total_sip_invested(
-            monthly_sip,
+        result = sip_need(
+            data.target_amount,
             data.period_years,
+            data.expected_returns,
+            data.inflation,
             data.growth_in_savings
         )
-        
-        # Growth multiple
-        growth_multiple = target_adjusted / projected_investment if projected_investment > 0 else 0
-        
-        return SIPNeedOutput(
-            monthly_sip=monthly_sip,
-            target_amount_adjusted=target_adjusted,
-            projected_investment=projected_investment,
-            growth_multiple=growth_multiple
-        )
+        return SIPNeedOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[SIPNeedInput]) -> List[SIPNeedOutput]:
+        return from_columns(SIPNeedOutput, sip_need_columns(**to_columns(items)))
 
 
 class SIPDelayCalculator:
     """SIP Delay Cost Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: SIPDelayInput) -> SIPDelayOutput:
-        # FV without delay
-        fv_without_delay = future_value_sip(
+        result = sip_delay(
             data.monthly_investment,
-            data.expected_returns,
             data.period_years,
-            0
-        )
-        
-        # FV with delay
-        delay_years = data.delay_months / 12
-        reduced_period = data.period_years - delay_years
-        
-        if reduced_period <= 0:
-            fv_with_delay = 0
-        else:
-            fv_with_delay = future_value_sip(
-                data.monthly_investment,
-                data.expected_returns,
-                reduced_period,
-                0
-            )
-        
-        # Delay cost
-        delay_cost = fv_without_delay - fv_with_delay
-        
-        return SIPDelayOutput(
-            delay_cost=delay_cost,
-            future_value_without_delay=fv_without_delay,
-            future_value_with_delay=fv_with_delay
+            data.expected_returns,
+            data.delay_months
         )
+        return SIPDelayOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[SIPDelayInput]) -> List[SIPDelayOutput]:
+        return from_columns(SIPDelayOutput, sip_delay_columns(**to_columns(items)))
 
 
 class SWPCalculator:
     """SWP (Systematic Withdrawal Plan) Calculator"""
     
     @staticmethod
-    def calculate(data: SWPInput) -> SWPOutput:
-        # If SWP starts after some years, grow the initial investment
-        if data.swp_start_years > 0:
-            initial = data.initial_investment * pow(
-                1 + data.expected_returns / 100,
-                data.swp_start_years
-            )
-        else:
-            initial = data.initial_investment
-        
-        # Calculate SWP duration
-        months_lasted, remaining_value = calculate_swp_duration(
-            initial,
+    def calculate(data: SWPInput, today: Optional[date] = None) -> SWPOutput:
+        # Instalment dates are counted from the investment date, which defaults
+        # to today, so the date is part of the cache key
+        return SWPCalculator._calculate(data, data.start_date or today or date.today())
+    
+    @staticmethod
+    @cached_calculation
+    def _calculate(data: SWPInput, today: date) -> SWPOutput:
+        result = swp(
+            data.initial_investment,
             data.monthly_withdrawal,
             data.expected_returns,
             data.yearly_increase,
-            data.increase_withdrawal
+            data.increase_withdrawal,
+            data.swp_start_years,
+            today
         )
-        
-        # Total withdrawn
-        if data.increase_withdrawal:
-            total_withdrawn = 0
-            current_withdrawal = data.monthly_withdrawal
-            for month in range(1, months_lasted + 1):
-                if month > 1 and (month - 1) % 12 == 0:
-                    current_withdrawal = current_withdrawal * (1 + data.yearly_increase / 100)
-                total_withdrawn += current_withdrawal
-        else:
-            total_withdrawn = data.monthly_withdrawal * months_lasted
-        
-        # Calculate last instalment date
-        start_date = datetime.now() + timedelta(days=365 * data.swp_start_years)
-        last_date = start_date + timedelta(days=30 * months_lasted)
-        
-        return SWPOutput(
-            period_end_value=remaining_value,
-            total_withdrawn=total_withdrawn,
-            full_instalments=months_lasted,
-            last_instalment_date=last_date.strftime("%d-%B-%Y")
+        return SWPOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[SWPInput]) -> List[SWPOutput]:
+        return from_columns(SWPOutput, swp_columns(**to_columns(items)))
+    
+    @staticmethod
+    @cached_calculation
+    def max_withdrawal(data: SWPMaxWithdrawalInput) -> SWPMaxWithdrawalOutput:
+        """Largest first monthly withdrawal that lasts data.years and leaves the residual value"""
+        result = swp_max_withdrawal(
+            data.initial_investment,
+            data.expected_returns,
+            data.yearly_increase,
+            data.increase_withdrawal,
+            data.swp_start_years,
+            data.years,
+            data.residual_value
+        )
+        return SWPMaxWithdrawalOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    def schedule(data: SWPInput, granularity: str = "year") -> Schedule:
+        """Month-by-month or year-by-year withdrawals, returns and balance"""
+        schedule = swp_schedule(
+            future_value_lumpsum(data.initial_investment, data.expected_returns, data.swp_start_years),
+            data.monthly_withdrawal,
+            data.expected_returns,
+            data.yearly_increase,
+            data.increase_withdrawal
         )
+        return schedule.yearly() if granularity == "year" else schedule
@@ -3,6 +3,9 @@ Core financial calculation utilities
 Standard financial mathematics formulas
 """
 import math
+from functools import lru_cache
+from app.config import FACTOR_CACHE_SIZE
+from app.metrics import registry, Collected, count_kernel
 
 
 def future_value_lumpsum(present_value: float, rate: float, years: int) -> float:
@@ -25,10 +28,11 @@ def present_value_lumpsum(future_value: float, rate: float, years: int) -> float
     return future_value / math.pow(1 + rate / 100, years)
 
 
-def future_value_sip(monthly_investment: float, annual_rate: float, years: int, growth_rate: float = 0) -> float:
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def sip_factor(annual_rate: float, years: int, growth_rate: float = 0) -> float:
     """
-    Calculate future value of SIP with optional step-up
-    Uses month-by-month calculation for accuracy
+    Future value of a 1-rupee monthly SIP with optional step-up (memoized)
+    Instalments are paid at the start of each month (annuity due)
     """
     monthly_rate = annual_rate / 12 / 100
     months = years * 12
@@ -36,79 +40,97 @@ def future_value_sip(monthly_investment: float, annual_rate: float, years: int,
     if growth_rate == 0:
         # Standard SIP formula
         if monthly_rate == 0:
-            return monthly_investment * months
-        fv = monthly_investment * ((math.pow(1 + monthly_rate, months) - 1) / monthly_rate) * (1 + monthly_rate)
-        return fv
+            return months
+        return ((math.pow(1 + monthly_rate, months) - 1) / monthly_rate) * (1 + monthly_rate)
+    
+    # Step-up SIP - closed form
+    # Each year's 12 instalments form a geometric series, and the yearly
+    # blocks form a growing annuity (SIP grows by the step-up rate, while
+    # each later block compounds for 12 fewer months)
+    full_years, partial_months = divmod(int(round(months)), 12)
+    step = 1 + growth_rate / 100
+    
+    if monthly_rate == 0:
+        year_factor = 12.0
+        year_growth = 1.0
     else:
-        # Step-up SIP - month by month calculation
-        annual_growth_rate = growth_rate / 100
-        fv = 0
-        current_sip = monthly_investment
-        
-        for month in range(1, months + 1):
-            # Increase SIP annually
-            if month > 1 and (month - 1) % 12 == 0:
-                current_sip = current_sip * (1 + annual_growth_rate)
-            
-            # Calculate future value of this installment
-            remaining_months = months - month + 1
-            fv += current_sip * math.pow(1 + monthly_rate, remaining_months)
-        
-        return fv
+        year_growth = math.pow(1 + monthly_rate, 12)
+        # FV (at year end) of 12 unit instalments paid at month starts
+        year_factor = (year_growth - 1) / monthly_rate * (1 + monthly_rate)
+    
+    # Sum over years k of step^k * year_growth^(full_years - 1 - k), written
+    # in log space so step ~ year_growth doesn't cancel catastrophically
+    log_ratio = math.log1p(growth_rate / 100) - 12 * math.log1p(monthly_rate)
+    if full_years == 0:
+        series = 0.0
+    elif log_ratio == 0:
+        series = full_years * math.pow(year_growth, full_years - 1)
+    else:
+        series = math.pow(year_growth, full_years - 1) * math.expm1(full_years * log_ratio) / math.expm1(log_ratio)
+    
+    factor = year_factor * series
+    
+    if partial_months:
+        # Trailing part-year: grow the completed years, then add the
+        # stepped-up instalments for the remaining months
+        if monthly_rate == 0:
+            partial_factor = float(partial_months)
+        else:
+            partial_factor = (math.pow(1 + monthly_rate, partial_months) - 1) / monthly_rate * (1 + monthly_rate)
+        factor = factor * math.pow(1 + monthly_rate, partial_months)
+        factor += math.pow(step, full_years) * partial_factor
+    
+    return factor
+
+
+registry.register(Collected(
+    "sip_factor_cache_total", "Lookups in the memoized SIP factor cache", "counter", ("result",),
+    lambda: {("hit",): sip_factor.cache_info().hits, ("miss",): sip_factor.cache_info().misses}
+))
+
+
+def future_value_sip(monthly_investment: float, annual_rate: float, years: int, growth_rate: float = 0) -> float:
+    """
+    Calculate future value of SIP with optional step-up
+    FV is linear in the instalment: monthly amount * value of a 1-rupee SIP
+    """
+    return monthly_investment * sip_factor(annual_rate, years, growth_rate)
 
 
 def calculate_sip_needed(target_amount: float, annual_rate: float, years: int, growth_rate: float = 0) -> float:
     """
     Calculate monthly SIP needed to reach target amount
-    Uses iterative approximation for step-up SIP
+    Future value is linear in the monthly amount, so the answer is the
+    target divided by the future value of a 1-rupee (step-up) SIP
     """
-    if growth_rate == 0:
-        # Standard SIP formula (solved for PMT)
-        monthly_rate = annual_rate / 12 / 100
-        months = years * 12
-        
-        if monthly_rate == 0:
-            return target_amount / months
-        
-        sip = target_amount / (((math.pow(1 + monthly_rate, months) - 1) / monthly_rate) * (1 + monthly_rate))
-        return sip
-    else:
-        # Step-up SIP - use binary search
-        low, high = 0, target_amount / (years * 12)
-        tolerance = 1  # INR 1 tolerance
-        
-        for _ in range(100):  # Max iterations
-            mid = (low + high) / 2
-            fv = future_value_sip(mid, annual_rate, years, growth_rate)
-            
-            if abs(fv - target_amount) < tolerance:
-                return mid
-            
-            if fv < target_amount:
-                low = mid
-            else:
-                high = mid
-        
-        return (low + high) / 2
+    return target_amount / sip_factor(annual_rate, years, growth_rate)
 
 
 def total_sip_invested(monthly_sip: float, years: int, growth_rate: float = 0) -> float:
     """
     Calculate total amount invested in SIP
+    Step-up contributions form a geometric series across years
     """
     if growth_rate == 0:
         return monthly_sip * years * 12
     
-    total = 0
-    current_sip = monthly_sip
-    annual_growth = growth_rate / 100
-    
-    for year in range(years):
-        if year > 0:
-            current_sip = current_sip * (1 + annual_growth)
-        total += current_sip * 12
-    
-    return total
+    step = 1 + growth_rate / 100
+    return monthly_sip * 12 * (math.pow(step, years) - 1) / (step - 1)
+
+
+def growing_annuity_present_value(first_payment: float, growth_rate: float, discount_rate: float, periods: int) -> float:
+    """
+    Present value of `periods` yearly payments growing at growth_rate %,
+    each discounted at discount_rate % from the end of its year
+    PV = sum_{y=1..n} P * (1 + g)^(y-1) / (1 + d)^y
+       = P / (1 + d) * (1 - q^n) / (1 - q),  q = (1 + g) / (1 + d)
+    """
+    discount = 1 + discount_rate / 100
+    ratio = (1 + growth_rate / 100) / discount
+    if ratio == 1:
+        return first_payment / discount * periods
+    # expm1/log1p keep q close to 1 (growth ~ discount) from cancelling
+    return first_payment / discount * -math.expm1(periods * math.log(ratio)) / (1 - ratio)
 
 
 def inflation_adjusted_amount(current_amount: float, inflation_rate: float, years: int) -> float:
@@ -148,32 +170,95 @@ def calculate_retirement_corpus(monthly_expenses: float, years_in_retirement: in
     return corpus
 
 
-def calculate_swp_duration(initial_amount: float, monthly_withdrawal: float, annual_return: float, yearly_increase: float, increase_enabled: bool) -> tuple:
+def _flat_swp(balance: float, withdrawal: float, monthly_rate: float, max_months: int) -> tuple:
     """
-    Calculate how long SWP will last
-    Returns (months_lasted, remaining_value)
+    Run a level monthly withdrawal for up to max_months in closed form
+    Returns (months_lasted, remaining_value); a plan that depletes counts the
+    final (partial) instalment, like the month-by-month simulation
+    """
+    if monthly_rate == 0:
+        if withdrawal * max_months < balance:
+            return max_months, balance - withdrawal * max_months
+        return min(max_months, math.ceil(balance / withdrawal)), 0
+    
+    def balance_after(months):
+        growth = math.pow(1 + monthly_rate, months)
+        return balance * growth - withdrawal * (growth - 1) / monthly_rate
+    
+    # Perpetual plan: the monthly return covers the withdrawal, so the
+    # balance never falls
+    if withdrawal <= balance * monthly_rate:
+        return max_months, balance_after(max_months)
+    
+    # Depletion time from B * (1 + i)^n = W * ((1 + i)^n - 1) / i
+    depletion = math.log(withdrawal / (withdrawal - balance * monthly_rate)) / math.log1p(monthly_rate)
+    if depletion > max_months:
+        return max_months, balance_after(max_months)
+    
+    months = max(1, math.ceil(depletion))
+    # Guard the rounding at the boundary month
+    if months > 1 and balance_after(months - 1) <= 0:
+        months -= 1
+    elif balance_after(months) > 0:
+        months += 1
+    if months > max_months:
+        return max_months, balance_after(max_months)
+    return months, 0
+
+
+def simulate_swp(initial_amount: float, monthly_withdrawal: float, annual_return: float, yearly_increase: float, increase_enabled: bool, max_months: int = 50 * 12) -> tuple:
+    """
+    Single-pass SWP engine
+    Returns (months_lasted, remaining_value, total_withdrawn)
+    Level withdrawals are solved in O(1); increasing ones one year at a time,
+    since the withdrawal is level within each year
     """
     monthly_return = annual_return / 12 / 100
+    
+    if not increase_enabled or yearly_increase == 0:
+        count_kernel("simulate_swp", 1)
+        months, remaining = _flat_swp(initial_amount, monthly_withdrawal, monthly_return, max_months)
+        return months, max(0, remaining), monthly_withdrawal * months
+    
     balance = initial_amount
     months = 0
+    total_withdrawn = 0
     current_withdrawal = monthly_withdrawal
     
-    max_months = 50 * 12  # 50 years max
+    # Growth and annuity factors for one year of level withdrawals
+    year_growth = math.pow(1 + monthly_return, 12)
+    year_annuity = (year_growth - 1) / monthly_return if monthly_return else 12
     
-    while balance > 0 and months < max_months:
-        # Apply return
-        balance = balance * (1 + monthly_return)
-        
-        # Withdraw
-        balance -= current_withdrawal
-        months += 1
-        
-        # Increase withdrawal yearly if enabled
-        if increase_enabled and months % 12 == 0:
-            current_withdrawal = current_withdrawal * (1 + yearly_increase / 100)
-        
-        if balance < 0:
-            balance = 0
+    while months + 12 <= max_months:
+        year_end = balance * year_growth - current_withdrawal * year_annuity
+        if year_end <= 0:
             break
+        balance = year_end
+        months += 12
+        total_withdrawn += current_withdrawal * 12
+        current_withdrawal = current_withdrawal * (1 + yearly_increase / 100)
+    
+    count_kernel("simulate_swp", months // 12 + (months < max_months))
+    if months == max_months:
+        return months, balance, total_withdrawn
     
-    return months, max(0, balance)
+    # Depleting (or capped) final year
+    lasted, balance = _flat_swp(balance, current_withdrawal, monthly_return, min(12, max_months - months))
+    months += lasted
+    total_withdrawn += current_withdrawal * lasted
+    return months, max(0, balance), total_withdrawn
+
+
+def calculate_swp_duration(initial_amount: float, monthly_withdrawal: float, annual_return: float, yearly_increase: float, increase_enabled: bool) -> tuple:
+    """
+    Calculate how long SWP will last
+    Returns (months_lasted, remaining_value)
+    """
+    months, remaining, _ = simulate_swp(
+        initial_amount,
+        monthly_withdrawal,
+        annual_return,
+        yearly_increase,
+        increase_enabled
+    )
+    return months, remaining
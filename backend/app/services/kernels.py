@@ -0,0 +1,520 @@
+"""
+Calculator kernels
+The calculators' math as plain functions over floats, returning compact
+__slots__ records and array('d')-backed schedules. Pydantic models are only
+built at the HTTP edge (the calculator classes), so batch jobs, simulations
+and bulk tools can call these without allocating a model per call.
+"""
+import math
+from array import array
+from datetime import date, timedelta
+from itertools import count, repeat
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+from app.services.financial_utils import (
+    future_value_lumpsum,
+    present_value_lumpsum,
+    future_value_sip,
+    growing_annuity_present_value,
+    calculate_sip_needed,
+    total_sip_invested,
+    simulate_swp
+)
+from app.services.solver import SolverError, find_bracket, newton, brent
+
+# Cash flow count from which irregular_cash_flow switches from a Python loop to NumPy
+VECTOR_MIN_FLOWS = 64
+
+# Annual rates, as fractions, between which xirr searches for a root
+XIRR_MIN_RATE = -0.99
+XIRR_MAX_RATE = 100.0
+
+
+class Record:
+    """
+    Fixed-field result record
+    Fields are the subclass's __slots__, in order; Pydantic output models
+    are built from records with model_validate(record, from_attributes=True)
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # A generated __init__ assigning each slot directly, as namedtuple
+        # does; a generic setattr loop costs more than most kernels it wraps
+        fields = cls.__slots__
+        body = "".join(f"\n    self.{name} = {name}" for name in fields) or "\n    pass"
+        namespace = {}
+        exec(f"def __init__(self, {', '.join(fields)}):{body}", namespace)
+        cls.__init__ = namespace["__init__"]
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class SIPGrowthResult(Record):
+    __slots__ = ("future_value", "total_invested", "wealth_gain", "growth_multiple")
+
+
+class SIPNeedResult(Record):
+    __slots__ = ("monthly_sip", "target_amount_adjusted", "projected_investment", "growth_multiple")
+
+
+class SIPDelayResult(Record):
+    __slots__ = ("delay_cost", "future_value_without_delay", "future_value_with_delay")
+
+
+class SWPResult(Record):
+    __slots__ = ("period_end_value", "total_withdrawn", "full_instalments", "last_instalment_date")
+
+
+class SWPMaxWithdrawalResult(Record):
+    __slots__ = (
+        "monthly_withdrawal", "final_monthly_withdrawal", "total_withdrawn", "corpus_at_start", "residual_value"
+    )
+
+
+class RetirementResult(Record):
+    __slots__ = (
+        "recommended_corpus", "monthly_sip", "yearly_sip", "one_time_investment",
+        "future_value_existing", "shortfall", "monthly_expenses_retirement", "years_remaining"
+    )
+
+
+class RetirementTimelineResult(Record):
+    """Plan figures plus one NumPy array per timeline column, accumulation years first"""
+    __slots__ = (
+        "monthly_sip", "recommended_corpus", "corpus_at_retirement", "depletion_age", "years_funded",
+        "final_balance", "years_remaining", "contribution", "withdrawal", "gain", "balance"
+    )
+
+
+class GoalResult(Record):
+    __slots__ = ("target_amount", "monthly_sip", "yearly_sip", "one_time_investment", "future_value_existing", "shortfall")
+
+
+class ValueResult(Record):
+    __slots__ = ("result", "calculation_type")
+
+
+class CashFlowResult(Record):
+    __slots__ = ("total_value", "calculation_type")
+
+
+class WeightedReturnsResult(Record):
+    __slots__ = ("future_value", "weighted_return", "total_invested")
+
+
+class XIRRResult(Record):
+    __slots__ = (
+        "xirr", "total_invested", "total_returned", "net_gain",
+        "converged", "iterations", "function_calls", "residual", "method", "bracket_low", "bracket_high"
+    )
+
+
+class Schedule:
+    """
+    Period-by-period schedule stored column-wise, one array('d') per field
+    Periods are numbered from 1 under `index` ("month" or "year"); iterating
+    yields rows as dicts, json_lines() the same rows already JSON-encoded
+    """
+    __slots__ = ("index", "columns")
+
+    def __init__(self, index: str, names: Sequence[str]):
+        self.index = index
+        self.columns: Dict[str, array] = {name: array("d") for name in names}
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def rows(self) -> Iterator[dict]:
+        keys = (self.index, *self.columns)
+        return map(dict, map(zip, repeat(keys), zip(count(1), *self.columns.values())))
+
+    __iter__ = rows
+
+    def json_lines(self) -> Iterator[str]:
+        """Rows encoded like json.dumps would, straight from the arrays (float repr is its number format)"""
+        template = '{"%s": %%d, %s}' % (self.index, ", ".join('"%s": %%r' % name for name in self.columns))
+        return map(template.__mod__, zip(count(1), *self.columns.values()))
+
+    def yearly(self, totals: Tuple[str, ...] = ("contribution", "withdrawal", "gain")) -> "Schedule":
+        """
+        Roll a monthly schedule up into years
+        Fields named in `totals` are summed over the year, everything else
+        takes its value from the last month of the year
+        """
+        years = Schedule("year", self.columns)
+        size = len(self)
+        for name, column in self.columns.items():
+            target = years.columns[name]
+            for start in range(0, size, 12):
+                if name in totals:
+                    target.append(sum(column[start:start + 12], 0.0))
+                else:
+                    target.append(column[min(start + 12, size) - 1])
+        return years
+
+
+def sip_growth(monthly_investment: float, period_years: int, expected_returns: float,
+               growth_in_savings: float = 0) -> SIPGrowthResult:
+    future_value = future_value_sip(monthly_investment, expected_returns, period_years, growth_in_savings)
+    total_invested = total_sip_invested(monthly_investment, period_years, growth_in_savings)
+    growth_multiple = future_value / total_invested if total_invested > 0 else 0.0
+    return SIPGrowthResult(future_value, total_invested, future_value - total_invested, growth_multiple)
+
+
+def sip_need(target_amount: float, period_years: int, expected_returns: float, inflation: float = 8.0,
+             growth_in_savings: float = 0) -> SIPNeedResult:
+    # Target in money of the goal year
+    target_adjusted = target_amount * math.pow(1 + inflation / 100, period_years)
+    monthly_sip = calculate_sip_needed(target_adjusted, expected_returns, period_years, growth_in_savings)
+    projected_investment = total_sip_invested(monthly_sip, period_years, growth_in_savings)
+    growth_multiple = target_adjusted / projected_investment if projected_investment > 0 else 0.0
+    return SIPNeedResult(monthly_sip, target_adjusted, projected_investment, growth_multiple)
+
+
+def sip_delay(monthly_investment: float, period_years: int, expected_returns: float,
+              delay_months: int) -> SIPDelayResult:
+    fv_without_delay = future_value_sip(monthly_investment, expected_returns, period_years, 0)
+    reduced_period = period_years - delay_months / 12
+    if reduced_period <= 0:
+        fv_with_delay = 0.0
+    else:
+        fv_with_delay = future_value_sip(monthly_investment, expected_returns, reduced_period, 0)
+    return SIPDelayResult(fv_without_delay - fv_with_delay, fv_without_delay, fv_with_delay)
+
+
+def swp(initial_investment: float, monthly_withdrawal: float, expected_returns: float, yearly_increase: float,
+        increase_withdrawal: bool, swp_start_years: int, start_date: date) -> SWPResult:
+    """SWP from an investment made on start_date; withdrawals begin swp_start_years later"""
+    # The investment grows untouched until withdrawals start
+    initial = future_value_lumpsum(initial_investment, expected_returns, swp_start_years)
+    months_lasted, remaining_value, total_withdrawn = simulate_swp(
+        initial,
+        monthly_withdrawal,
+        expected_returns,
+        yearly_increase,
+        increase_withdrawal
+    )
+    first_date = start_date + timedelta(days=365 * swp_start_years)
+    last_date = first_date + timedelta(days=30 * months_lasted)
+    return SWPResult(remaining_value, total_withdrawn, months_lasted, last_date.strftime("%d-%B-%Y"))
+
+
+def swp_max_withdrawal(initial_investment: float, expected_returns: float, yearly_increase: float,
+                       increase_withdrawal: bool, swp_start_years: int, years: int,
+                       residual_value: float = 0) -> SWPMaxWithdrawalResult:
+    """
+    Largest first monthly withdrawal that leaves residual_value after `years`
+    years of withdrawals, under the same rules as swp
+    Withdrawals are level within a year and grow by g between years, so the
+    closing balance is linear in the first withdrawal W:
+        B = C * Y^n - W * A * sum_{y=0..n-1} (1 + g)^y * Y^(n-1-y)
+    with Y the yearly growth and A the yearly annuity factor of the monthly
+    return. Solving B = residual_value gives W directly; the balance cannot
+    turn negative and recover, so every year before the last is covered too.
+    """
+    corpus = future_value_lumpsum(initial_investment, expected_returns, swp_start_years)
+    monthly_return = expected_returns / 12 / 100
+    year_growth = math.pow(1 + monthly_return, 12)
+    year_annuity = (year_growth - 1) / monthly_return if monthly_return else 12
+    step = 1 + yearly_increase / 100 if increase_withdrawal else 1.0
+
+    # Geometric sum of the yearly withdrawals compounded to the end,
+    # Y^(n-1) * (1 - q^n) / (1 - q) with q = (1 + g) / Y; expm1 keeps q close
+    # to 1 (increase ~ return) from cancelling
+    log_ratio = math.log(step) - 12 * math.log1p(monthly_return)
+    weights = math.pow(year_growth, years - 1)
+    weights *= math.expm1(years * log_ratio) / math.expm1(log_ratio) if log_ratio else years
+
+    available = corpus * math.pow(year_growth, years) - residual_value
+    if available <= 0:
+        raise ValueError("Residual value is more than the investment grows to without withdrawals")
+    withdrawal = available / (year_annuity * weights)
+    # Twelve instalments a year, growing by the step between years
+    total_withdrawn = withdrawal * 12 * (years if step == 1 else (math.pow(step, years) - 1) / (step - 1))
+    return SWPMaxWithdrawalResult(
+        withdrawal, withdrawal * math.pow(step, years - 1), total_withdrawn, corpus, residual_value
+    )
+
+
+def retirement_period(retirement_age: int, life_expectancy: int) -> int:
+    """Years drawn from the kitty; 25 when life expectancy isn't past retirement"""
+    period = life_expectancy - retirement_age
+    return period if period > 0 else 25
+
+
+def _funding(shortfall: float, expected_returns: float, years: int, growth_in_savings: float) -> Tuple[float, float]:
+    """(monthly SIP, one-time investment today) that cover a shortfall `years` from now"""
+    if shortfall <= 0:
+        return 0.0, 0.0
+    monthly_sip = calculate_sip_needed(shortfall, expected_returns, years, growth_in_savings)
+    return monthly_sip, present_value_lumpsum(shortfall, expected_returns, years)
+
+
+def retirement(present_age: int, retirement_age: int, monthly_expenses: float, expected_returns: float,
+               inflation: float = 6.0, growth_in_savings: float = 0, existing_investments: float = 0,
+               life_expectancy: int = 85, retirement_kitty_returns: float = 8.0,
+               post_retirement_inflation: float = 8.0) -> RetirementResult:
+    years_remaining = retirement_age - present_age
+    if years_remaining <= 0:
+        raise ValueError("Retirement age must be greater than present age")
+
+    # Monthly expenses at retirement, in money of that year
+    monthly_expenses_retirement = monthly_expenses * math.pow(1 + inflation / 100, years_remaining)
+    annual_expenses = monthly_expenses_retirement * 12
+
+    # Present value at retirement of yearly expenses growing with
+    # post-retirement inflation, each drawn at the end of its year
+    corpus = growing_annuity_present_value(
+        annual_expenses, post_retirement_inflation, retirement_kitty_returns,
+        retirement_period(retirement_age, life_expectancy)
+    )
+
+    future_value_existing = future_value_lumpsum(existing_investments, expected_returns, years_remaining)
+    shortfall = corpus - future_value_existing
+    monthly_sip, one_time_investment = _funding(shortfall, expected_returns, years_remaining, growth_in_savings)
+    return RetirementResult(
+        corpus, monthly_sip, monthly_sip * 12, one_time_investment, future_value_existing, shortfall,
+        monthly_expenses_retirement, years_remaining
+    )
+
+
+def retirement_timeline(present_age: int, retirement_age: int, monthly_expenses: float, expected_returns: float,
+                        inflation: float = 6.0, growth_in_savings: float = 0, existing_investments: float = 0,
+                        life_expectancy: int = 85, retirement_kitty_returns: float = 8.0,
+                        post_retirement_inflation: float = 8.0,
+                        monthly_sip: Optional[float] = None) -> RetirementTimelineResult:
+    """
+    Year-by-year balance through accumulation and retirement in one pass
+    Contributions (the recommended SIP unless monthly_sip is given, stepping
+    up yearly) and existing investments grow until retirement; then yearly
+    expenses, growing with post-retirement inflation, are drawn from the
+    kitty at each year end. Each phase is a linear recurrence
+    b_y = b_(y-1) * g + c_y, evaluated in closed form for all years at once as
+    b_y = g^y * (b_0 + cumsum(c_j / g^j)). depletion_age is the age at the end
+    of the year the money runs out, or None when it lasts to life expectancy.
+    """
+    plan = retirement(
+        present_age, retirement_age, monthly_expenses, expected_returns, inflation, growth_in_savings,
+        existing_investments, life_expectancy, retirement_kitty_returns, post_retirement_inflation
+    )
+    sip = plan.monthly_sip if monthly_sip is None else monthly_sip
+    
+    # Accumulation: SIP paid at month starts at the nominal monthly rate,
+    # existing investments compounding yearly
+    years = np.arange(1, plan.years_remaining + 1)
+    monthly_rate = expected_returns / 12 / 100
+    year_growth = math.pow(1 + monthly_rate, 12)
+    year_factor = 12.0 if monthly_rate == 0 else (year_growth - 1) / monthly_rate * (1 + monthly_rate)
+    instalments = sip * np.power(1 + growth_in_savings / 100, years - 1)
+    sip_growth = np.power(year_growth, years)
+    saved = sip_growth * np.cumsum(instalments * year_factor / sip_growth)
+    accumulated = existing_investments * np.power(1 + expected_returns / 100, years) + saved
+    corpus = float(accumulated[-1])
+    
+    # Retirement: expenses drawn at year ends from a kitty growing yearly
+    years = np.arange(1, retirement_period(retirement_age, life_expectancy) + 1)
+    expenses = plan.monthly_expenses_retirement * 12 * np.power(1 + post_retirement_inflation / 100, years - 1)
+    kitty_growth = np.power(1 + retirement_kitty_returns / 100, years)
+    remaining = kitty_growth * (corpus - np.cumsum(expenses / kitty_growth))
+    
+    # A fully funded plan ends at zero up to rounding, which isn't running out
+    short = np.flatnonzero(remaining < -1e-9 * max(corpus, expenses[0]))
+    years_funded = int(short[0]) if short.size else years.size
+    drawn_down = np.where(years <= years_funded, np.maximum(remaining, 0.0), 0.0)
+    opening = np.concatenate(([corpus], drawn_down[:-1]))
+    gain = opening * retirement_kitty_returns / 100
+    
+    contribution = np.concatenate((instalments * 12, np.zeros(years.size)))
+    balance = np.concatenate((accumulated, drawn_down))
+    opening_accumulation = np.concatenate(([existing_investments], accumulated[:-1]))
+    return RetirementTimelineResult(
+        sip, plan.recommended_corpus, corpus,
+        retirement_age + years_funded + 1 if short.size else None, years_funded, float(drawn_down[-1]),
+        plan.years_remaining,
+        contribution,
+        np.concatenate((np.zeros(plan.years_remaining), opening + gain - drawn_down)),
+        np.concatenate((accumulated - opening_accumulation - instalments * 12, gain)),
+        balance
+    )
+
+
+def goal(years_remaining: int, cost_today: float, inflation: float, expected_returns: float,
+         growth_in_savings: float = 0, existing_investments: float = 0) -> GoalResult:
+    """Lump-sum goal (education, marriage, other) funded by a SIP on top of existing investments"""
+    target_amount = future_value_lumpsum(cost_today, inflation, years_remaining)
+    future_value_existing = future_value_lumpsum(existing_investments, expected_returns, years_remaining)
+    shortfall = target_amount - future_value_existing
+    monthly_sip, one_time_investment = _funding(shortfall, expected_returns, years_remaining, growth_in_savings)
+    return GoalResult(target_amount, monthly_sip, monthly_sip * 12, one_time_investment, future_value_existing, shortfall)
+
+
+def single_amount(calculate_type: str, amount: float, years: int, inflation: float = 8.0) -> ValueResult:
+    if calculate_type == "present_value":
+        return ValueResult(present_value_lumpsum(amount, inflation, years), "present_value")
+    return ValueResult(future_value_lumpsum(amount, inflation, years), "future_value")
+
+
+def irregular_cash_flow(calculate_type: str, amounts: Sequence[float], years: Sequence[float],
+                        discount_rate: float) -> CashFlowResult:
+    """
+    Present value of the flows today, or their value at the last flow's time
+    (the valuation date, when every flow is before it)
+    years are fractional years from the valuation date; past-dated flows
+    (negative years) are compounded forward to it. Long ledgers, such as
+    uploads, are valued with NumPy over the array('d') columns without copying.
+    """
+    if len(amounts) >= VECTOR_MIN_FLOWS:
+        amounts = np.asarray(amounts, dtype=float)
+        years = np.asarray(years, dtype=float)
+        growth = 1 + discount_rate / 100
+        if calculate_type == "present_value":
+            return CashFlowResult(float(np.sum(amounts / np.power(growth, years))), "present_value")
+        horizon = max(years.max(), 0.0)
+        return CashFlowResult(float(np.sum(amounts * np.power(growth, horizon - years))), "future_value")
+    
+    # A plain loop: short ledgers are valued in a few microseconds
+    growth = 1 + discount_rate / 100
+    total = 0.0
+    if calculate_type == "present_value":
+        for amount, year in zip(amounts, years):
+            total += amount / growth ** year
+        return CashFlowResult(total, "present_value")
+    horizon = max(max(years), 0.0)
+    for amount, year in zip(amounts, years):
+        total += amount * growth ** (horizon - year)
+    return CashFlowResult(total, "future_value")
+
+
+def weighted_returns(years: int, amounts: Sequence[float], returns: Sequence[float]) -> WeightedReturnsResult:
+    total_invested = sum(amounts)
+    if total_invested == 0:
+        return WeightedReturnsResult(0.0, 0.0, 0.0)
+    weighted_return = sum((amount / total_invested) * rate for amount, rate in zip(amounts, returns))
+    return WeightedReturnsResult(
+        future_value_lumpsum(total_invested, weighted_return, years), weighted_return, total_invested
+    )
+
+
+def xirr(amounts: Sequence[float], years: Sequence[float], guess: float = 10) -> XIRRResult:
+    """
+    Annual rate (%) at which the flows' net present value is zero
+    Negative amounts are money invested, positive ones money received (or
+    the current value); years are times of the flows in fractional years.
+    The root is bracketed around the guess, then found with a safeguarded
+    Newton iteration, falling back to Brent if Newton stalls. NPV and its
+    derivative share one vectorized discount pass per rate. The residual is
+    the NPV at the solved rate, valued at the first flow (the last one when
+    the rate is negative).
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    years = np.asarray(years, dtype=float)
+    if not (amounts < 0).any() or not (amounts > 0).any():
+        raise ValueError("Cash flows need at least one investment (negative) and one return (positive)")
+    if years.max() == years.min():
+        raise ValueError("Cash flows must fall on at least two different dates")
+    # Measure from the first flow so discount factors stay near 1
+    years = years - years.min()
+    last = years.max()
+    
+    discounted_at = [None, None]
+    
+    def discounted(rate: float) -> np.ndarray:
+        # Negative rates discount to the last flow instead of the first, so
+        # (1 + rate)^-years can't overflow; that only scales the NPV by a
+        # positive factor, leaving its sign, roots and Newton steps unchanged
+        if discounted_at[0] != rate:
+            discounted_at[0] = rate
+            discounted_at[1] = amounts * np.power(1 + rate, (last if rate < 0 else 0.0) - years)
+        return discounted_at[1]
+    
+    def npv(rate: float) -> float:
+        return float(discounted(rate).sum())
+    
+    def npv_slope(rate: float) -> float:
+        return float(-np.dot(years, discounted(rate)) / (1 + rate))
+    
+    start = min(max(guess / 100, XIRR_MIN_RATE), XIRR_MAX_RATE)
+    try:
+        low, high, f_low, f_high, calls = find_bracket(npv, start - 0.05, start + 0.05, XIRR_MIN_RATE, XIRR_MAX_RATE)
+    except SolverError:
+        raise ValueError(
+            f"No annual rate between {XIRR_MIN_RATE:.0%} and {XIRR_MAX_RATE:.0%} brings these cash flows' "
+            "net present value to zero"
+        )
+    result = newton(npv, npv_slope, start, low, high)
+    calls += result.function_calls
+    if not result.converged:
+        result = brent(npv, low, high, f_low=f_low, f_high=f_high)
+        calls += result.function_calls
+    
+    total_invested = float(-amounts[amounts < 0].sum())
+    total_returned = float(amounts[amounts > 0].sum())
+    return XIRRResult(
+        result.root * 100, total_invested, total_returned, total_returned - total_invested,
+        result.converged, result.iterations, calls, result.residual,
+        result.method, low * 100, high * 100
+    )
+
+
+def sip_schedule(monthly_investment: float, annual_rate: float, years: int, growth_rate: float = 0) -> Schedule:
+    """Month-by-month SIP: instalment, returns earned, closing balance and total invested"""
+    schedule = Schedule("month", ("contribution", "gain", "balance", "total_invested"))
+    add_contribution, add_gain, add_balance, add_invested = (column.append for column in schedule.columns.values())
+    monthly_rate = annual_rate / 12 / 100
+    balance = 0.0
+    invested = 0.0
+    current_sip = monthly_investment
+
+    for month in range(1, int(round(years * 12)) + 1):
+        if month > 1 and (month - 1) % 12 == 0:
+            current_sip = current_sip * (1 + growth_rate / 100)
+
+        # Instalment goes in at the start of the month and earns that month's return
+        gain = (balance + current_sip) * monthly_rate
+        balance += current_sip + gain
+        invested += current_sip
+        add_contribution(current_sip)
+        add_gain(gain)
+        add_balance(balance)
+        add_invested(invested)
+    return schedule
+
+
+def swp_schedule(initial_amount: float, monthly_withdrawal: float, annual_return: float, yearly_increase: float,
+                 increase_enabled: bool, max_months: int = 50 * 12) -> Schedule:
+    """
+    Month-by-month SWP: withdrawal, returns earned, closing balance and total withdrawn
+    Same rules as financial_utils.simulate_swp, one row per instalment
+    """
+    schedule = Schedule("month", ("withdrawal", "gain", "balance", "total_withdrawn"))
+    add_withdrawal, add_gain, add_balance, add_withdrawn = (column.append for column in schedule.columns.values())
+    monthly_return = annual_return / 12 / 100
+    balance = initial_amount
+    months = 0
+    current_withdrawal = monthly_withdrawal
+    total_withdrawn = 0.0
+
+    while balance > 0 and months < max_months:
+        gain = balance * monthly_return
+        balance = balance + gain - current_withdrawal
+        months += 1
+        total_withdrawn += current_withdrawal
+        add_withdrawal(current_withdrawal)
+        add_gain(gain)
+        add_balance(max(0.0, balance))
+        add_withdrawn(total_withdrawn)
+
+        if increase_enabled and months % 12 == 0:
+            current_withdrawal = current_withdrawal * (1 + yearly_increase / 100)
+    return schedule
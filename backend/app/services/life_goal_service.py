@@ -1,261 +1,320 @@
 """
 Life Goal Calculator Services
-Implements retirement, education, marriage, and custom goal calculations
+Implements retirement, education, marriage, and custom goal calculations,
+and the household planner that funds them from one budget
 """
-from app.services.financial_utils import (
-    future_value_lumpsum,
-    future_value_sip,
-    calculate_sip_needed,
-    inflation_adjusted_amount,
-    calculate_retirement_corpus,
-    total_sip_invested
+from typing import Iterator, List, Optional
+
+import numpy as np
+from app.services.cache import cached_calculation
+from app.services.kernels import RetirementTimelineResult, retirement, retirement_timeline, retirement_period, goal
+from app.services.monte_carlo import simulate_goal, simulate_retirement
+from app.services.vectorized_utils import (
+    retirement_columns,
+    goal_columns,
+    allocate_budget,
+    batch_calculation,
+    to_columns,
+    from_columns
 )
 from app.models.life_goal import (
     RetirementInput, RetirementOutput,
+    RetirementTimelineInput, RetirementTimelineOutput, RetirementTimelineYear,
     EducationInput, EducationOutput,
     MarriageInput, MarriageOutput,
-    OtherGoalInput, OtherGoalOutput
+    OtherGoalInput, OtherGoalOutput,
+    SimulationSettings, SimulationOutput,
+    RetirementSimulationInput,
+    EducationSimulationInput,
+    MarriageSimulationInput,
+    OtherGoalSimulationInput,
+    HouseholdPlanInput, HouseholdPlanOutput,
+    GoalAllocation
+)
+
+# Inputs of the lump-sum goal kernel, shared by the education, marriage and other-goal models
+GOAL_FIELDS = (
+    "years_remaining", "cost_today", "inflation", "expected_returns", "growth_in_savings", "existing_investments"
 )
 
+# Per-goal results the household planner takes from the calculator kernels
+PLAN_COLUMNS = ("target_amount", "monthly_sip", "one_time_investment", "shortfall", "years_remaining")
+
+
+def _simulate_goal(data, settings: SimulationSettings, plan) -> SimulationOutput:
+    """Monte Carlo run shared by the education, marriage and other-goal calculators"""
+    monthly_sip = plan.monthly_sip if settings.monthly_sip is None else settings.monthly_sip
+    result = simulate_goal(
+        {
+            "years": data.years_remaining,
+            "cost_today": data.cost_today,
+            "inflation": data.inflation,
+            "expected_returns": data.expected_returns,
+            "growth_in_savings": data.growth_in_savings,
+            "existing_investments": data.existing_investments,
+            "monthly_sip": monthly_sip,
+            "return_volatility": settings.return_volatility,
+            "inflation_volatility": settings.inflation_volatility,
+        },
+        settings.paths,
+        settings.seed
+    )
+    return SimulationOutput(
+        monthly_sip=monthly_sip,
+        target_amount=plan.target_amount,
+        paths=settings.paths,
+        **result
+    )
+
+
+def _goal_plan(data, output_model):
+    """Plan for a lump-sum goal, shared by the education, marriage and other-goal calculators"""
+    result = goal(
+        data.years_remaining,
+        data.cost_today,
+        data.inflation,
+        data.expected_returns,
+        data.growth_in_savings,
+        data.existing_investments
+    )
+    return output_model.model_validate(result, from_attributes=True)
+
+
+def _goal_batch(items: list, output_model) -> list:
+    columns = to_columns(items)
+    return from_columns(output_model, goal_columns(**{name: columns[name] for name in GOAL_FIELDS}))
+
 
 class RetirementCalculator:
     """Plan Your Retirement Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: RetirementInput) -> RetirementOutput:
-        years_remaining = data.retirement_age - data.present_age
-        
-        if years_remaining <= 0:
-            raise ValueError("Retirement age must be greater than present age")
-        
-        # Calculate inflation-adjusted monthly expenses at retirement
-        monthly_expenses_retirement = data.monthly_expenses * pow(1 + data.inflation / 100, years_remaining)
-        
-        # Calculate retirement period (years of retirement)
-        retirement_period = data.life_expectancy - data.retirement_age
-        if retirement_period <= 0:
-            retirement_period = 25  # Default fallback
-        
-        # Calculate required retirement corpus
-        # This corpus needs to last for retirement_period years
-        # providing inflation-adjusted withdrawals
-        
-        # Annual expenses at the START of retirement
-        inflated_monthly_expenses = data.monthly_expenses * pow(1 + data.inflation / 100, years_remaining)
-        annual_expenses_at_retirement = inflated_monthly_expenses * 12
-        
-        # Calculate corpus needed using perpetuity/annuity formula
-        # The corpus grows at retirement_kitty_returns% while expenses grow at post_retirement_inflation%
-        # We need to find present value (at retirement) of all future expenses
-        
-        corpus_needed = 0
-        for year in range(1, retirement_period + 1):
-            # Expenses in this year (growing with post-retirement inflation)
-            expense_this_year = annual_expenses_at_retirement * pow(1 + data.post_retirement_inflation / 100, year - 1)
-            # Present value of this expense (discounted at retirement kitty returns)
-            pv_expense = expense_this_year / pow(1 + data.retirement_kitty_returns / 100, year)
-            corpus_needed += pv_expense
-        
-        recommended_corpus = corpus_needed
-        
-        # Future value of existing investments
-        future_value_existing = future_value_lumpsum(
-            data.existing_investments,
+        result = retirement(
+            data.present_age,
+            data.retirement_age,
+            data.monthly_expenses,
             data.expected_returns,
-            years_remaining
+            data.inflation,
+            data.growth_in_savings,
+            data.existing_investments,
+            data.life_expectancy,
+            data.retirement_kitty_returns,
+            data.post_retirement_inflation
         )
-        
-        # Shortfall to be covered
-        shortfall = recommended_corpus - future_value_existing
-        
-        if shortfall <= 0:
-            # Already have enough
-            return RetirementOutput(
-                recommended_corpus=recommended_corpus,
-                monthly_sip=0,
-                yearly_sip=0,
-                one_time_investment=0,
-                future_value_existing=future_value_existing,
-                shortfall=shortfall,
-                monthly_expenses_retirement=monthly_expenses_retirement,
-                years_remaining=years_remaining
-            )
-        
-        # Calculate required investments
-        monthly_sip = calculate_sip_needed(
-            shortfall,
-            data.expected_returns,
-            years_remaining,
-            data.growth_in_savings
+        return RetirementOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[RetirementInput]) -> List[RetirementOutput]:
+        return from_columns(RetirementOutput, retirement_columns(**to_columns(items)))
+    
+    @staticmethod
+    def simulate(data: RetirementSimulationInput) -> SimulationOutput:
+        """Probability that the kitty lasts until life expectancy under random returns and inflation"""
+        inputs, settings = data.inputs, data.simulation
+        plan = RetirementCalculator.calculate(inputs)
+        monthly_sip = plan.monthly_sip if settings.monthly_sip is None else settings.monthly_sip
+        
+        result = simulate_retirement(
+            {
+                "years_remaining": plan.years_remaining,
+                "retirement_period": retirement_period(inputs.retirement_age, inputs.life_expectancy),
+                "monthly_expenses": inputs.monthly_expenses,
+                "inflation": inputs.inflation,
+                "expected_returns": inputs.expected_returns,
+                "growth_in_savings": inputs.growth_in_savings,
+                "existing_investments": inputs.existing_investments,
+                "retirement_kitty_returns": inputs.retirement_kitty_returns,
+                "post_retirement_inflation": inputs.post_retirement_inflation,
+                "monthly_sip": monthly_sip,
+                "return_volatility": settings.return_volatility,
+                "inflation_volatility": settings.inflation_volatility,
+            },
+            settings.paths,
+            settings.seed
         )
-        
-        yearly_sip = monthly_sip * 12
-        
-        # One-time investment needed today
-        one_time_investment = shortfall / pow(1 + data.expected_returns / 100, years_remaining)
-        
-        return RetirementOutput(
-            recommended_corpus=recommended_corpus,
+        return SimulationOutput(
             monthly_sip=monthly_sip,
-            yearly_sip=yearly_sip,
-            one_time_investment=one_time_investment,
-            future_value_existing=future_value_existing,
-            shortfall=shortfall,
-            monthly_expenses_retirement=monthly_expenses_retirement,
-            years_remaining=years_remaining
+            target_amount=plan.recommended_corpus,
+            paths=settings.paths,
+            **result
+        )
+    
+    @staticmethod
+    @cached_calculation
+    def timeline(data: RetirementTimelineInput) -> RetirementTimelineOutput:
+        """Accumulation and retirement years in one pass, with the age the money runs out"""
+        result = RetirementCalculator._timeline(data, data.monthly_sip)
+        return RetirementTimelineOutput(
+            monthly_sip=result.monthly_sip,
+            recommended_corpus=result.recommended_corpus,
+            corpus_at_retirement=result.corpus_at_retirement,
+            money_lasts=result.depletion_age is None,
+            depletion_age=result.depletion_age,
+            years_funded=result.years_funded,
+            final_balance=result.final_balance,
+            years=[RetirementTimelineYear(**row) for row in RetirementCalculator._timeline_rows(data, result)]
         )
+    
+    @staticmethod
+    def schedule(data: RetirementInput) -> Iterator[dict]:
+        """
+        Year-by-year corpus trajectory
+        Accumulation with the recommended SIP until retirement, then yearly
+        inflation-growing expenses drawn from the kitty
+        """
+        # Computed before streaming so invalid inputs fail the request
+        result = RetirementCalculator._timeline(data)
+        return RetirementCalculator._timeline_rows(data, result)
+    
+    @staticmethod
+    def _timeline(data: RetirementInput, monthly_sip: Optional[float] = None) -> RetirementTimelineResult:
+        return retirement_timeline(
+            data.present_age,
+            data.retirement_age,
+            data.monthly_expenses,
+            data.expected_returns,
+            data.inflation,
+            data.growth_in_savings,
+            data.existing_investments,
+            data.life_expectancy,
+            data.retirement_kitty_returns,
+            data.post_retirement_inflation,
+            monthly_sip
+        )
+    
+    @staticmethod
+    def _timeline_rows(data: RetirementInput, result: RetirementTimelineResult) -> Iterator[dict]:
+        columns = zip(
+            result.contribution.tolist(), result.withdrawal.tolist(), result.gain.tolist(), result.balance.tolist()
+        )
+        for year, (contribution, withdrawal, gain, balance) in enumerate(columns, 1):
+            yield {
+                "year": year,
+                "age": data.present_age + year,
+                "phase": "accumulation" if year <= result.years_remaining else "retirement",
+                "contribution": contribution,
+                "withdrawal": withdrawal,
+                "gain": gain,
+                "balance": balance
+            }
 
 
 class EducationCalculator:
     """Child Education Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: EducationInput) -> EducationOutput:
-        # Inflate cost to future
-        target_amount = inflation_adjusted_amount(
-            data.cost_today,
-            data.inflation,
-            data.years_remaining
-        )
-        
-        # Future value of existing investments
-        future_value_existing = future_value_lumpsum(
-            data.existing_investments,
-            data.expected_returns,
-            data.years_remaining
-        )
-        
-        # Shortfall
-        shortfall = target_amount - future_value_existing
-        
-        if shortfall <= 0:
-            return EducationOutput(
-                target_amount=target_amount,
-                monthly_sip=0,
-                yearly_sip=0,
-                one_time_investment=0,
-                future_value_existing=future_value_existing,
-                shortfall=shortfall
-            )
-        
-        # Calculate SIP needed
-        monthly_sip = calculate_sip_needed(
-            shortfall,
-            data.expected_returns,
-            data.years_remaining,
-            data.growth_in_savings
-        )
-        
-        yearly_sip = monthly_sip * 12
-        
-        # One-time investment
-        one_time_investment = shortfall / pow(1 + data.expected_returns / 100, data.years_remaining)
-        
-        return EducationOutput(
-            target_amount=target_amount,
-            monthly_sip=monthly_sip,
-            yearly_sip=yearly_sip,
-            one_time_investment=one_time_investment,
-            future_value_existing=future_value_existing,
-            shortfall=shortfall
-        )
+        return _goal_plan(data, EducationOutput)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[EducationInput]) -> List[EducationOutput]:
+        return _goal_batch(items, EducationOutput)
+    
+    @staticmethod
+    def simulate(data: EducationSimulationInput) -> SimulationOutput:
+        """Probability of reaching the goal under random returns and inflation"""
+        plan = EducationCalculator.calculate(data.inputs)
+        return _simulate_goal(data.inputs, data.simulation, plan)
 
 
 class MarriageCalculator:
     """Marriage for Child Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: MarriageInput) -> MarriageOutput:
-        # Same logic as education calculator
-        target_amount = inflation_adjusted_amount(
-            data.cost_today,
-            data.inflation,
-            data.years_remaining
-        )
-        
-        future_value_existing = future_value_lumpsum(
-            data.existing_investments,
-            data.expected_returns,
-            data.years_remaining
-        )
-        
-        shortfall = target_amount - future_value_existing
-        
-        if shortfall <= 0:
-            return MarriageOutput(
-                target_amount=target_amount,
-                monthly_sip=0,
-                yearly_sip=0,
-                one_time_investment=0,
-                future_value_existing=future_value_existing,
-                shortfall=shortfall
-            )
-        
-        monthly_sip = calculate_sip_needed(
-            shortfall,
-            data.expected_returns,
-            data.years_remaining,
-            data.growth_in_savings
-        )
-        
-        yearly_sip = monthly_sip * 12
-        one_time_investment = shortfall / pow(1 + data.expected_returns / 100, data.years_remaining)
-        
-        return MarriageOutput(
-            target_amount=target_amount,
-            monthly_sip=monthly_sip,
-            yearly_sip=yearly_sip,
-            one_time_investment=one_time_investment,
-            future_value_existing=future_value_existing,
-            shortfall=shortfall
-        )
+        return _goal_plan(data, MarriageOutput)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[MarriageInput]) -> List[MarriageOutput]:
+        return _goal_batch(items, MarriageOutput)
+    
+    @staticmethod
+    def simulate(data: MarriageSimulationInput) -> SimulationOutput:
+        """Probability of reaching the goal under random returns and inflation"""
+        plan = MarriageCalculator.calculate(data.inputs)
+        return _simulate_goal(data.inputs, data.simulation, plan)
 
 
 class OtherGoalCalculator:
     """Your Other Goal Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: OtherGoalInput) -> OtherGoalOutput:
-        # Generic goal calculator
-        target_amount = inflation_adjusted_amount(
-            data.cost_today,
-            data.inflation,
-            data.years_remaining
-        )
-        
-        future_value_existing = future_value_lumpsum(
-            data.existing_investments,
-            data.expected_returns,
-            data.years_remaining
-        )
-        
-        shortfall = target_amount - future_value_existing
-        
-        if shortfall <= 0:
-            return OtherGoalOutput(
-                target_amount=target_amount,
-                monthly_sip=0,
-                yearly_sip=0,
-                one_time_investment=0,
-                future_value_existing=future_value_existing,
-                shortfall=shortfall
-            )
-        
-        monthly_sip = calculate_sip_needed(
-            shortfall,
-            data.expected_returns,
-            data.years_remaining,
-            data.growth_in_savings
-        )
-        
-        yearly_sip = monthly_sip * 12
-        one_time_investment = shortfall / pow(1 + data.expected_returns / 100, data.years_remaining)
-        
-        return OtherGoalOutput(
-            target_amount=target_amount,
-            monthly_sip=monthly_sip,
-            yearly_sip=yearly_sip,
-            one_time_investment=one_time_investment,
-            future_value_existing=future_value_existing,
-            shortfall=shortfall
+        return _goal_plan(data, OtherGoalOutput)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[OtherGoalInput]) -> List[OtherGoalOutput]:
+        return _goal_batch(items, OtherGoalOutput)
+    
+    @staticmethod
+    def simulate(data: OtherGoalSimulationInput) -> SimulationOutput:
+        """Probability of reaching the goal under random returns and inflation"""
+        plan = OtherGoalCalculator.calculate(data.inputs)
+        return _simulate_goal(data.inputs, data.simulation, plan)
+
+
+class HouseholdPlanner:
+    """Household Planner: every goal of a household against one monthly budget"""
+    
+    @staticmethod
+    @cached_calculation
+    def calculate(data: HouseholdPlanInput) -> HouseholdPlanOutput:
+        goals = data.goals
+        plans = {name: np.empty(len(goals)) for name in PLAN_COLUMNS}
+        
+        # One vectorized pass per kernel over all goals that use it
+        retirement_at = [index for index, goal in enumerate(goals) if goal.calculator == "retirement"]
+        goal_at = [index for index, goal in enumerate(goals) if goal.calculator != "retirement"]
+        if retirement_at:
+            result = retirement_columns(**to_columns([goals[index].inputs for index in retirement_at]))
+            result["target_amount"] = result["recommended_corpus"]
+            for name in PLAN_COLUMNS:
+                plans[name][retirement_at] = result[name]
+        if goal_at:
+            columns = {name: np.array([getattr(goals[index].inputs, name) for index in goal_at]) for name in GOAL_FIELDS}
+            result = goal_columns(**columns)
+            result["years_remaining"] = columns["years_remaining"]
+            for name in PLAN_COLUMNS:
+                plans[name][goal_at] = result[name]
+        
+        required = plans["monthly_sip"]
+        allocated = allocate_budget(data.monthly_budget, required, [goal.priority for goal in goals])
+        
+        # Future value is linear in the SIP, so funding a fraction of the
+        # required SIP closes the same fraction of the gap
+        with np.errstate(divide="ignore", invalid="ignore"):
+            funded_ratio = np.where(required > 0, allocated / required, 1.0)
+        shortfall = np.where(required > 0, plans["shortfall"] * (1 - funded_ratio), plans["shortfall"])
+        
+        allocations = from_columns(GoalAllocation, {
+            "name": [goal.name for goal in goals],
+            "calculator": [goal.calculator for goal in goals],
+            "priority": [goal.priority for goal in goals],
+            "years_remaining": plans["years_remaining"].astype(int),
+            "target_amount": plans["target_amount"],
+            "required_sip": required,
+            "allocated_sip": allocated,
+            "funded_ratio": funded_ratio,
+            "projected_value": plans["target_amount"] - shortfall,
+            "shortfall": shortfall,
+            "one_time_investment": plans["one_time_investment"] * (1 - funded_ratio),
+        })
+        total_required = float(required.sum())
+        total_allocated = float(allocated.sum())
+        return HouseholdPlanOutput(
+            monthly_budget=data.monthly_budget,
+            required_sip=total_required,
+            allocated_sip=total_allocated,
+            unallocated_budget=data.monthly_budget - total_allocated,
+            fully_funded=total_allocated >= total_required,
+            goals=allocations
         )
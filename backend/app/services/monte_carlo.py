@@ -0,0 +1,183 @@
+"""
+Monte Carlo simulation engine
+Simulates yearly return and inflation paths as NumPy matrices (paths x years)
+to estimate the probability that a goal or retirement plan succeeds
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from app.config import SIMULATION_WORKERS, SIMULATION_PARALLEL_PATHS
+from app.metrics import count_kernel
+
+
+# Paths are simulated in fixed-size chunks, each with its own child seed, so
+# results for a given seed are identical whether chunks run inline or in a pool
+CHUNK_PATHS = 5000
+
+# Yearly returns are floored so a path can't lose more than this fraction
+MAX_YEARLY_LOSS = 0.95
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=SIMULATION_WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _forget_pool() -> None:
+    # Forked children don't inherit the pool's management thread; see executor._forget_executor
+    global _pool
+    _pool = None
+
+
+os.register_at_fork(after_in_child=_forget_pool)
+
+
+def _draw_rates(rng: np.random.Generator, mean: float, volatility: float, shape: Tuple[int, int]) -> np.ndarray:
+    """Yearly rates (as fractions) drawn from a normal distribution"""
+    if volatility == 0:
+        return np.full(shape, mean / 100)
+    rates = rng.normal(mean / 100, volatility / 100, size=shape)
+    return np.maximum(rates, -MAX_YEARLY_LOSS)
+
+
+def accumulate(returns: np.ndarray, monthly_sip: float, growth_in_savings: float, existing: float) -> np.ndarray:
+    """
+    Year-end balances for each path of yearly returns
+    The SIP is invested monthly at return / 12 within each year (stepping up
+    yearly) and existing investments compound yearly, as in the calculators
+    """
+    years = returns.shape[1]
+    monthly = returns / 12
+    month_growth = 1 + monthly
+    year_growth = month_growth ** 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        year_factor = np.where(monthly == 0, 12.0, (year_growth - 1) / monthly * month_growth)
+
+    # B_y = B_(y-1) * G_y + S_y * F_y, unrolled with cumulative products
+    yearly_sip = monthly_sip * np.power(1 + growth_in_savings / 100, np.arange(years))
+    compounding = np.cumprod(year_growth, axis=1)
+    sip_balance = compounding * np.cumsum(yearly_sip * year_factor / compounding, axis=1)
+    return sip_balance + existing * np.cumprod(1 + returns, axis=1)
+
+
+def _goal_chunk(params: dict, seed: np.random.SeedSequence, paths: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    years = params["years"]
+    returns = _draw_rates(rng, params["expected_returns"], params["return_volatility"], (paths, years))
+    inflation = _draw_rates(rng, params["inflation"], params["inflation_volatility"], (paths, years))
+
+    balances = accumulate(returns, params["monthly_sip"], params["growth_in_savings"], params["existing_investments"])
+    targets = params["cost_today"] * np.prod(1 + inflation, axis=1)
+    return balances, targets
+
+
+def _retirement_chunk(params: dict, seed: np.random.SeedSequence, paths: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    saving_years = params["years_remaining"]
+    retired_years = params["retirement_period"]
+    returns = _draw_rates(rng, params["expected_returns"], params["return_volatility"], (paths, saving_years))
+    inflation = _draw_rates(rng, params["inflation"], params["inflation_volatility"], (paths, saving_years))
+    kitty_returns = _draw_rates(rng, params["retirement_kitty_returns"], params["return_volatility"], (paths, retired_years))
+    post_inflation = _draw_rates(rng, params["post_retirement_inflation"], params["inflation_volatility"], (paths, retired_years))
+
+    saving = accumulate(returns, params["monthly_sip"], params["growth_in_savings"], params["existing_investments"])
+    corpus = saving[:, -1:]
+
+    # Expenses drawn at each retirement year end, starting from today's
+    # expenses inflated to retirement and growing with post-retirement inflation
+    first_expense = params["monthly_expenses"] * 12 * np.prod(1 + inflation, axis=1, keepdims=True)
+    expense_growth = np.cumprod(1 + post_inflation, axis=1) / (1 + post_inflation[:, :1])
+    expenses = first_expense * expense_growth
+
+    # B_y = B_(y-1) * (1 + K_y) - X_y  =>  B_y = D_y * (B_0 - sum_{k<=y} X_k / D_k)
+    discount = np.cumprod(1 + kitty_returns, axis=1)
+    drawn = np.cumsum(expenses / discount, axis=1)
+    retired = np.maximum(discount * (corpus - drawn), 0.0)
+
+    # The drawn total only grows, so a plan that survives its last year survived every year
+    tolerance = 1e-9 * np.maximum(corpus[:, 0], 1.0)
+    success = corpus[:, 0] - drawn[:, -1] >= -tolerance
+    return np.concatenate([saving, retired], axis=1), success
+
+
+def run_paths(chunk: Callable, params: dict, paths: int, seed: Optional[int]) -> Tuple[int, List[tuple]]:
+    """
+    Run a chunk function over `paths` paths
+    Returns (seed, per-chunk results); when no seed is given a fresh one is
+    drawn and returned so the run can be reproduced
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2 ** 63))
+    sizes = [CHUNK_PATHS] * (paths // CHUNK_PATHS)
+    if paths % CHUNK_PATHS:
+        sizes.append(paths % CHUNK_PATHS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    count_kernel("monte_carlo" + chunk.__name__.removesuffix("_chunk"), paths)
+
+    if SIMULATION_WORKERS > 0 and paths >= SIMULATION_PARALLEL_PATHS and len(sizes) > 1:
+        results = list(_get_pool().map(chunk, [params] * len(sizes), seeds, sizes))
+    else:
+        results = [chunk(params, child, size) for child, size in zip(seeds, sizes)]
+    return seed, results
+
+
+def percentile_bands(balances: np.ndarray) -> List[dict]:
+    """P10/P50/P90 of the balance at each year end"""
+    p10, p50, p90 = np.percentile(balances, [10, 50, 90], axis=0)
+    return [
+        {"year": year, "p10": low, "p50": mid, "p90": high}
+        for year, (low, mid, high) in enumerate(zip(p10.tolist(), p50.tolist(), p90.tolist()), start=1)
+    ]
+
+
+def simulate_goal(params: dict, paths: int, seed: Optional[int]) -> dict:
+    """
+    Simulate a lump-sum goal funded by a SIP and existing investments
+    Success means the corpus at the goal date covers the inflated cost
+    """
+    seed, results = run_paths(_goal_chunk, params, paths, seed)
+    balances = np.concatenate([balances for balances, _ in results])
+    targets = np.concatenate([targets for _, targets in results])
+    final = balances[:, -1]
+    p10, p50, p90 = np.percentile(final, [10, 50, 90]).tolist()
+    return {
+        "success_probability": float(np.mean(final >= targets * (1 - 1e-9))),
+        "corpus_p10": p10,
+        "corpus_p50": p50,
+        "corpus_p90": p90,
+        "seed": seed,
+        "bands": percentile_bands(balances),
+    }
+
+
+def simulate_retirement(params: dict, paths: int, seed: Optional[int]) -> dict:
+    """
+    Simulate saving until retirement and drawing expenses until life expectancy
+    Success means the kitty never runs out; corpus percentiles are at retirement
+    """
+    seed, results = run_paths(_retirement_chunk, params, paths, seed)
+    balances = np.concatenate([balances for balances, _ in results])
+    success = np.concatenate([success for _, success in results])
+    at_retirement = balances[:, params["years_remaining"] - 1]
+    p10, p50, p90 = np.percentile(at_retirement, [10, 50, 90]).tolist()
+    return {
+        "success_probability": float(np.mean(success)),
+        "corpus_p10": p10,
+        "corpus_p50": p50,
+        "corpus_p90": p90,
+        "seed": seed,
+        "bands": percentile_bands(balances),
+    }
@@ -1,15 +1,29 @@
 """
 Quick Tools Services
-Single Amount, Irregular Cash Flow, Weighted Average Returns
+Single Amount, Irregular Cash Flow, XIRR, Weighted Average Returns,
+Portfolio Projection
 """
-from app.services.financial_utils import (
-    future_value_lumpsum,
-    present_value_lumpsum
+from datetime import date
+from typing import List, Optional
+from app.services.cache import cached_calculation
+from app.services.cash_flows import DAYS_PER_YEAR, CashFlowColumns, flow_years
+from app.services.kernels import single_amount, irregular_cash_flow, xirr, weighted_returns
+from app.services.vectorized_utils import (
+    single_amount_columns,
+    irregular_cash_flow_columns,
+    weighted_returns_columns,
+    portfolio_columns,
+    batch_calculation,
+    to_columns,
+    from_columns
 )
 from app.models.quick_tools import (
     SingleAmountInput, SingleAmountOutput,
     IrregularCashFlowInput, IrregularCashFlowOutput,
-    WeightedReturnsInput, WeightedReturnsOutput
+    XIRRInput, XIRROutput,
+    WeightedReturnsInput, WeightedReturnsOutput,
+    PortfolioProjectionInput, PortfolioProjectionOutput,
+    AssetProjection, PortfolioYear
 )
 
 
@@ -17,98 +31,142 @@ class SingleAmountCalculator:
     """Single Amount PV/FV Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: SingleAmountInput) -> SingleAmountOutput:
-        if data.calculate_type == "present_value":
-            # Calculate PV of a future amount
-            result = present_value_lumpsum(
-                data.amount,
-                data.inflation,
-                data.years
-            )
-            calc_type = "present_value"
-        else:
-            # Calculate FV of a present amount
-            result = future_value_lumpsum(
-                data.amount,
-                data.inflation,
-                data.years
-            )
-            calc_type = "future_value"
-        
-        return SingleAmountOutput(
-            result=result,
-            calculation_type=calc_type
-        )
+        result = single_amount(data.calculate_type, data.amount, data.years, data.inflation)
+        return SingleAmountOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[SingleAmountInput]) -> List[SingleAmountOutput]:
+        return from_columns(SingleAmountOutput, single_amount_columns(**to_columns(items)))
 
 
 class IrregularCashFlowCalculator:
     """Irregular Cash Flow Calculator"""
     
     @staticmethod
-    def calculate(data: IrregularCashFlowInput) -> IrregularCashFlowOutput:
-        total_value = 0
-        
-        if data.calculate_type == "present_value":
-            # Calculate PV of all future cash flows
-            for cf in data.cash_flows:
-                pv = present_value_lumpsum(
-                    cf.amount,
-                    data.discount_rate,
-                    cf.years
-                )
-                total_value += pv
-            calc_type = "present_value"
-        else:
-            # Calculate FV of all cash flows to a common future point
-            max_years = max(cf.years for cf in data.cash_flows)
-            
-            for cf in data.cash_flows:
-                # Grow each cash flow to the maximum year
-                years_to_grow = max_years - cf.years
-                fv = future_value_lumpsum(
-                    cf.amount,
-                    data.discount_rate,
-                    years_to_grow
-                )
-                total_value += fv
-            calc_type = "future_value"
-        
-        return IrregularCashFlowOutput(
-            total_value=total_value,
-            calculation_type=calc_type
+    def calculate(data: IrregularCashFlowInput, today: Optional[date] = None) -> IrregularCashFlowOutput:
+        # Dated flows are timed from the valuation date, which defaults to
+        # today, so then the date is part of the cache key
+        if data.valuation_date is None and any(flow.payment_date for flow in data.cash_flows):
+            return IrregularCashFlowCalculator._calculate(data, today or date.today())
+        return IrregularCashFlowCalculator._calculate(data)
+    
+    @staticmethod
+    @cached_calculation
+    def _calculate(data: IrregularCashFlowInput, today: Optional[date] = None) -> IrregularCashFlowOutput:
+        valued = data.valuation_date or today
+        result = irregular_cash_flow(
+            data.calculate_type,
+            [cf.amount for cf in data.cash_flows],
+            [cf.years if cf.years is not None else flow_years(cf, valued) for cf in data.cash_flows],
+            data.discount_rate
         )
+        return IrregularCashFlowOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    def calculate_columns(calculate_type: str, discount_rate: float, flows: CashFlowColumns) -> IrregularCashFlowOutput:
+        """Value cash flows already in columns, such as a parsed upload"""
+        result = irregular_cash_flow(calculate_type, flows.amounts, flows.times, discount_rate)
+        return IrregularCashFlowOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[IrregularCashFlowInput]) -> List[IrregularCashFlowOutput]:
+        return from_columns(IrregularCashFlowOutput, irregular_cash_flow_columns(**to_columns(items)))
+
+
+class XIRRCalculator:
+    """XIRR Calculator: annualized return of dated investments and returns"""
+    
+    @staticmethod
+    @cached_calculation
+    def calculate(data: XIRRInput) -> XIRROutput:
+        result = xirr(
+            [cf.amount for cf in data.cash_flows],
+            [cf.payment_date.toordinal() / DAYS_PER_YEAR for cf in data.cash_flows],
+            data.guess
+        )
+        return XIRROutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    def calculate_columns(guess: float, flows: CashFlowColumns) -> XIRROutput:
+        """Solve cash flows already in columns, such as a parsed upload"""
+        return XIRROutput.model_validate(xirr(flows.amounts, flows.times, guess), from_attributes=True)
 
 
 class WeightedReturnsCalculator:
     """Weighted Average Returns Calculator"""
     
     @staticmethod
+    @cached_calculation
     def calculate(data: WeightedReturnsInput) -> WeightedReturnsOutput:
-        # Total investment
-        total_invested = sum(asset.investment_amount for asset in data.assets)
-        
-        if total_invested == 0:
-            return WeightedReturnsOutput(
-                future_value=0,
-                weighted_return=0,
-                total_invested=0
-            )
-        
-        # Calculate weighted average return
-        weighted_return = sum(
-            (asset.investment_amount / total_invested) * asset.expected_return
-            for asset in data.assets
-        )
-        
-        # Calculate future value using weighted return
-        future_value = future_value_lumpsum(
-            total_invested,
-            weighted_return,
-            data.years
-        )
-        
-        return WeightedReturnsOutput(
-            future_value=future_value,
-            weighted_return=weighted_return,
-            total_invested=total_invested
+        result = weighted_returns(
+            data.years,
+            [asset.investment_amount for asset in data.assets],
+            [asset.expected_return for asset in data.assets]
         )
+        return WeightedReturnsOutput.model_validate(result, from_attributes=True)
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[WeightedReturnsInput]) -> List[WeightedReturnsOutput]:
+        return from_columns(WeightedReturnsOutput, weighted_returns_columns(**to_columns(items)))
+
+
+class PortfolioProjectionCalculator:
+    """Portfolio Projection: every holding compounded separately, with rebalancing"""
+    
+    @staticmethod
+    @cached_calculation
+    def calculate(data: PortfolioProjectionInput) -> PortfolioProjectionOutput:
+        return PortfolioProjectionCalculator.calculate_batch([data])[0]
+    
+    @staticmethod
+    @batch_calculation
+    def calculate_batch(items: List[PortfolioProjectionInput]) -> List[PortfolioProjectionOutput]:
+        result = portfolio_columns(**to_columns(items))
+        outputs = []
+        start = 0
+        for index, data in enumerate(items):
+            holdings = slice(start, start + len(data.assets))
+            start = holdings.stop
+            weights = (result["yearly_weights"][holdings, :data.years] * 100).T.tolist()
+            assets = [
+                AssetProjection(
+                    name=asset.name,
+                    future_value=future_value,
+                    total_invested=invested,
+                    weight=year_weights,
+                    target_weight=target
+                )
+                for asset, future_value, invested, year_weights, target in zip(
+                    data.assets,
+                    result["asset_future_value"][holdings].tolist(),
+                    result["asset_total_invested"][holdings].tolist(),
+                    weights[-1],
+                    (result["target_weight"][holdings] * 100).tolist()
+                )
+            ]
+            years = [
+                PortfolioYear(year=year, value=value, total_invested=invested, weights=year_weights, drift=drift)
+                for year, value, invested, year_weights, drift in zip(
+                    range(1, data.years + 1),
+                    result["yearly_values"][index, :data.years].tolist(),
+                    result["yearly_invested"][index, :data.years].tolist(),
+                    weights,
+                    (result["drift"][index, :data.years] * 100).tolist()
+                )
+            ]
+            future_value = float(result["future_value"][index])
+            total_invested = float(result["total_invested"][index])
+            outputs.append(PortfolioProjectionOutput(
+                future_value=future_value,
+                total_invested=total_invested,
+                wealth_gain=future_value - total_invested,
+                single_rate_value=float(result["single_rate_value"][index]),
+                assets=assets,
+                years=years
+            ))
+        return outputs
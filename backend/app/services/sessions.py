@@ -0,0 +1,269 @@
+"""
+Live calculator sessions
+State behind the WebSocket sessions used by interactive inputs: a session
+holds one calculator's latest inputs, merges the deltas a client sends, and
+recomputes only the result parts whose input fields changed since they were
+last pushed
+"""
+import json
+from typing import Callable, Dict, Optional
+
+from pydantic import BaseModel, ValidationError
+from app.metrics import registry, Counter, Collected
+from app.services.executor import run_calculation
+from app.services.financial_service import (
+    SIPGrowthCalculator,
+    SIPNeedCalculator,
+    SIPDelayCalculator,
+    SWPCalculator
+)
+from app.services.life_goal_service import (
+    GOAL_FIELDS,
+    RetirementCalculator,
+    EducationCalculator,
+    MarriageCalculator,
+    OtherGoalCalculator
+)
+from app.models.financial import SIPGrowthInput, SIPNeedInput, SIPDelayInput, SWPInput
+from app.models.life_goal import (
+    RetirementInput,
+    EducationInput,
+    MarriageInput,
+    OtherGoalInput,
+    SimulationSettings,
+    RetirementSimulationInput,
+    EducationSimulationInput,
+    MarriageSimulationInput,
+    OtherGoalSimulationInput
+)
+
+SESSION_UPDATES = registry.register(Counter(
+    "session_updates_total",
+    "Live session traffic by calculator: messages received and rejected, results pushed, "
+    "and recomputes dropped because newer input arrived",
+    ("calculator", "outcome")))
+
+# Open sessions per calculator
+_open_sessions: Dict[str, int] = {}
+
+registry.register(Collected("sessions_open", "Open live calculator sessions", "gauge", ("calculator",),
+                            lambda: {(name,): count for name, count in _open_sessions.items()}))
+
+
+def _sip_growth_schedule(data: SIPGrowthInput) -> list:
+    return list(SIPGrowthCalculator.schedule(data, "year"))
+
+
+def _swp_schedule(data: SWPInput) -> list:
+    return list(SWPCalculator.schedule(data, "year"))
+
+
+def _retirement_schedule(data: RetirementInput) -> list:
+    return list(RetirementCalculator.schedule(data))
+
+
+class SessionPart:
+    """
+    One result a session can push
+    compute takes the input model (or, for simulation parts, the calculator's
+    simulation input); fields are the inputs it reads, None for all of them
+    """
+    __slots__ = ("compute", "fields", "simulation")
+
+    def __init__(self, compute: Callable, fields: Optional[tuple] = None, simulation: bool = False):
+        self.compute = compute
+        self.fields = fields
+        self.simulation = simulation
+
+
+class SessionCalculator:
+    """Input model and pushable parts of one calculator; simulation_model when it has a simulation part"""
+    __slots__ = ("input_model", "parts", "simulation_model")
+
+    def __init__(self, input_model, parts: Dict[str, SessionPart], simulation_model=None):
+        self.input_model = input_model
+        self.parts = parts
+        self.simulation_model = simulation_model
+
+
+def _goal_session(input_model, calculator, simulation_model) -> SessionCalculator:
+    return SessionCalculator(input_model, {
+        "result": SessionPart(calculator.calculate, GOAL_FIELDS),
+        "simulation": SessionPart(calculator.simulate, GOAL_FIELDS, simulation=True),
+    }, simulation_model)
+
+
+# Calculator name (as in the route) -> session definition
+SESSION_CALCULATORS = {
+    "sip-growth": SessionCalculator(SIPGrowthInput, {
+        "result": SessionPart(SIPGrowthCalculator.calculate),
+        "schedule": SessionPart(_sip_growth_schedule),
+    }),
+    "sip-need": SessionCalculator(SIPNeedInput, {"result": SessionPart(SIPNeedCalculator.calculate)}),
+    "sip-delay": SessionCalculator(SIPDelayInput, {"result": SessionPart(SIPDelayCalculator.calculate)}),
+    "swp": SessionCalculator(SWPInput, {
+        "result": SessionPart(SWPCalculator.calculate),
+        # Instalment dates are only in the result
+        "schedule": SessionPart(_swp_schedule, (
+            "initial_investment", "monthly_withdrawal", "expected_returns", "yearly_increase",
+            "increase_withdrawal", "swp_start_years"
+        )),
+    }),
+    "retirement": SessionCalculator(RetirementInput, {
+        "result": SessionPart(RetirementCalculator.calculate),
+        "schedule": SessionPart(_retirement_schedule),
+        "simulation": SessionPart(RetirementCalculator.simulate, simulation=True),
+    }, RetirementSimulationInput),
+    "education": _goal_session(EducationInput, EducationCalculator, EducationSimulationInput),
+    "marriage": _goal_session(MarriageInput, MarriageCalculator, MarriageSimulationInput),
+    "other-goal": _goal_session(OtherGoalInput, OtherGoalCalculator, OtherGoalSimulationInput),
+}
+
+
+def _jsonable(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return value
+
+
+class CalculatorSession:
+    """
+    One client's session with a calculator
+    apply() merges a message into the pending state and is cheap, so bursts
+    of slider events just overwrite each other; recompute() then works from
+    the latest state only. Client messages are JSON objects with any of:
+        seq         number echoed back with the results for that state
+        inputs      changed input fields (null restores a field's default)
+        simulation  changed simulation settings
+        parts       results to receive (default ["result"])
+    """
+
+    def __init__(self, calculator: str):
+        if calculator not in SESSION_CALCULATORS:
+            raise ValueError(f"Unknown calculator '{calculator}'")
+        self.calculator = calculator
+        self.spec = SESSION_CALCULATORS[calculator]
+        self.inputs: dict = {}
+        self.settings: dict = {}
+        self.parts = ["result"]
+        self.seq = None
+        # Bumped by every applied message, so a recompute can tell it went stale
+        self.version = 0
+        # Part -> (key of the state it was computed from, value), the key last
+        # pushed, and the keys of the message recompute() returned last
+        self._computed: Dict[str, tuple] = {}
+        self._pushed: Dict[str, tuple] = {}
+        self._unsent: Dict[str, tuple] = {}
+        _open_sessions[calculator] = _open_sessions.get(calculator, 0) + 1
+
+    def close(self) -> None:
+        _open_sessions[self.calculator] -= 1
+
+    def describe(self) -> dict:
+        """First message of a session: the calculator and the parts it can push"""
+        return {"calculator": self.calculator, "parts": list(self.spec.parts)}
+
+    def apply(self, message) -> None:
+        """Merge one client message into the pending state; a malformed message changes nothing"""
+        SESSION_UPDATES.inc(self.calculator, "received")
+        if not isinstance(message, dict):
+            raise ValueError("Messages must be JSON objects")
+        unknown = set(message) - {"seq", "inputs", "simulation", "parts"}
+        if unknown:
+            raise ValueError(f"Unknown message keys: {', '.join(sorted(unknown))}")
+
+        inputs = self._delta(message.get("inputs"), self.spec.input_model, "inputs")
+        settings = self._delta(message.get("simulation"), SimulationSettings, "simulation")
+        if settings and self.spec.simulation_model is None:
+            raise ValueError(f"The {self.calculator} calculator has no simulation")
+        parts = message.get("parts")
+        if parts is not None:
+            if not isinstance(parts, list) or any(not isinstance(part, str) or part not in self.spec.parts for part in parts):
+                raise ValueError(f"parts must be a list of: {', '.join(self.spec.parts)}")
+
+        for state, delta in ((self.inputs, inputs), (self.settings, settings)):
+            for name, value in delta.items():
+                if value is None:
+                    state.pop(name, None)
+                else:
+                    state[name] = value
+        if parts is not None:
+            self.parts = list(dict.fromkeys(parts))
+            # Parts subscribed again are pushed again
+            self._pushed = {name: key for name, key in self._pushed.items() if name in self.parts}
+        self.seq = message.get("seq")
+        self.version += 1
+
+    @staticmethod
+    def _delta(delta, model, section: str) -> dict:
+        if delta is None:
+            return {}
+        if not isinstance(delta, dict):
+            raise ValueError(f"{section} must be a JSON object")
+        unknown = set(delta) - set(model.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown {section} fields: {', '.join(sorted(unknown))}")
+        return delta
+
+    async def recompute(self) -> Optional[dict]:
+        """
+        Message for the current state: the subscribed parts whose fields
+        changed since they were last pushed, or the validation error
+        None when nothing changed, or when a newer message arrived while
+        computing (the caller recomputes from the latest state instead).
+        Results only count as pushed once the caller confirms it sent them.
+        """
+        self._unsent = {}
+        version = self.version
+        try:
+            data = self.spec.input_model.model_validate(self.inputs)
+            settings = SimulationSettings.model_validate(self.settings)
+        except ValidationError as e:
+            # Push everything again once the state is valid
+            self._pushed.clear()
+            SESSION_UPDATES.inc(self.calculator, "rejected")
+            return {"seq": self.seq, "errors": json.loads(e.json(include_url=False))}
+
+        values = data.model_dump(mode="json")
+        setting_values = tuple(settings.model_dump(mode="json").values())
+        results = {}
+        keys = {}
+        for name in self.parts:
+            part = self.spec.parts[name]
+            key = tuple(values[field] for field in (part.fields or values))
+            if part.simulation:
+                key += setting_values
+            if self._pushed.get(name) == key:
+                continue
+            computed = self._computed.get(name)
+            if computed is None or computed[0] != key:
+                argument = self.spec.simulation_model(inputs=data, simulation=settings) if part.simulation else data
+                try:
+                    value = _jsonable(await run_calculation(part.compute, argument))
+                except ValueError as e:
+                    self._pushed.clear()
+                    SESSION_UPDATES.inc(self.calculator, "rejected")
+                    return {"seq": self.seq, "error": str(e)}
+                computed = self._computed[name] = (key, value)
+                if self.version != version:
+                    SESSION_UPDATES.inc(self.calculator, "dropped")
+                    return None
+            results[name] = computed[1]
+            keys[name] = key
+
+        if not results:
+            return None
+        self._unsent = keys
+        return {"seq": self.seq, "results": results}
+
+    def sent(self) -> None:
+        """Record that the message from the last recompute() reached the client"""
+        if self._unsent:
+            self._pushed.update(self._unsent)
+            self._unsent = {}
+            SESSION_UPDATES.inc(self.calculator, "pushed")
+
+    def dropped(self) -> None:
+        """The message from the last recompute() went stale before it was sent"""
+        self._unsent = {}
+        SESSION_UPDATES.inc(self.calculator, "dropped")
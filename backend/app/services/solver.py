@@ -0,0 +1,201 @@
+"""
+Root-finding utilities
+Bracketed Brent and safeguarded Newton solvers for goals that are
+nonlinear in the unknown (rates, durations, growing withdrawals)
+"""
+import math
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from app.metrics import counted_solver
+
+
+# Relative tolerance on the root, independent of the size of the goal
+DEFAULT_RTOL = 1e-12
+DEFAULT_XTOL = 1e-12
+DEFAULT_MAX_ITER = 100
+
+
+class SolverError(ValueError):
+    """Raised when a root cannot be bracketed or the solver fails"""
+
+
+class SolverResult(NamedTuple):
+    """Outcome of a root search with iteration statistics"""
+    root: float
+    converged: bool
+    iterations: int
+    function_calls: int
+    residual: float
+    bracket: Tuple[float, float]
+    method: str
+
+
+def _tolerance(x: float, xtol: float, rtol: float) -> float:
+    return xtol + rtol * abs(x)
+
+
+def find_bracket(f: Callable[[float], float], low: float, high: float,
+                 lower_bound: float = -math.inf, upper_bound: float = math.inf,
+                 max_expansions: int = 60) -> Tuple[float, float, float, float, int]:
+    """
+    Widen [low, high] geometrically until f changes sign
+    Never steps outside [lower_bound, upper_bound]
+    Returns (low, high, f(low), f(high), function_calls)
+    """
+    if low > high:
+        low, high = high, low
+    low = max(low, lower_bound)
+    high = min(high, upper_bound)
+    f_low, f_high = f(low), f(high)
+    calls = 2
+
+    for _ in range(max_expansions):
+        if f_low == 0 or f_high == 0 or (f_low < 0) != (f_high < 0):
+            return low, high, f_low, f_high, calls
+        if low <= lower_bound and high >= upper_bound:
+            break
+
+        width = high - low if high > low else max(abs(low), 1.0)
+        # Expand towards the side whose value is closer to zero
+        if abs(f_low) < abs(f_high) and low > lower_bound:
+            low = max(lower_bound, low - 1.6 * width)
+            f_low = f(low)
+        elif high < upper_bound:
+            high = min(upper_bound, high + 1.6 * width)
+            f_high = f(high)
+        else:
+            low = max(lower_bound, low - 1.6 * width)
+            f_low = f(low)
+        calls += 1
+
+    raise SolverError("Could not bracket a solution within the allowed range")
+
+
+@counted_solver
+def brent(f: Callable[[float], float], low: float, high: float,
+          xtol: float = DEFAULT_XTOL, rtol: float = DEFAULT_RTOL,
+          max_iter: int = DEFAULT_MAX_ITER,
+          f_low: Optional[float] = None, f_high: Optional[float] = None) -> SolverResult:
+    """
+    Brent's method on a sign-changing bracket [low, high]
+    Combines inverse quadratic interpolation, secant and bisection steps
+    """
+    a, b = low, high
+    fa = f(a) if f_low is None else f_low
+    fb = f(b) if f_high is None else f_high
+    calls = (f_low is None) + (f_high is None)
+
+    if fa == 0:
+        return SolverResult(a, True, 0, calls, 0.0, (low, high), "brent")
+    if fb == 0:
+        return SolverResult(b, True, 0, calls, 0.0, (low, high), "brent")
+    if (fa < 0) == (fb < 0):
+        raise SolverError("Root is not bracketed: f(low) and f(high) have the same sign")
+
+    c, fc = a, fa
+    d = e = b - a
+
+    for iteration in range(1, max_iter + 1):
+        if (fb < 0) == (fc < 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 0.5 * _tolerance(b, xtol, rtol)
+        m = 0.5 * (c - b)
+
+        if fb == 0 or abs(m) <= tol:
+            return SolverResult(b, True, iteration, calls, fb, (low, high), "brent")
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # Secant step
+                p = 2 * m * s
+                q = 1 - s
+            else:
+                # Inverse quadratic interpolation
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = f(b)
+        calls += 1
+
+    return SolverResult(b, False, max_iter, calls, fb, (low, high), "brent")
+
+
+@counted_solver
+def newton(f: Callable[[float], float], fprime: Callable[[float], float], x0: float,
+           low: Optional[float] = None, high: Optional[float] = None,
+           xtol: float = DEFAULT_XTOL, rtol: float = DEFAULT_RTOL,
+           max_iter: int = DEFAULT_MAX_ITER) -> SolverResult:
+    """
+    Newton's method, safeguarded by a bracket when one is given
+    Steps that leave the bracket (or have a vanishing derivative) fall back to bisection
+    """
+    bracketed = low is not None and high is not None
+    calls = 0
+
+    if bracketed:
+        f_low, f_high = f(low), f(high)
+        calls += 2
+        if f_low == 0:
+            return SolverResult(low, True, 0, calls, 0.0, (low, high), "newton")
+        if f_high == 0:
+            return SolverResult(high, True, 0, calls, 0.0, (low, high), "newton")
+        if (f_low < 0) == (f_high < 0):
+            raise SolverError("Root is not bracketed: f(low) and f(high) have the same sign")
+        lo, hi = low, high
+        lo_negative = f_low < 0
+        x = min(max(x0, lo), hi)
+    else:
+        x = x0
+
+    fx = f(x)
+    calls += 1
+
+    for iteration in range(1, max_iter + 1):
+        if fx == 0:
+            return SolverResult(x, True, iteration, calls, fx, (low, high) if bracketed else (x0, x0), "newton")
+
+        if bracketed:
+            # Shrink the bracket around the sign change
+            if (fx < 0) == lo_negative:
+                lo = x
+            else:
+                hi = x
+
+        slope = fprime(x)
+        calls += 1
+        step_ok = slope != 0 and math.isfinite(slope)
+        x_new = x - fx / slope if step_ok else x
+
+        if bracketed and (not step_ok or not (min(lo, hi) < x_new < max(lo, hi))):
+            x_new = 0.5 * (lo + hi)
+        elif not step_ok:
+            raise SolverError("Derivative vanished during Newton iteration")
+
+        converged = abs(x_new - x) <= _tolerance(x_new, xtol, rtol)
+        x = x_new
+        fx = f(x)
+        calls += 1
+        if converged:
+            return SolverResult(x, True, iteration, calls, fx, (low, high) if bracketed else (x0, x0), "newton")
+
+    return SolverResult(x, False, max_iter, calls, fx, (low, high) if bracketed else (x0, x0), "newton")
@@ -0,0 +1,538 @@
+"""
+Vectorized financial calculation utilities
+NumPy counterparts of financial_utils that evaluate whole arrays of inputs
+at once, plus column-wise calculator kernels shared by batch and grid endpoints
+"""
+import functools
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Sequence, Type
+
+import numpy as np
+from pydantic import BaseModel
+from app.metrics import count_kernel
+from app.services.cash_flows import flow_years
+
+
+def _as_float(value) -> np.ndarray:
+    return np.asarray(value, dtype=float)
+
+
+def future_value_lumpsum(present_value, rate, years) -> np.ndarray:
+    """
+    Future value of lump sums
+    FV = PV * (1 + r)^n
+    """
+    return _as_float(present_value) * np.power(1 + _as_float(rate) / 100, years)
+
+
+def present_value_lumpsum(future_value, rate, years) -> np.ndarray:
+    """
+    Present value of future amounts
+    PV = FV / (1 + r)^n
+    """
+    return _as_float(future_value) / np.power(1 + _as_float(rate) / 100, years)
+
+
+def future_value_sip(monthly_investment, annual_rate, years, growth_rate=0) -> np.ndarray:
+    """
+    Future value of SIPs with optional annual step-up
+    Same closed form as financial_utils.future_value_sip, element-wise
+    """
+    monthly_investment = _as_float(monthly_investment)
+    monthly_rate = _as_float(annual_rate) / 12 / 100
+    growth_rate = _as_float(growth_rate)
+    months = _as_float(years) * 12
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = 1 + monthly_rate
+        level = np.where(
+            monthly_rate == 0,
+            months,
+            (np.power(growth, months) - 1) / monthly_rate * growth
+        )
+
+        full_years, partial_months = np.divmod(np.round(months), 12)
+        year_growth = np.power(growth, 12)
+        year_factor = np.where(monthly_rate == 0, 12.0, (year_growth - 1) / monthly_rate * growth)
+
+        # Growing annuity across years, in log space (see financial_utils)
+        log_ratio = np.log1p(growth_rate / 100) - 12 * np.log1p(monthly_rate)
+        base = np.power(year_growth, np.maximum(full_years - 1, 0))
+        series = np.where(
+            log_ratio == 0,
+            full_years * base,
+            base * np.expm1(full_years * log_ratio) / np.expm1(log_ratio)
+        )
+        series = np.where(full_years == 0, 0.0, series)
+
+        partial_factor = np.where(
+            monthly_rate == 0,
+            partial_months,
+            (np.power(growth, partial_months) - 1) / monthly_rate * growth
+        )
+        stepped = year_factor * series * np.power(growth, partial_months)
+        stepped = stepped + np.power(1 + growth_rate / 100, full_years) * partial_factor
+
+    return monthly_investment * np.where(growth_rate == 0, level, stepped)
+
+
+def calculate_sip_needed(target_amount, annual_rate, years, growth_rate=0) -> np.ndarray:
+    """
+    Monthly SIP needed to reach each target amount
+    FV is linear in the instalment, so this divides by the unit SIP value
+    """
+    return _as_float(target_amount) / future_value_sip(1.0, annual_rate, years, growth_rate)
+
+
+def total_sip_invested(monthly_sip, years, growth_rate=0) -> np.ndarray:
+    """
+    Total amount invested in SIPs
+    """
+    monthly_sip = _as_float(monthly_sip)
+    years = _as_float(years)
+    growth_rate = _as_float(growth_rate)
+    step = 1 + growth_rate / 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stepped = monthly_sip * 12 * (np.power(step, years) - 1) / (step - 1)
+    return np.where(growth_rate == 0, monthly_sip * years * 12, stepped)
+
+
+def growing_annuity_present_value(first_payment, growth_rate, discount_rate, periods) -> np.ndarray:
+    """
+    Present value of `periods` yearly payments growing at growth_rate %,
+    each discounted at discount_rate % from the end of its year
+    PV = sum_{y=1..n} P * (1 + g)^(y-1) / (1 + d)^y
+    """
+    first_payment = _as_float(first_payment)
+    growth = 1 + _as_float(growth_rate) / 100
+    discount = 1 + _as_float(discount_rate) / 100
+    periods = _as_float(periods)
+    ratio = growth / discount
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series = np.where(ratio == 1, periods, -np.expm1(periods * np.log(ratio)) / (1 - ratio))
+    return first_payment / discount * series
+
+
+def _balance_after(balance, withdrawal, monthly_rate, months) -> np.ndarray:
+    growth = np.power(1 + monthly_rate, months)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(monthly_rate == 0, months, (growth - 1) / monthly_rate)
+    return balance * growth - withdrawal * annuity
+
+
+def swp_duration(initial_amount, monthly_withdrawal, annual_return, yearly_increase, increase_enabled,
+                 max_months: int = 50 * 12):
+    """
+    Run many SWPs side by side, one year per step
+    Returns (months_lasted, remaining_value, total_withdrawn) arrays, with the
+    same semantics as financial_utils.simulate_swp
+    """
+    balance = _as_float(initial_amount).copy()
+    shape = balance.shape
+    withdrawal = np.broadcast_to(_as_float(monthly_withdrawal), shape).copy()
+    monthly_rate = np.broadcast_to(_as_float(annual_return) / 12 / 100, shape)
+    yearly_step = np.broadcast_to(np.where(increase_enabled, 1 + _as_float(yearly_increase) / 100, 1.0), shape)
+
+    months = np.zeros(shape, dtype=int)
+    total_withdrawn = np.zeros(shape)
+    active = balance > 0
+    steps = 0
+
+    for _ in range(max_months // 12):
+        if not active.any():
+            break
+        steps += 1
+        year_end = _balance_after(balance, withdrawal, monthly_rate, 12)
+        survives = active & (year_end > 0)
+        depletes = active & ~survives
+
+        if depletes.any():
+            # Month within the year at which the balance runs out
+            b, w, i = balance[depletes], withdrawal[depletes], monthly_rate[depletes]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                depletion = np.where(i == 0, b / w, np.log(w / (w - b * i)) / np.log1p(i))
+            lasted = np.clip(np.ceil(depletion), 1, 12)
+            lasted = np.where((lasted > 1) & (_balance_after(b, w, i, lasted - 1) <= 0), lasted - 1, lasted)
+            lasted = np.where(_balance_after(b, w, i, lasted) > 0, np.minimum(lasted + 1, 12), lasted)
+
+            months[depletes] += lasted.astype(int)
+            total_withdrawn[depletes] += w * lasted
+            balance[depletes] = 0.0
+            active &= ~depletes
+
+        balance = np.where(survives, year_end, balance)
+        months += 12 * survives
+        total_withdrawn += np.where(survives, withdrawal * 12, 0.0)
+        withdrawal = np.where(survives, withdrawal * yearly_step, withdrawal)
+
+    count_kernel("swp_duration", steps)
+    return months, np.maximum(balance, 0.0), total_withdrawn
+
+
+# Column-wise calculator kernels
+# Each takes one array (or scalar) per input field, named exactly like the
+# Pydantic input model, and returns a dict of arrays named like the output model.
+
+def sip_growth_columns(monthly_investment, period_years, expected_returns, growth_in_savings) -> Dict[str, np.ndarray]:
+    future_value = future_value_sip(monthly_investment, expected_returns, period_years, growth_in_savings)
+    total_invested = total_sip_invested(monthly_investment, period_years, growth_in_savings)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_multiple = np.where(total_invested > 0, future_value / total_invested, 0.0)
+    return {
+        "future_value": future_value,
+        "total_invested": total_invested,
+        "wealth_gain": future_value - total_invested,
+        "growth_multiple": growth_multiple,
+    }
+
+
+def sip_need_columns(target_amount, period_years, expected_returns, inflation, growth_in_savings) -> Dict[str, np.ndarray]:
+    target_adjusted = future_value_lumpsum(target_amount, inflation, period_years)
+    monthly_sip = calculate_sip_needed(target_adjusted, expected_returns, period_years, growth_in_savings)
+    projected_investment = total_sip_invested(monthly_sip, period_years, growth_in_savings)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_multiple = np.where(projected_investment > 0, target_adjusted / projected_investment, 0.0)
+    return {
+        "monthly_sip": monthly_sip,
+        "target_amount_adjusted": target_adjusted,
+        "projected_investment": projected_investment,
+        "growth_multiple": growth_multiple,
+    }
+
+
+def sip_delay_columns(monthly_investment, period_years, expected_returns, delay_months) -> Dict[str, np.ndarray]:
+    fv_without_delay = future_value_sip(monthly_investment, expected_returns, period_years)
+    reduced_period = _as_float(period_years) - _as_float(delay_months) / 12
+    fv_with_delay = np.where(
+        reduced_period <= 0,
+        0.0,
+        future_value_sip(monthly_investment, expected_returns, np.maximum(reduced_period, 0))
+    )
+    return {
+        "delay_cost": fv_without_delay - fv_with_delay,
+        "future_value_without_delay": fv_without_delay,
+        "future_value_with_delay": fv_with_delay,
+    }
+
+
+def swp_columns(initial_investment, monthly_withdrawal, expected_returns, yearly_increase,
+                increase_withdrawal, swp_start_years, start_date=None) -> Dict[str, np.ndarray]:
+    initial = future_value_lumpsum(initial_investment, expected_returns, swp_start_years)
+    months_lasted, remaining_value, total_withdrawn = swp_duration(
+        initial,
+        monthly_withdrawal,
+        expected_returns,
+        yearly_increase,
+        increase_withdrawal
+    )
+
+    today = date.today()
+    start_years = np.broadcast_to(swp_start_years, months_lasted.shape).tolist()
+    start_dates = np.broadcast_to(np.asarray(start_date, dtype=object), months_lasted.shape).tolist()
+    last_dates = [
+        ((invested or today) + timedelta(days=365 * start) + timedelta(days=30 * months)).strftime("%d-%B-%Y")
+        for invested, start, months in zip(start_dates, start_years, months_lasted.tolist())
+    ]
+    return {
+        "period_end_value": remaining_value,
+        "total_withdrawn": total_withdrawn,
+        "full_instalments": months_lasted,
+        "last_instalment_date": np.array(last_dates, dtype=object),
+    }
+
+
+def retirement_columns(present_age, retirement_age, monthly_expenses, expected_returns, inflation,
+                       growth_in_savings, existing_investments, life_expectancy,
+                       retirement_kitty_returns, post_retirement_inflation) -> Dict[str, np.ndarray]:
+    years_remaining = np.asarray(retirement_age) - np.asarray(present_age)
+    if np.any(years_remaining <= 0):
+        raise ValueError("Retirement age must be greater than present age")
+
+    monthly_expenses_retirement = future_value_lumpsum(monthly_expenses, inflation, years_remaining)
+    retirement_period = np.asarray(life_expectancy) - np.asarray(retirement_age)
+    retirement_period = np.where(retirement_period <= 0, 25, retirement_period)
+
+    recommended_corpus = growing_annuity_present_value(
+        monthly_expenses_retirement * 12,
+        post_retirement_inflation,
+        retirement_kitty_returns,
+        retirement_period
+    )
+    future_value_existing = future_value_lumpsum(existing_investments, expected_returns, years_remaining)
+    shortfall = recommended_corpus - future_value_existing
+    funded = shortfall <= 0
+
+    monthly_sip = np.where(funded, 0.0, calculate_sip_needed(shortfall, expected_returns, years_remaining, growth_in_savings))
+    one_time_investment = np.where(funded, 0.0, present_value_lumpsum(shortfall, expected_returns, years_remaining))
+    return {
+        "recommended_corpus": recommended_corpus,
+        "monthly_sip": monthly_sip,
+        "yearly_sip": monthly_sip * 12,
+        "one_time_investment": one_time_investment,
+        "future_value_existing": future_value_existing,
+        "shortfall": shortfall,
+        "monthly_expenses_retirement": monthly_expenses_retirement,
+        "years_remaining": np.broadcast_to(years_remaining, shortfall.shape),
+    }
+
+
+def goal_columns(years_remaining, cost_today, inflation, expected_returns, growth_in_savings,
+                 existing_investments) -> Dict[str, np.ndarray]:
+    """Shared kernel for the education, marriage and other-goal calculators"""
+    target_amount = future_value_lumpsum(cost_today, inflation, years_remaining)
+    future_value_existing = future_value_lumpsum(existing_investments, expected_returns, years_remaining)
+    shortfall = target_amount - future_value_existing
+    funded = shortfall <= 0
+
+    monthly_sip = np.where(funded, 0.0, calculate_sip_needed(shortfall, expected_returns, years_remaining, growth_in_savings))
+    one_time_investment = np.where(funded, 0.0, present_value_lumpsum(shortfall, expected_returns, years_remaining))
+    return {
+        "target_amount": target_amount,
+        "monthly_sip": monthly_sip,
+        "yearly_sip": monthly_sip * 12,
+        "one_time_investment": one_time_investment,
+        "future_value_existing": future_value_existing,
+        "shortfall": shortfall,
+    }
+
+
+def other_goal_columns(goal_name, **goal) -> Dict[str, np.ndarray]:
+    return goal_columns(**goal)
+
+
+def single_amount_columns(calculate_type, amount, years, inflation) -> Dict[str, np.ndarray]:
+    is_present_value = np.asarray(calculate_type) == "present_value"
+    factor = np.power(1 + _as_float(inflation) / 100, years)
+    amount = _as_float(amount)
+    return {
+        "result": np.where(is_present_value, amount / factor, amount * factor),
+        "calculation_type": np.where(is_present_value, "present_value", "future_value"),
+    }
+
+
+def allocate_budget(budget: float, required, priority) -> np.ndarray:
+    """
+    Split a monthly budget across goals by priority tier
+    Tiers are funded in order (1 first). A tier the remaining budget can't
+    cover in full gets the same fraction of every goal's requirement, which
+    maximizes the funding of its least-funded goal; later tiers get nothing.
+    """
+    required = _as_float(required)
+    priority = np.asarray(priority)
+    allocated = np.zeros_like(required)
+    remaining = float(budget)
+    for tier in np.unique(priority):
+        members = priority == tier
+        need = required[members].sum()
+        if need <= remaining:
+            allocated[members] = required[members]
+            remaining -= need
+        else:
+            allocated[members] = required[members] * (remaining / need)
+            break
+    return allocated
+
+
+def _flatten(groups: Sequence[Sequence], fields: Sequence[str]):
+    """Flatten per-item lists into columns plus an owner index"""
+    counts = np.fromiter((len(group) for group in groups), dtype=int, count=len(groups))
+    owner = np.repeat(np.arange(len(groups)), counts)
+    flat = [entry for group in groups for entry in group]
+    columns = {name: np.fromiter((getattr(entry, name) for entry in flat), dtype=float, count=len(flat))
+               for name in fields}
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return owner, starts, columns
+
+
+def irregular_cash_flow_columns(calculate_type, cash_flows, discount_rate, valuation_date=None) -> Dict[str, np.ndarray]:
+    owner, starts, flows = _flatten(cash_flows, ("amount",))
+    size = len(cash_flows)
+    today = date.today()
+    valuation_dates = np.broadcast_to(np.asarray(valuation_date, dtype=object), (size,)).tolist()
+    # Flows timed in whole years (the common case) are read without a call
+    flows["years"] = np.fromiter(
+        (
+            flow.years if flow.years is not None else flow_years(flow, valued or today)
+            for group, valued in zip(cash_flows, valuation_dates) for flow in group
+        ),
+        dtype=float, count=owner.size
+    )
+    rate = _as_float(discount_rate)[owner]
+    is_present_value = np.asarray(calculate_type) == "present_value"
+
+    present_values = flows["amount"] / np.power(1 + rate / 100, flows["years"])
+    # Future values are taken at the last flow, or the valuation date if that is later
+    max_years = np.maximum(np.maximum.reduceat(flows["years"], starts), 0.0)
+    future_values = flows["amount"] * np.power(1 + rate / 100, max_years[owner] - flows["years"])
+
+    per_flow = np.where(is_present_value[owner], present_values, future_values)
+    return {
+        "total_value": np.bincount(owner, weights=per_flow, minlength=size),
+        "calculation_type": np.where(is_present_value, "present_value", "future_value"),
+    }
+
+
+def weighted_returns_columns(years, assets) -> Dict[str, np.ndarray]:
+    owner, _, holdings = _flatten(assets, ("investment_amount", "expected_return"))
+    size = len(assets)
+    total_invested = np.bincount(owner, weights=holdings["investment_amount"], minlength=size)
+    weighted = np.bincount(owner, weights=holdings["investment_amount"] * holdings["expected_return"], minlength=size)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted_return = np.where(total_invested == 0, 0.0, weighted / total_invested)
+    future_value = future_value_lumpsum(total_invested, weighted_return, years)
+    return {
+        "future_value": np.where(total_invested == 0, 0.0, future_value),
+        "weighted_return": weighted_return,
+        "total_invested": total_invested,
+    }
+
+
+# Months between rebalancing dates for each rebalance setting (0: never)
+REBALANCE_MONTHS = {"none": 0, "monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+def portfolio_columns(years, assets, rebalance) -> Dict[str, np.ndarray]:
+    """
+    Project many portfolios at once, every holding compounding at its own rate
+    Holdings of all portfolios form one vector (the assets axis of an assets x
+    months projection). Between rebalancing dates each holding follows its
+    closed form, lump sum plus contributions at the start of each month at
+    the effective monthly rate, so the loop steps from one rebalancing date
+    or year end to the next instead of month by month.
+    Per portfolio: future_value, total_invested, single_rate_value (the same
+    money compounded at the target-weighted average rate), and yearly_values,
+    yearly_invested and drift (largest gap between a weight and its target),
+    each portfolios x years. Per holding: asset_future_value,
+    asset_total_invested, target_weight and yearly_weights (holdings x years).
+    Year ends are recorded before that date's rebalancing, so drift shows
+    how far holdings moved since the last one. Weights are fractions; years
+    past a portfolio's horizon repeat its final values.
+    """
+    owner, starts, holdings = _flatten(assets, ("investment_amount", "monthly_contribution", "expected_return"))
+    size = len(assets)
+    years = np.asarray(years, dtype=int)
+    investment = holdings["investment_amount"]
+    contribution = holdings["monthly_contribution"]
+
+    # Targets default to today's allocation, or the contributions' when nothing is invested yet
+    invested_total = np.bincount(owner, weights=investment, minlength=size)
+    contributed_total = np.bincount(owner, weights=contribution, minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        default_target = np.where(invested_total[owner] > 0, investment / invested_total[owner],
+                                  contribution / contributed_total[owner])
+    explicit = np.fromiter(
+        (np.nan if entry.target_weight is None else entry.target_weight / 100 for group in assets for entry in group),
+        dtype=float, count=owner.size
+    )
+    target = np.where(np.isnan(explicit), default_target, explicit)
+
+    every = np.array([REBALANCE_MONTHS[value] for value in np.atleast_1d(rebalance).tolist()], dtype=int)
+    every = np.broadcast_to(every, (size,))
+    step = int(every[every > 0].min()) if (every > 0).any() else 12
+    horizon = int(years.max())
+    months = years * 12
+
+    monthly_growth = np.power(1 + holdings["expected_return"] / 100, 1 / 12)
+    step_growth = monthly_growth ** step
+    with np.errstate(divide="ignore", invalid="ignore"):
+        step_annuity = np.where(monthly_growth == 1, float(step),
+                                (step_growth - 1) / (monthly_growth - 1) * monthly_growth)
+    step_added = contribution * step_annuity
+
+    values = investment.copy()
+    yearly_values = np.empty((owner.size, horizon))
+    last_month = months[owner]
+    rebalancing = every > 0
+    cadence = np.maximum(every, 1)
+    shortest = int(years.min()) * 12
+    steps = 0
+    for month in range(step, horizon * 12 + 1, step):
+        steps += 1
+        if month <= shortest:
+            values = values * step_growth + step_added
+        else:
+            values = np.where(month <= last_month, values * step_growth + step_added, values)
+        if month % 12 == 0:
+            yearly_values[:, month // 12 - 1] = values
+        due = rebalancing & (month % cadence == 0) & (month <= months)
+        if due.all():
+            values = np.bincount(owner, weights=values, minlength=size)[owner] * target
+        elif due.any():
+            totals = np.bincount(owner, weights=values, minlength=size)
+            values = np.where(due[owner], totals[owner] * target, values)
+    count_kernel("portfolio_projection", steps)
+
+    elapsed = np.minimum(np.arange(1, horizon + 1), years[:, None])
+    portfolio_values = np.add.reduceat(yearly_values, starts, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yearly_weights = np.nan_to_num(yearly_values / portfolio_values[owner])
+    drift = np.maximum.reduceat(np.abs(yearly_weights - target[:, None]), starts, axis=0)
+
+    # One weighted-average rate for the whole portfolio, as in the Weighted Average Returns calculator
+    single_rate = np.bincount(owner, weights=target * holdings["expected_return"], minlength=size)
+    single_growth = np.power(1 + single_rate / 100, 1 / 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        single_annuity = np.where(single_growth == 1, months,
+                                  (np.power(single_growth, months) - 1) / (single_growth - 1) * single_growth)
+    single_rate_value = invested_total * np.power(single_growth, months) + contributed_total * single_annuity
+
+    final = yearly_values[np.arange(owner.size), years[owner] - 1]
+    return {
+        "future_value": np.bincount(owner, weights=final, minlength=size),
+        "total_invested": invested_total + contributed_total * months,
+        "single_rate_value": single_rate_value,
+        "yearly_values": portfolio_values,
+        "yearly_invested": invested_total[:, None] + contributed_total[:, None] * 12 * elapsed,
+        "drift": drift,
+        "asset_future_value": final,
+        "asset_total_invested": investment + contribution * last_month,
+        "target_weight": target,
+        "yearly_weights": yearly_weights,
+    }
+
+
+def batch_calculation(calculate_batch: Callable) -> Callable:
+    """
+    Name the failing item when a batch is rejected
+    A vectorized pass only tells that some item is invalid, so on a
+    ValueError the items are evaluated one at a time to find the first
+    that fails, and the error is raised again prefixed with its index
+    """
+    @functools.wraps(calculate_batch)
+    def wrapper(items):
+        try:
+            return calculate_batch(items)
+        except ValueError as e:
+            error = e
+            for index, item in enumerate(items):
+                try:
+                    calculate_batch([item])
+                except ValueError as item_error:
+                    raise ValueError(f"Item {index}: {item_error}") from item_error
+            raise error
+    return wrapper
+
+
+def to_columns(items: Sequence[BaseModel]) -> Dict[str, np.ndarray]:
+    """Turn a list of input models into one column per field"""
+    if not items:
+        return {}
+    fields = type(items[0]).model_fields
+    columns = {}
+    for name in fields:
+        values = [getattr(item, name) for item in items]
+        if isinstance(values[0], (list, str)):
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            columns[name] = column
+        else:
+            columns[name] = np.asarray(values)
+    return columns
+
+
+def from_columns(model: Type[BaseModel], columns: Dict[str, np.ndarray]) -> List[BaseModel]:
+    """Turn column arrays back into a list of output models"""
+    names = list(model.model_fields)
+    rows = zip(*(np.asarray(columns[name]).tolist() for name in names))
+    return [model(**dict(zip(names, row))) for row in rows]
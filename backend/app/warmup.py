@@ -0,0 +1,182 @@
+"""
+Startup warmup
+Sends one request to every calculator route through the ASGI app before it
+takes traffic, so the first real requests don't pay for lazy initialization
+(route dependants, validators and serializers, NumPy kernels, factor caches)
+"""
+import asyncio
+import json
+import time
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from fastapi.routing import APIRoute
+from app.metrics import registry
+
+# Typical input for each calculator, keyed by its route path
+WARMUP_INPUTS = {
+    "/api/financial/sip-growth": {
+        "monthly_investment": 10000, "period_years": 15, "expected_returns": 12, "growth_in_savings": 10
+    },
+    "/api/financial/sip-need": {
+        "target_amount": 10000000, "period_years": 15, "expected_returns": 12, "growth_in_savings": 10
+    },
+    "/api/financial/sip-delay": {
+        "monthly_investment": 10000, "period_years": 15, "expected_returns": 12, "delay_months": 12
+    },
+    "/api/financial/swp": {
+        "initial_investment": 5000000, "monthly_withdrawal": 40000, "expected_returns": 8,
+        "increase_withdrawal": True
+    },
+    "/api/financial/swp/max-withdrawal": {
+        "initial_investment": 5000000, "years": 25, "expected_returns": 8, "increase_withdrawal": True
+    },
+    "/api/life-goal/retirement": {
+        "present_age": 30, "retirement_age": 60, "monthly_expenses": 50000, "expected_returns": 12
+    },
+    "/api/life-goal/education": {"years_remaining": 15, "cost_today": 2500000, "expected_returns": 12},
+    "/api/life-goal/marriage": {"years_remaining": 20, "cost_today": 2000000, "expected_returns": 12},
+    "/api/life-goal/other-goal": {
+        "goal_name": "House", "years_remaining": 10, "cost_today": 5000000, "expected_returns": 12
+    },
+    "/api/quick-tools/single-amount": {"calculate_type": "future_value", "amount": 100000, "years": 10},
+    "/api/quick-tools/irregular-cash-flow": {
+        "calculate_type": "present_value", "discount_rate": 8,
+        "cash_flows": [{"amount": 100000, "years": 1}, {"amount": 200000, "years": 5}]
+    },
+    "/api/quick-tools/xirr": {
+        "guess": 10,
+        "cash_flows": [
+            {"amount": -10000, "payment_date": "2024-01-05"},
+            {"amount": -10000, "payment_date": "2024-07-05"},
+            {"amount": 22500, "payment_date": "2025-01-05"}
+        ]
+    },
+    "/api/quick-tools/weighted-returns": {
+        "years": 10,
+        "assets": [{"investment_amount": 100000, "expected_return": 12}, {"investment_amount": 50000, "expected_return": 7}]
+    },
+    "/api/quick-tools/portfolio-projection": {
+        "years": 10,
+        "rebalance": "yearly",
+        "assets": [
+            {"name": "Equity", "investment_amount": 100000, "monthly_contribution": 5000, "expected_return": 12},
+            {"name": "Debt", "investment_amount": 50000, "monthly_contribution": 2000, "expected_return": 7}
+        ]
+    },
+    "/api/life-goal/household-plan": {
+        "monthly_budget": 60000,
+        "goals": [
+            {"calculator": "retirement", "inputs": {
+                "present_age": 30, "retirement_age": 60, "monthly_expenses": 50000, "expected_returns": 12
+            }},
+            {"calculator": "education", "priority": 2,
+             "inputs": {"years_remaining": 15, "cost_today": 2500000, "expected_returns": 12}}
+        ]
+    },
+    "/api/analysis/sensitivity-grid": {
+        "calculator": "sip-growth",
+        "inputs": {"monthly_investment": 10000, "period_years": 15, "expected_returns": 12},
+        "x": {"field": "expected_returns", "start": 8, "stop": 14, "step": 2},
+        "y": {"field": "period_years", "start": 5, "stop": 25, "step": 10}
+    },
+    "/api/analysis/goal-seek": {
+        "calculator": "sip-growth",
+        "inputs": {"monthly_investment": 10000, "period_years": 15},
+        "field": "expected_returns", "output": "future_value", "target": 10000000
+    },
+}
+
+# Filled in as the process starts; reported by /health
+startup_report: Dict[str, float] = {}
+
+
+async def asgi_request(app, method: str, path: str, query: str = "", body: Optional[bytes] = None) -> int:
+    """Call an ASGI app in-process, without a socket; returns the response status"""
+    payload = body or b""
+    headers = [(b"host", b"localhost"), (b"content-length", str(len(payload)).encode())]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    done = asyncio.Event()
+    pending = [{"type": "http.request", "body": payload, "more_body": False}]
+    status = 0
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # Streaming responses listen for a disconnect; only send it once the response is complete
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return status
+
+
+def _query(data: dict) -> str:
+    return urlencode({
+        name: json.dumps(value) if isinstance(value, list) else str(value).lower() if isinstance(value, bool) else value
+        for name, value in data.items()
+    })
+
+
+def _warmup_requests(app):
+    """(method, path, query, body) for every API route with a known input"""
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        base, _, suffix = route.path.rpartition("/")
+        if route.path in WARMUP_INPUTS:
+            base, suffix = route.path, ""
+        inputs = WARMUP_INPUTS.get(base)
+        if inputs is None:
+            continue
+        for method in route.methods:
+            if method == "GET":
+                yield method, route.path, _query(inputs), None
+            elif suffix == "batch":
+                yield method, route.path, "", json.dumps([inputs, inputs]).encode()
+            elif suffix == "upload":
+                # Upload routes take the list as the raw body and the other inputs in the query
+                query = {name: value for name, value in inputs.items() if not isinstance(value, list)}
+                body = next(value for value in inputs.values() if isinstance(value, list))
+                yield method, route.path, _query(query), json.dumps(body).encode()
+            elif suffix == "simulate":
+                body = {"inputs": inputs, "simulation": {"paths": 100, "seed": 0}}
+                yield method, route.path, "", json.dumps(body).encode()
+            else:
+                yield method, route.path, "", json.dumps(inputs).encode()
+
+
+async def warmup(app) -> Dict[str, float]:
+    """Send one request per calculator route; returns the count, failures and time taken"""
+    started = time.perf_counter()
+    requests = failed = 0
+    for method, path, query, body in _warmup_requests(app):
+        requests += 1
+        if not 200 <= await asgi_request(app, method, path, query, body) < 300:
+            failed += 1
+    # Metrics describe real traffic only
+    registry.reset()
+    return {"warmup_requests": requests, "warmup_failures": failed, "warmup_seconds": time.perf_counter() - started}
@@ -0,0 +1,4 @@
+"""
+Benchmark suite for the calculator services and kernels
+Run from backend/: python -m benchmarks --help
+"""
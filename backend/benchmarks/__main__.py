@@ -0,0 +1,176 @@
+"""
+Benchmark runner
+
+    python -m benchmarks                  # run and compare with baseline.json
+    python -m benchmarks --save           # also record cases that have no baseline yet
+    python -m benchmarks -k swp --update  # re-record the baseline of the selected cases
+    python -m benchmarks -k swp -k sip    # only cases whose name contains a filter
+
+Each case is timed as the best per-call time over several repeats, and
+normalized by a fixed reference workload (the median of timings taken
+throughout the run), so that baselines survive a slower machine. A case fails when both its
+normalized and its plain time are worse than the baseline by more than the
+threshold; cases taking a few microseconds jitter more between runs, so they
+get a looser one. Existing baseline entries are only replaced by --update.
+The result cache is disabled so services are measured doing real work.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+os.environ["CACHE_ENABLED"] = "false"
+
+import numpy as np  # noqa: E402
+from benchmarks.cases import all_cases  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = float(os.getenv("BENCHMARK_THRESHOLD", "0.25"))
+DEFAULT_SMALL_THRESHOLD = float(os.getenv("BENCHMARK_SMALL_THRESHOLD", "0.6"))
+
+# Cases whose baseline is faster than this (seconds per call) use the small-case threshold
+SMALL_CASE_SECONDS = 10e-6
+
+# Cases timed between reference workload calibrations
+CALIBRATE_EVERY = 8
+
+
+def time_case(func, repeat: int, min_time: float) -> dict:
+    """Best and median seconds per call over `repeat` runs of at least `min_time` each"""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    runs = [elapsed / number] + [run / number for run in timer.repeat(repeat=repeat - 1, number=number)]
+    return {"best": min(runs), "median": statistics.median(runs), "calls": number}
+
+
+def slowdown(result: dict, baseline: dict) -> float:
+    """Fractional slowdown against the baseline, normalized and absolute, whichever is smaller
+
+    The reference workload itself drifts between runs, so a case only counts
+    as slower when it is slower both against the reference and on the clock.
+    """
+    return min(result["relative"] / baseline["relative"], result["best"] / baseline["best"]) - 1
+
+
+def reference_workload() -> float:
+    """Fixed mix of interpreter and libm work used to normalize timings"""
+    total = 0.0
+    for i in range(1000):
+        total += math.pow(1.01, i % 50)
+    return total
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Calculator benchmarks")
+    parser.add_argument("-k", "--filter", action="append", default=[], help="Only run cases containing this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Add the results of cases without a baseline entry")
+    parser.add_argument("--update", action="store_true", help="Replace the baseline entries of the cases run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown against the baseline, as a fraction (default 0.25)")
+    parser.add_argument("--small-threshold", type=float, default=DEFAULT_SMALL_THRESHOLD,
+                        help=f"Allowed slowdown for cases under {SMALL_CASE_SECONDS * 1e6:g}us (default 0.6)")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per case")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timed run")
+    parser.add_argument("--retries", type=int, default=2, help="Re-time a case this many times before reporting a regression")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    cases = {
+        name: func for name, func in all_cases().items()
+        if not args.filter or any(text in name for text in args.filter)
+    }
+    if not cases:
+        print("No benchmark cases match the filter", file=sys.stderr)
+        return 2
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)["results"]
+
+    results = {}
+    regressions = []
+    width = max(len(name) for name in cases)
+    print(f"{'case':<{width}}  {'best':>10}  {'median':>10}")
+    started = time.perf_counter()
+    references = []
+    for index, (name, func) in enumerate(cases.items()):
+        func()  # warm up imports and caches of the kernels themselves
+        if index % CALIBRATE_EVERY == 0:
+            references.append(time_case(reference_workload, args.repeat, args.min_time)["best"])
+        results[name] = time_case(func, args.repeat, args.min_time)
+        print(f"{name:<{width}}  {results[name]['best'] * 1e6:>8.2f}us  {results[name]['median'] * 1e6:>8.2f}us",
+              flush=True)
+    references.append(time_case(reference_workload, args.repeat, args.min_time)["best"])
+    reference = statistics.median(references)
+    print(f"{len(cases)} cases in {time.perf_counter() - started:.1f}s, reference workload {reference * 1e6:.1f}us")
+
+    print()
+    print(f"{'case':<{width}}  {'best':>10}  {'baseline':>10}  change")
+    for name, result in results.items():
+        result["relative"] = result["best"] / reference
+        if name not in baseline:
+            continue
+        threshold = args.small_threshold if baseline[name]["best"] < SMALL_CASE_SECONDS else args.threshold
+        change = slowdown(result, baseline[name])
+        for _ in range(args.retries):
+            if change <= threshold:
+                break
+            # Re-time suspected regressions so a burst of machine noise doesn't fail the run
+            retry = time_case(cases[name], args.repeat, args.min_time)
+            if retry["best"] < result["best"]:
+                result.update(retry, relative=retry["best"] / reference)
+            change = slowdown(result, baseline[name])
+        line = f"{name:<{width}}  {result['best'] * 1e6:>8.2f}us  {baseline[name]['best'] * 1e6:>8.2f}us  {change:+.1%}"
+        if change > threshold:
+            regressions.append((name, change, threshold))
+            line += "  REGRESSION"
+        print(line)
+
+    report = {"environment": environment(), "threshold": args.threshold, "reference": reference, "results": results}
+    if args.save or args.update:
+        # Entries are only replaced on request, so a change that re-records
+        # the baseline says which cases it re-baselines
+        recorded = {name: result for name, result in results.items() if args.update or name not in baseline}
+        saved = {**report, "results": {**baseline, **recorded}}
+        with open(args.baseline, "w") as handle:
+            json.dump(saved, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than the threshold:", file=sys.stderr)
+        for name, change, threshold in regressions:
+            print(f"  {name}: {change:+.1%} (threshold {threshold:.0%})", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""
+Benchmark cases
+Each case is a zero-argument callable timed per call. Services are called
+on typical and worst-case inputs (longest periods, maximum step-ups,
+600-month SWPs); inputs are built once, outside the timed call.
+"""
+import asyncio
+import json
+import random
+from collections import deque
+from datetime import date, timedelta
+from typing import Callable, Dict
+
+import numpy as np
+from app.config import MAX_PLAN_GOALS, MAX_PORTFOLIO_ASSETS
+from app.services.financial_utils import (
+    sip_factor,
+    future_value_sip,
+    calculate_sip_needed,
+    total_sip_invested,
+    calculate_retirement_corpus,
+    simulate_swp,
+    calculate_swp_duration
+)
+from app.services.kernels import (
+    Schedule,
+    sip_growth,
+    retirement,
+    goal,
+    irregular_cash_flow,
+    xirr,
+    sip_schedule,
+    swp_schedule,
+    swp_max_withdrawal
+)
+from app.services.cash_flows import CashFlowReader
+from app.services.financial_service import (
+    SIPGrowthCalculator,
+    SIPNeedCalculator,
+    SIPDelayCalculator,
+    SWPCalculator
+)
+from app.services.life_goal_service import (
+    RetirementCalculator,
+    EducationCalculator,
+    MarriageCalculator,
+    OtherGoalCalculator,
+    HouseholdPlanner
+)
+from app.services.analysis_service import GoalSeekCalculator
+from app.services.sessions import CalculatorSession
+from app.services.quick_tools_service import (
+    SingleAmountCalculator,
+    IrregularCashFlowCalculator,
+    XIRRCalculator,
+    WeightedReturnsCalculator,
+    PortfolioProjectionCalculator
+)
+from app.models.financial import SIPGrowthInput, SIPNeedInput, SIPDelayInput, SWPInput
+from app.models.life_goal import (
+    RetirementInput,
+    EducationInput,
+    MarriageInput,
+    OtherGoalInput,
+    RetirementTimelineInput,
+    RetirementSimulationInput,
+    EducationSimulationInput,
+    HouseholdPlanInput
+)
+from app.models.quick_tools import (
+    SingleAmountInput,
+    IrregularCashFlowInput,
+    XIRRInput,
+    WeightedReturnsInput,
+    PortfolioProjectionInput
+)
+from app.models.analysis import GoalSeekInput
+
+# Size of the batch cases (a full /batch request)
+BATCH_SIZE = 1000
+
+# Flows in the irregular cash flow upload cases
+UPLOAD_FLOWS = 100000
+
+
+def _drain(iterator) -> None:
+    deque(iterator, maxlen=0)
+
+
+def _ndjson_lines(rows):
+    """The lines a schedule endpoint streams"""
+    return rows.json_lines() if isinstance(rows, Schedule) else map(json.dumps, rows)
+
+
+# Calculator inputs: name -> (calculator, typical input, worst-case input)
+SERVICE_INPUTS = {
+    "sip_growth": (
+        SIPGrowthCalculator,
+        SIPGrowthInput(monthly_investment=10000, period_years=15, expected_returns=12),
+        SIPGrowthInput(monthly_investment=10000, period_years=50, expected_returns=30, growth_in_savings=20),
+    ),
+    "sip_need": (
+        SIPNeedCalculator,
+        SIPNeedInput(target_amount=10000000, period_years=15, expected_returns=12),
+        SIPNeedInput(target_amount=10000000, period_years=50, expected_returns=30, inflation=20, growth_in_savings=20),
+    ),
+    "sip_delay": (
+        SIPDelayCalculator,
+        SIPDelayInput(monthly_investment=10000, period_years=15, expected_returns=12, delay_months=12),
+        SIPDelayInput(monthly_investment=10000, period_years=50, expected_returns=30, delay_months=120),
+    ),
+    "swp": (
+        SWPCalculator,
+        SWPInput(initial_investment=5000000, monthly_withdrawal=40000, expected_returns=8),
+        # Never depletes: runs the full 600 months with yearly increases
+        SWPInput(initial_investment=100000000, monthly_withdrawal=10000, expected_returns=15,
+                 yearly_increase=1, increase_withdrawal=True, swp_start_years=30),
+    ),
+    "retirement": (
+        RetirementCalculator,
+        RetirementInput(present_age=30, retirement_age=60, monthly_expenses=50000, expected_returns=12),
+        RetirementInput(present_age=18, retirement_age=100, monthly_expenses=50000, expected_returns=30,
+                        inflation=20, growth_in_savings=20, existing_investments=1000000, life_expectancy=120),
+    ),
+    "education": (
+        EducationCalculator,
+        EducationInput(years_remaining=15, cost_today=2500000, expected_returns=12),
+        EducationInput(years_remaining=50, cost_today=2500000, inflation=20, expected_returns=30,
+                       growth_in_savings=20, existing_investments=100000),
+    ),
+    "marriage": (
+        MarriageCalculator,
+        MarriageInput(years_remaining=20, cost_today=2000000, expected_returns=12),
+        MarriageInput(years_remaining=50, cost_today=2000000, inflation=20, expected_returns=30,
+                      growth_in_savings=20, existing_investments=100000),
+    ),
+    "other_goal": (
+        OtherGoalCalculator,
+        OtherGoalInput(goal_name="House", years_remaining=10, cost_today=5000000, expected_returns=12),
+        OtherGoalInput(goal_name="House", years_remaining=50, cost_today=5000000, inflation=20,
+                       expected_returns=30, growth_in_savings=20, existing_investments=100000),
+    ),
+    "single_amount": (
+        SingleAmountCalculator,
+        SingleAmountInput(calculate_type="future_value", amount=100000, years=10),
+        SingleAmountInput(calculate_type="present_value", amount=100000, years=50, inflation=50),
+    ),
+    "irregular_cash_flow": (
+        IrregularCashFlowCalculator,
+        IrregularCashFlowInput(calculate_type="present_value", discount_rate=8,
+                               cash_flows=[{"amount": 100000, "years": year} for year in (1, 3, 5)]),
+        IrregularCashFlowInput(calculate_type="future_value", discount_rate=20,
+                               cash_flows=[{"amount": 100000, "years": year} for year in range(1, 51)] * 4),
+    ),
+    "weighted_returns": (
+        WeightedReturnsCalculator,
+        WeightedReturnsInput(years=10, assets=[
+            {"investment_amount": 100000, "expected_return": 12},
+            {"investment_amount": 50000, "expected_return": 7},
+        ]),
+        WeightedReturnsInput(years=50, assets=[
+            {"investment_amount": 10000 * (index + 1), "expected_return": 1 + index % 20}
+            for index in range(100)
+        ]),
+    ),
+}
+
+
+def service_cases() -> Dict[str, Callable]:
+    cases = {}
+    for name, (calculator, typical, worst) in SERVICE_INPUTS.items():
+        cases[f"service.{name}.typical"] = lambda c=calculator, d=typical: c.calculate(d)
+        cases[f"service.{name}.worst"] = lambda c=calculator, d=worst: c.calculate(d)
+        batch = [typical, worst] * (BATCH_SIZE // 2)
+        cases[f"service.{name}.batch{BATCH_SIZE}"] = lambda c=calculator, b=batch: c.calculate_batch(b)
+    return cases
+
+
+def schedule_cases() -> Dict[str, Callable]:
+    sip_worst = SERVICE_INPUTS["sip_growth"][2]
+    swp_worst = SERVICE_INPUTS["swp"][2]
+    retirement_worst = SERVICE_INPUTS["retirement"][2]
+    # Longest timeline (82 years saving, 20 retired) with an explicit SIP
+    timeline_worst = RetirementTimelineInput(**retirement_worst.model_dump(), monthly_sip=1000)
+    return {
+        "schedule.retirement.timeline.worst": lambda: RetirementCalculator.timeline(timeline_worst),
+        "schedule.sip_growth.monthly.worst": lambda: _drain(_ndjson_lines(SIPGrowthCalculator.schedule(sip_worst, "month"))),
+        "schedule.swp.monthly.worst": lambda: _drain(_ndjson_lines(SWPCalculator.schedule(swp_worst, "month"))),
+        "schedule.retirement.worst": lambda: _drain(_ndjson_lines(RetirementCalculator.schedule(retirement_worst))),
+    }
+
+
+def planner_cases() -> Dict[str, Callable]:
+    goals = [
+        {"calculator": "retirement", "inputs": SERVICE_INPUTS["retirement"][1]},
+        {"calculator": "education", "inputs": SERVICE_INPUTS["education"][1]},
+        {"calculator": "marriage", "priority": 2, "inputs": SERVICE_INPUTS["marriage"][1]},
+        {"calculator": "other-goal", "priority": 3, "inputs": SERVICE_INPUTS["other_goal"][1]},
+    ]
+    typical = HouseholdPlanInput(monthly_budget=60000, goals=goals)
+    worst = HouseholdPlanInput(monthly_budget=60000, goals=[
+        {**goal, "priority": 1 + index % 10} for index, goal in enumerate(goals * (MAX_PLAN_GOALS // len(goals)))
+    ])
+    return {
+        "planner.household.typical": lambda: HouseholdPlanner.calculate(typical),
+        "planner.household.worst": lambda: HouseholdPlanner.calculate(worst),
+    }
+
+
+def _parse_upload(format: str, body: str) -> None:
+    reader = CashFlowReader(format, date(2026, 1, 1), UPLOAD_FLOWS)
+    for start in range(0, len(body), 65536):
+        reader.feed(body[start:start + 65536])
+    reader.close()
+
+
+def cash_flow_cases() -> Dict[str, Callable]:
+    generator = random.Random(7)
+    rows = [{"amount": round(generator.uniform(-10000, 10000), 2), "months": generator.randint(1, 600)}
+            for _ in range(UPLOAD_FLOWS)]
+    csv_body = "amount,months\n" + "".join(f"{row['amount']},{row['months']}\n" for row in rows)
+    json_body = json.dumps(rows)
+    parsed = CashFlowReader("json", date(2026, 1, 1), UPLOAD_FLOWS)
+    parsed.feed(json_body)
+    flows = parsed.close()
+    # 20 years of monthly SIP instalments and the current value, and an
+    # upload-sized history spread over 30 years
+    start = date(2006, 1, 1)
+    sip_history = XIRRInput(cash_flows=[
+        {"amount": -10000, "payment_date": start + timedelta(days=round(month * 365 / 12))} for month in range(240)
+    ] + [{"amount": 9200000, "payment_date": date(2026, 1, 1)}])
+    history_years = np.linspace(0, 30, UPLOAD_FLOWS)
+    history_amounts = np.append(np.full(UPLOAD_FLOWS - 1, -100.0), 100.0 * UPLOAD_FLOWS * 3)
+    return {
+        "cash_flows.xirr.sip240": lambda: XIRRCalculator.calculate(sip_history),
+        "cash_flows.xirr.kernel.100k": lambda: xirr(history_amounts, history_years),
+        "cash_flows.parse.csv.100k": lambda: _parse_upload("csv", csv_body),
+        "cash_flows.parse.json.100k": lambda: _parse_upload("json", json_body),
+        "cash_flows.value.100k": lambda: irregular_cash_flow("present_value", flows.amounts, flows.times, 8),
+    }
+
+
+def portfolio_cases() -> Dict[str, Callable]:
+    typical = PortfolioProjectionInput(years=15, rebalance="yearly", assets=[
+        {"name": "Equity", "investment_amount": 100000, "monthly_contribution": 5000, "expected_return": 12},
+        {"name": "Debt", "investment_amount": 50000, "monthly_contribution": 2000, "expected_return": 7},
+        {"name": "Gold", "investment_amount": 20000, "expected_return": 8},
+    ])
+    worst = PortfolioProjectionInput(years=50, rebalance="monthly", assets=[
+        {"investment_amount": 1000 * (index + 1), "monthly_contribution": 100, "expected_return": 1 + index % 20}
+        for index in range(MAX_PORTFOLIO_ASSETS)
+    ])
+    # A page of model portfolios: 100 portfolios of 10 holdings over 30 years
+    models = [
+        PortfolioProjectionInput(years=30, rebalance=("none", "quarterly", "yearly")[index % 3], assets=[
+            {"investment_amount": 10000, "monthly_contribution": 500, "expected_return": 4 + (index + holding) % 12}
+            for holding in range(10)
+        ])
+        for index in range(100)
+    ]
+    return {
+        "portfolio.projection.typical": lambda: PortfolioProjectionCalculator.calculate(typical),
+        "portfolio.projection.worst": lambda: PortfolioProjectionCalculator.calculate(worst),
+        "portfolio.projection.batch100": lambda: PortfolioProjectionCalculator.calculate_batch(models),
+    }
+
+
+def analysis_cases() -> Dict[str, Callable]:
+    # The return a SIP needs to reach a corpus, and the earliest retirement
+    # age an SIP budget allows (a whole-number field, partly invalid range)
+    required_return = GoalSeekInput(
+        calculator="sip-growth", field="expected_returns", output="future_value", target=10000000,
+        inputs={"monthly_investment": 10000, "period_years": 15, "growth_in_savings": 10}
+    )
+    retirement_age = GoalSeekInput(
+        calculator="retirement", field="retirement_age", output="monthly_sip", target=50000,
+        inputs={"present_age": 30, "monthly_expenses": 50000, "expected_returns": 12}
+    )
+    return {
+        "analysis.goal_seek.return": lambda: GoalSeekCalculator.calculate(required_return),
+        "analysis.goal_seek.retirement_age": lambda: GoalSeekCalculator.calculate(retirement_age),
+    }
+
+
+async def _drag(session: CalculatorSession, field: str, values: list) -> None:
+    for value in values:
+        session.apply({"inputs": {field: value}})
+        await session.recompute()
+
+
+def session_cases() -> Dict[str, Callable]:
+    # A slider drag: 100 updates to one field of a live retirement session
+    # pushing the result and the yearly schedule
+    session = CalculatorSession("retirement")
+    session.apply({"inputs": SERVICE_INPUTS["retirement"][1].model_dump(), "parts": ["result", "schedule"]})
+    values = [8 + step / 10 for step in range(100)]
+    return {
+        "session.retirement.drag100": lambda: asyncio.run(_drag(session, "expected_returns", values)),
+    }
+
+
+def simulation_cases() -> Dict[str, Callable]:
+    settings = {"paths": 10000, "seed": 7}
+    retirement = RetirementSimulationInput(inputs=SERVICE_INPUTS["retirement"][1], simulation=settings)
+    education = EducationSimulationInput(inputs=SERVICE_INPUTS["education"][1], simulation=settings)
+    return {
+        "simulation.retirement.10k": lambda: RetirementCalculator.simulate(retirement),
+        "simulation.education.10k": lambda: EducationCalculator.simulate(education),
+    }
+
+
+def kernel_cases() -> Dict[str, Callable]:
+    uncached_factor = sip_factor.__wrapped__
+    return {
+        "kernel.sip_factor.uncached.typical": lambda: uncached_factor(12, 15, 0),
+        "kernel.sip_factor.uncached.worst": lambda: uncached_factor(30, 50, 20),
+        "kernel.future_value_sip.typical": lambda: future_value_sip(10000, 12, 15),
+        "kernel.future_value_sip.worst": lambda: future_value_sip(10000, 30, 50, 20),
+        "kernel.calculate_sip_needed.worst": lambda: calculate_sip_needed(10000000, 30, 50, 20),
+        "kernel.total_sip_invested.worst": lambda: total_sip_invested(10000, 50, 20),
+        "kernel.calculate_retirement_corpus": lambda: calculate_retirement_corpus(50000, 30, 6, 8),
+        "kernel.simulate_swp.level.600m": lambda: simulate_swp(100000000, 10000, 15, 0, False),
+        "kernel.simulate_swp.increasing.600m": lambda: simulate_swp(100000000, 10000, 15, 1, True),
+        "kernel.simulate_swp.depleting": lambda: simulate_swp(5000000, 40000, 8, 10, True),
+        "kernel.swp_max_withdrawal.increasing.50y": lambda: swp_max_withdrawal(100000000, 15, 1, True, 30, 50),
+        "kernel.calculate_swp_duration.600m": lambda: calculate_swp_duration(100000000, 10000, 15, 1, True),
+        "kernel.sip_growth.worst": lambda: sip_growth(10000, 50, 30, 20),
+        "kernel.retirement.worst": lambda: retirement(18, 100, 50000, 30, 20, 20, 1000000, 120),
+        "kernel.goal.worst": lambda: goal(50, 2500000, 20, 30, 20, 100000),
+        "kernel.sip_schedule.worst": lambda: sip_schedule(10000, 30, 50, 20),
+        "kernel.swp_schedule.600m": lambda: swp_schedule(100000000, 10000, 15, 1, True),
+    }
+
+
+def all_cases() -> Dict[str, Callable]:
+    cases = {}
+    cases.update(kernel_cases())
+    cases.update(service_cases())
+    cases.update(schedule_cases())
+    cases.update(planner_cases())
+    cases.update(cash_flow_cases())
+    cases.update(portfolio_cases())
+    cases.update(analysis_cases())
+    cases.update(session_cases())
+    cases.update(simulation_cases())
+    return cases
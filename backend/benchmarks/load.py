@@ -0,0 +1,422 @@
+"""
+Load generator for the calculators API
+
+    python -m benchmarks.load                              # built-in request mix, in-process
+    python -m benchmarks.load -c 32 --duration 30          # 32 concurrent clients for 30s
+    python -m benchmarks.load --replay traffic.jsonl       # replay recorded traffic
+    python -m benchmarks.load --url http://localhost:8000  # drive a running server (needs httpx)
+
+Requests go straight into app.main:app through ASGI, without sockets, so
+the numbers measure the application itself. Reports throughput and
+p50/p95/p99 latency per endpoint.
+
+Replay files are either JSON lines ({"method", "path", "query", "body"})
+or nginx access logs; log lines only carry the URL, so requests with a
+body (POSTs) can't be rebuilt from them and are skipped.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from app.warmup import asgi_request
+
+
+class LoadRequest(NamedTuple):
+    method: str
+    path: str
+    query: str = ""
+    body: Optional[bytes] = None
+
+
+class Outcome(NamedTuple):
+    endpoint: str
+    status: int
+    latency: float
+
+
+# Built-in request mix
+# Inputs are drawn from ranges real users pick, so repeats (and cache hits)
+# happen about as often as they do in production
+
+def _sip(rng: random.Random) -> dict:
+    return {
+        "monthly_investment": rng.choice([1000, 2000, 5000, 10000, 15000, 25000, 50000]),
+        "period_years": rng.randint(5, 30),
+        "expected_returns": rng.choice([8, 10, 12, 14, 15]),
+        "growth_in_savings": rng.choice([0, 0, 5, 10]),
+    }
+
+
+def _sip_need(rng: random.Random) -> dict:
+    return {
+        "target_amount": rng.choice([1000000, 2500000, 5000000, 10000000, 50000000]),
+        "period_years": rng.randint(5, 30),
+        "expected_returns": rng.choice([8, 10, 12, 14]),
+        "inflation": rng.choice([5, 6, 8]),
+        "growth_in_savings": rng.choice([0, 5, 10]),
+    }
+
+
+def _sip_delay(rng: random.Random) -> dict:
+    return {
+        "monthly_investment": rng.choice([2000, 5000, 10000, 25000]),
+        "period_years": rng.randint(5, 30),
+        "expected_returns": rng.choice([8, 10, 12, 14]),
+        "delay_months": rng.choice([6, 12, 24, 36, 60]),
+    }
+
+
+def _swp(rng: random.Random) -> dict:
+    return {
+        "initial_investment": rng.choice([1000000, 2500000, 5000000, 10000000]),
+        "monthly_withdrawal": rng.choice([10000, 20000, 30000, 50000]),
+        "expected_returns": rng.choice([6, 8, 10, 12]),
+        "yearly_increase": rng.choice([0, 5, 10]),
+        "increase_withdrawal": rng.random() < 0.5,
+        "swp_start_years": rng.choice([0, 0, 5, 10]),
+    }
+
+
+def _retirement(rng: random.Random) -> dict:
+    present_age = rng.randint(22, 50)
+    return {
+        "present_age": present_age,
+        "retirement_age": rng.choice([55, 58, 60, 65]) if present_age < 55 else 65,
+        "monthly_expenses": rng.choice([25000, 40000, 50000, 75000, 100000]),
+        "expected_returns": rng.choice([10, 12, 14]),
+        "inflation": rng.choice([5, 6, 7]),
+        "growth_in_savings": rng.choice([0, 5, 10]),
+        "existing_investments": rng.choice([0, 500000, 2000000]),
+    }
+
+
+def _goal(rng: random.Random) -> dict:
+    return {
+        "years_remaining": rng.randint(3, 25),
+        "cost_today": rng.choice([500000, 1000000, 2500000, 5000000]),
+        "inflation": rng.choice([6, 8, 10]),
+        "expected_returns": rng.choice([10, 12, 14]),
+        "growth_in_savings": rng.choice([0, 5, 10]),
+        "existing_investments": rng.choice([0, 100000, 500000]),
+    }
+
+
+def _other_goal(rng: random.Random) -> dict:
+    return {"goal_name": rng.choice(["House", "Car", "Travel"]), **_goal(rng)}
+
+
+def _single_amount(rng: random.Random) -> dict:
+    return {
+        "calculate_type": rng.choice(["present_value", "future_value"]),
+        "amount": rng.choice([100000, 500000, 1000000]),
+        "years": rng.randint(1, 30),
+        "inflation": rng.choice([5, 6, 8]),
+    }
+
+
+def _irregular_cash_flow(rng: random.Random) -> dict:
+    return {
+        "calculate_type": rng.choice(["present_value", "future_value"]),
+        "cash_flows": [
+            {"amount": rng.choice([50000, 100000, 250000]), "years": rng.randint(1, 20)}
+            for _ in range(rng.randint(2, 8))
+        ],
+        "discount_rate": rng.choice([6, 8, 10]),
+    }
+
+
+def _weighted_returns(rng: random.Random) -> dict:
+    return {
+        "years": rng.randint(1, 20),
+        "assets": [
+            {"investment_amount": rng.choice([50000, 100000, 200000]), "expected_return": rng.randint(4, 15)}
+            for _ in range(rng.randint(2, 6))
+        ],
+    }
+
+
+# Calculator path -> (input generator, supports GET, has schedule, has simulate)
+CALCULATORS = {
+    "/api/financial/sip-growth": (_sip, True, True, False),
+    "/api/financial/sip-need": (_sip_need, True, False, False),
+    "/api/financial/sip-delay": (_sip_delay, True, False, False),
+    "/api/financial/swp": (_swp, True, True, False),
+    "/api/life-goal/retirement": (_retirement, True, True, True),
+    "/api/life-goal/education": (_goal, True, False, True),
+    "/api/life-goal/marriage": (_goal, True, False, True),
+    "/api/life-goal/other-goal": (_other_goal, True, False, True),
+    "/api/quick-tools/single-amount": (_single_amount, True, False, False),
+    "/api/quick-tools/irregular-cash-flow": (_irregular_cash_flow, True, False, False),
+    "/api/quick-tools/weighted-returns": (_weighted_returns, True, False, False),
+}
+
+# Relative weight of each kind of request in the mix
+MIX_WEIGHTS = {"post": 60, "get": 25, "batch": 5, "schedule": 8, "simulate": 2}
+
+
+def _json(data) -> bytes:
+    return json.dumps(data).encode()
+
+
+def _query(data: dict) -> str:
+    return urlencode({
+        name: json.dumps(value) if isinstance(value, list) else str(value).lower() if isinstance(value, bool) else value
+        for name, value in data.items()
+    })
+
+
+def mix_choices() -> List[Tuple[Callable[[random.Random], LoadRequest], int]]:
+    """(request builder, weight) for every route in the built-in mix"""
+    choices = []
+    for path, (inputs, has_get, has_schedule, has_simulate) in CALCULATORS.items():
+        choices.append((lambda rng, p=path, f=inputs: LoadRequest("POST", p, body=_json(f(rng))), MIX_WEIGHTS["post"]))
+        if has_get:
+            choices.append((lambda rng, p=path, f=inputs: LoadRequest("GET", p, query=_query(f(rng))), MIX_WEIGHTS["get"]))
+        choices.append((
+            lambda rng, p=path, f=inputs: LoadRequest("POST", p + "/batch", body=_json([f(rng) for _ in range(20)])),
+            MIX_WEIGHTS["batch"]
+        ))
+        if has_schedule:
+            choices.append((lambda rng, p=path, f=inputs: LoadRequest("POST", p + "/schedule", body=_json(f(rng))),
+                            MIX_WEIGHTS["schedule"]))
+        if has_simulate:
+            choices.append((
+                lambda rng, p=path, f=inputs: LoadRequest("POST", p + "/simulate", body=_json({
+                    "inputs": f(rng), "simulation": {"paths": 2000, "seed": rng.randint(0, 99)}
+                })),
+                MIX_WEIGHTS["simulate"]
+            ))
+    return choices
+
+
+def mix_requests(count: int, seed: int) -> List[LoadRequest]:
+    rng = random.Random(seed)
+    builders, weights = zip(*mix_choices())
+    return [builder(rng) for builder in rng.choices(builders, weights=weights, k=count)]
+
+
+# Replay files
+
+_LOG_REQUEST = re.compile(r'"(?P<method>[A-Z]+) (?P<url>\S+) HTTP/[\d.]+"')
+
+
+def load_replay(path: str) -> Tuple[List[LoadRequest], int]:
+    """Requests from a JSON-lines traffic file or an nginx access log; returns (requests, skipped)"""
+    requests = []
+    skipped = 0
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                body = entry.get("body")
+                query = entry.get("query") or ""
+                if isinstance(query, dict):
+                    query = _query(query)
+                requests.append(LoadRequest(
+                    entry.get("method", "POST" if body is not None else "GET").upper(),
+                    entry["path"],
+                    query,
+                    None if body is None else body.encode() if isinstance(body, str) else _json(body)
+                ))
+                continue
+            match = _LOG_REQUEST.search(line)
+            if match is None or match["method"] not in ("GET", "HEAD"):
+                skipped += 1
+                continue
+            url = urlsplit(match["url"])
+            requests.append(LoadRequest(match["method"], url.path, url.query))
+    return requests, skipped
+
+
+# Transports
+
+def _endpoint(request: LoadRequest) -> str:
+    return f"{request.method} {request.path}"
+
+
+class ASGIClient:
+    """Minimal in-process HTTP client that calls an ASGI app directly"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def send(self, request: LoadRequest) -> int:
+        return await asgi_request(self.app, request.method, request.path, request.query, request.body)
+
+    async def close(self):
+        pass
+
+
+class HTTPClient:
+    """Client for a running server, over real sockets"""
+
+    def __init__(self, base_url: str, concurrency: int):
+        try:
+            import httpx
+        except ImportError:
+            raise SystemExit("--url needs httpx (pip install httpx)")
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(max_connections=concurrency),
+            timeout=60
+        )
+
+    async def send(self, request: LoadRequest) -> int:
+        response = await self.client.request(
+            request.method,
+            request.path + ("?" + request.query if request.query else ""),
+            content=request.body,
+            headers={"content-type": "application/json"} if request.body is not None else None
+        )
+        return response.status_code
+
+    async def close(self):
+        await self.client.aclose()
+
+
+# Runner
+
+async def run_load(client, requests: List[LoadRequest], concurrency: int,
+                   duration: Optional[float]) -> Tuple[List[Outcome], float]:
+    """
+    Closed-loop load: `concurrency` workers each send their next request as
+    soon as the previous one completes. Runs through `requests` once, or
+    cycles through them for `duration` seconds
+    """
+    outcomes = []
+    position = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    def next_request() -> Optional[LoadRequest]:
+        nonlocal position
+        if deadline is None:
+            if position >= len(requests):
+                return None
+        elif time.perf_counter() >= deadline:
+            return None
+        request = requests[position % len(requests)]
+        position += 1
+        return request
+
+    async def worker():
+        while (request := next_request()) is not None:
+            start = time.perf_counter()
+            try:
+                status = await client.send(request)
+            except Exception:
+                status = 0
+            outcomes.append(Outcome(_endpoint(request), status, time.perf_counter() - start))
+            # In-process requests that never suspend would otherwise run back to
+            # back in one worker; yield as a socket read would
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return outcomes, time.perf_counter() - started
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(outcomes: List[Outcome], elapsed: float) -> Dict[str, dict]:
+    grouped = defaultdict(list)
+    for outcome in outcomes:
+        grouped[outcome.endpoint].append(outcome)
+    grouped["TOTAL"] = outcomes
+
+    report = {}
+    for endpoint, group in grouped.items():
+        latencies = sorted(outcome.latency for outcome in group)
+        report[endpoint] = {
+            "requests": len(group),
+            "errors": sum(1 for outcome in group if not 200 <= outcome.status < 400),
+            "throughput": len(group) / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 0.50) * 1000,
+            "p95_ms": _percentile(latencies, 0.95) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+        }
+    return report
+
+
+def print_report(report: Dict[str, dict], elapsed: float, concurrency: int) -> None:
+    width = max(len(endpoint) for endpoint in report)
+    print(f"{elapsed:.2f}s at concurrency {concurrency}")
+    print(f"{'endpoint':<{width}}  {'requests':>8}  {'errors':>6}  {'req/s':>9}  "
+          f"{'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'max ms':>8}")
+    for endpoint in sorted(report, key=lambda name: (name == "TOTAL", name)):
+        row = report[endpoint]
+        print(f"{endpoint:<{width}}  {row['requests']:>8}  {row['errors']:>6}  {row['throughput']:>9.1f}  "
+              f"{row['p50_ms']:>8.2f}  {row['p95_ms']:>8.2f}  {row['p99_ms']:>8.2f}  {row['max_ms']:>8.2f}")
+
+
+async def _main(args) -> int:
+    if args.replay:
+        requests, skipped = load_replay(args.replay)
+        if skipped:
+            print(f"Skipped {skipped} log lines that can't be replayed (no body, or not a request)", file=sys.stderr)
+        if not requests:
+            print("No replayable requests in the traffic file", file=sys.stderr)
+            return 2
+    else:
+        requests = mix_requests(args.requests, args.seed)
+
+    if args.url:
+        client = HTTPClient(args.url, args.concurrency)
+        lifespan = None
+    else:
+        from app.main import app
+        client = ASGIClient(app)
+        lifespan = app.router.lifespan_context(app)
+
+    try:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        if args.warmup:
+            await run_load(client, requests[:args.warmup], args.concurrency, None)
+        outcomes, elapsed = await run_load(client, requests, args.concurrency, args.duration)
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        await client.close()
+
+    report = summarize(outcomes, elapsed)
+    print_report(report, elapsed, args.concurrency)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"elapsed": elapsed, "concurrency": args.concurrency, "endpoints": report},
+                      handle, indent=2, sort_keys=True)
+            handle.write("\n")
+    return 1 if report["TOTAL"]["errors"] and args.fail_on_error else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description="Calculators API load generator")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("-n", "--requests", type=int, default=5000, help="Requests in the built-in mix")
+    parser.add_argument("--duration", type=float, help="Cycle through the requests for this many seconds")
+    parser.add_argument("--replay", help="Replay a traffic file (JSON lines or nginx access log)")
+    parser.add_argument("--url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--warmup", type=int, default=200, help="Requests sent before measuring")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the built-in mix")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--fail-on-error", action="store_true", help="Exit non-zero if any request fails")
+    args = parser.parse_args(argv)
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import math
+
+import pytest
+
+from app.models.analysis import GoalSeekInput, SensitivityGridInput
+from app.models.life_goal import RetirementInput
+from app.services.analysis_service import GoalSeekCalculator, SensitivityGridCalculator
+from app.services.life_goal_service import RetirementCalculator
+
+RETIREMENT = {"present_age": 30, "retirement_age": 60, "monthly_expenses": 50000, "expected_returns": 12}
+
+
+def test_grid_cells_with_invalid_inputs_are_null(client):
+    # Bounds hold in every cell; retirement <= present age holds in some
+    response = client.post("/api/analysis/sensitivity-grid", json={
+        "calculator": "retirement",
+        "inputs": RETIREMENT,
+        "x": {"field": "present_age", "start": 40, "stop": 60, "step": 10},
+        "y": {"field": "retirement_age", "start": 45, "stop": 65, "step": 10},
+        "outputs": ["monthly_sip"]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    sip = body["results"]["monthly_sip"]
+    assert body["x_values"] == [40, 50, 60] and body["y_values"] == [45, 55, 65]
+    assert sip[0][1] is None and sip[0][2] is None and sip[1][2] is None
+    assert [(error["x"], error["y"]) for error in body["errors"]] == [(50, 45), (60, 45), (60, 55)]
+    assert all(error["error"] for error in body["errors"])
+
+    for row, retirement_age in enumerate(body["y_values"]):
+        for column, present_age in enumerate(body["x_values"]):
+            if retirement_age > present_age:
+                single = RetirementCalculator.calculate(RetirementInput(
+                    **{**RETIREMENT, "present_age": present_age, "retirement_age": retirement_age}))
+                assert sip[row][column] == pytest.approx(single.monthly_sip)
+
+
+def test_valid_grid_has_no_errors():
+    grid = SensitivityGridCalculator.calculate(SensitivityGridInput(
+        calculator="retirement", inputs=RETIREMENT,
+        x={"field": "expected_returns", "start": 8, "stop": 14, "step": 2},
+        y={"field": "retirement_age", "start": 50, "stop": 60, "step": 5}))
+    assert grid.errors == []
+    assert all(math.isfinite(value) for rows in grid.results.values() for row in rows for value in row)
+
+
+def test_grid_rejects_out_of_bounds_axis():
+    with pytest.raises(ValueError):
+        SensitivityGridCalculator.calculate(SensitivityGridInput(
+            calculator="retirement", inputs=RETIREMENT,
+            x={"field": "present_age", "start": 10, "stop": 40, "step": 10},
+            y={"field": "retirement_age", "start": 50, "stop": 60, "step": 5}))
+
+
+def test_goal_seek_counts_scan_and_refinement_together():
+    solved = GoalSeekCalculator.calculate(GoalSeekInput(
+        calculator="sip-growth", inputs={"monthly_investment": 10000, "period_years": 15},
+        field="expected_returns", output="future_value", target=6000000))
+    assert solved.method == "brent" and solved.converged
+    assert solved.residual == pytest.approx(0, abs=1e-3)
+    assert solved.function_calls > solved.scan_points
+    assert 1 < solved.iterations <= solved.function_calls
+
+    years = GoalSeekCalculator.calculate(GoalSeekInput(
+        calculator="sip-growth", inputs={"monthly_investment": 10000, "expected_returns": 12},
+        field="period_years", output="future_value", target=6000000))
+    assert years.method == "scan"
+    assert (years.iterations, years.function_calls) == (1, years.scan_points)
+
+
+@pytest.mark.parametrize("axis", [
+    {"field": "expected_returns", "start": 1, "stop": 30, "step": 1e-9},
+    {"field": "expected_returns", "start": 1, "stop": 30, "step": 1e-300},
+    {"field": "expected_returns", "start": "-inf", "stop": "inf", "step": 1},
+])
+def test_oversized_grid_is_rejected_before_building_it(client, axis):
+    response = client.post("/api/analysis/sensitivity-grid", json={
+        "calculator": "sip-growth",
+        "inputs": {"monthly_investment": 10000, "period_years": 15, "expected_returns": 12},
+        "x": axis,
+        "y": {"field": "period_years", "start": 1, "stop": 50, "step": 1}
+    })
+    assert response.status_code == 400
@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.cases import SERVICE_INPUTS
+from app.models.quick_tools import PortfolioProjectionInput
+from app.services.quick_tools_service import PortfolioProjectionCalculator
+
+RETIREMENT = {"present_age": 30, "retirement_age": 60, "monthly_expenses": 50000, "expected_returns": 12}
+
+
+def test_batch_error_names_the_failing_item(client):
+    items = [RETIREMENT, RETIREMENT, {**RETIREMENT, "present_age": 60}, {**RETIREMENT, "present_age": 65}]
+    response = client.post("/api/life-goal/retirement/batch", json=items)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Item 2: Retirement age must be greater than present age"
+
+
+def test_batch_validation_error_locates_the_item(client):
+    response = client.post("/api/life-goal/retirement/batch", json=[RETIREMENT, {**RETIREMENT, "present_age": 5}])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1, "present_age"]
+
+
+def _assert_same(batched, single):
+    for name, value in single.model_dump().items():
+        if isinstance(value, float):
+            assert getattr(batched, name) == pytest.approx(value, rel=1e-9), name
+        else:
+            assert batched.model_dump()[name] == value, name
+
+
+@pytest.mark.parametrize("name", list(SERVICE_INPUTS))
+def test_batch_matches_single_calls(name):
+    calculator, typical, worst = SERVICE_INPUTS[name]
+    items = [typical, worst, typical]
+    batched = calculator.calculate_batch(items)
+    assert len(batched) == len(items)
+    for item, output in zip(items, batched):
+        _assert_same(output, calculator.calculate(item))
+
+
+def test_portfolio_batch_matches_single_calls():
+    items = [
+        PortfolioProjectionInput(years=10, rebalance="yearly", assets=[
+            {"investment_amount": 100000, "expected_return": 12}, {"investment_amount": 50000, "expected_return": 7}
+        ]),
+        PortfolioProjectionInput(years=3, assets=[{"investment_amount": 20000, "expected_return": 9}]),
+    ]
+    batched = PortfolioProjectionCalculator.calculate_batch(items)
+    for item, output in zip(items, batched):
+        assert output == PortfolioProjectionCalculator.calculate(item)
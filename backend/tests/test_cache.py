@@ -0,0 +1,41 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import CACHE_MAX_LIST_ENTRIES
+from app.models.life_goal import HouseholdPlanInput
+from app.models.quick_tools import IrregularCashFlowInput, PortfolioProjectionInput
+from app.services.cache import calculation_cache
+from app.services.life_goal_service import HouseholdPlanner
+from app.services.quick_tools_service import IrregularCashFlowCalculator, PortfolioProjectionCalculator
+
+
+def test_cached_outputs_cannot_be_mutated():
+    portfolio = PortfolioProjectionInput(years=5, rebalance="yearly", assets=[
+        {"investment_amount": 100000, "expected_return": 12}, {"investment_amount": 50000, "expected_return": 7}
+    ])
+    plan = HouseholdPlanInput(monthly_budget=20000, goals=[
+        {"calculator": "education", "inputs": {"years_remaining": 15, "cost_today": 2500000, "expected_returns": 12}}
+    ])
+    projection = PortfolioProjectionCalculator.calculate(portfolio)
+    with pytest.raises(ValidationError):
+        projection.future_value = 0
+    with pytest.raises(AttributeError):
+        projection.assets.append(None)
+    with pytest.raises(ValidationError):
+        projection.years[0].value = 0
+    assert PortfolioProjectionCalculator.calculate(portfolio) is projection
+
+    allocation = HouseholdPlanner.calculate(plan)
+    with pytest.raises(ValidationError):
+        allocation.goals[0].allocated_sip = 0
+    assert HouseholdPlanner.calculate(plan) is allocation
+
+
+def test_large_list_inputs_bypass_the_cache():
+    flows = [{"amount": 100, "years": 1 + index % 50} for index in range(CACHE_MAX_LIST_ENTRIES + 1)]
+    data = IrregularCashFlowInput(calculate_type="present_value", discount_rate=8, cash_flows=flows)
+    before = calculation_cache.stats()["local"]
+    IrregularCashFlowCalculator.calculate(data)
+    IrregularCashFlowCalculator.calculate(data)
+    after = calculation_cache.stats()["local"]
+    assert (after["hits"], after["misses"]) == (before["hits"], before["misses"])
@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+
+from app.models.quick_tools import IrregularCashFlowInput
+from app.services.cash_flows import CashFlowReader
+from app.services.kernels import irregular_cash_flow
+from app.services.quick_tools_service import IrregularCashFlowCalculator
+
+UPLOAD = "/api/quick-tools/irregular-cash-flow/upload?calculate_type=present_value&discount_rate=8"
+
+
+def _read(format: str, body: str, chunk: int = 7):
+    reader = CashFlowReader(format, date(2026, 1, 1), 10)
+    for start in range(0, len(body), chunk):
+        reader.feed(body[start:start + chunk])
+    return reader.close()
+
+
+def test_past_flows_are_compounded_to_the_valuation_date():
+    data = IrregularCashFlowInput(calculate_type="future_value", discount_rate=10, valuation_date="2026-01-01",
+                                  cash_flows=[{"amount": 100, "payment_date": "2024-01-01"},
+                                              {"amount": 100, "payment_date": "2025-01-01"}])
+    expected = 100 * 1.1 ** (731 / 365) + 100 * 1.1
+    assert IrregularCashFlowCalculator.calculate(data).total_value == pytest.approx(expected)
+    assert IrregularCashFlowCalculator.calculate_batch([data])[0].total_value == pytest.approx(expected)
+    # The NumPy path for long ledgers agrees
+    many = irregular_cash_flow("future_value", [100.0] * 64, [-1.0] * 64, 10)
+    assert many.total_value == pytest.approx(6400 * 1.1)
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 1000])
+def test_csv_quoted_fields_may_span_lines(chunk):
+    body = 'amount,years,note\n100,1,"two\nlines"\n200,2,"say ""hi"""\r\n300,3,x\n'
+    flows = _read("csv", body, chunk)
+    assert list(flows.amounts) == [100, 200, 300]
+    assert list(flows.times) == [1, 2, 3]
+
+
+def test_csv_ending_inside_quotes_is_rejected():
+    with pytest.raises(ValueError, match="quoted field"):
+        _read("csv", 'amount,years\n100,"1\n')
+
+
+def test_upload_values_csv(client):
+    response = client.post(UPLOAD, content="amount,years\n100000,1\n100000,3\n",
+                           headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["total_value"] == pytest.approx(100000 / 1.08 + 100000 / 1.08 ** 3)
+
+
+@pytest.mark.parametrize("media_type, body, message", [
+    ("text/csv", "amount,years\n100000,1\nabc,2\n", "Cash flow 2: amount must be a number"),
+    ("text/csv", "amount,years\n100000,99\n", "Cash flow 1: years must be a whole number"),
+    ("text/csv", "amount,years,months\n100000,1,12\n", "Cash flow 1: give exactly one of"),
+    ("text/csv", "amount,years\n", "Upload contains no cash flows"),
+    ("application/x-ndjson", '{"amount": 1, "payment_date": "2024-13-01"}\n', "Cash flow 1: payment_date"),
+    ("application/json", '[{"amount": 1, "years": 1}', "closing ]"),
+])
+def test_upload_errors_are_400(client, media_type, body, message):
+    response = client.post(UPLOAD, content=body, headers={"Content-Type": media_type})
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+
+def test_upload_rejects_unknown_media_type(client):
+    response = client.post(UPLOAD, content="amount,years\n1,1\n", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
@@ -0,0 +1,110 @@
+import math
+
+import pytest
+
+from app.services.financial_utils import (
+    future_value_sip,
+    calculate_sip_needed,
+    total_sip_invested,
+    calculate_swp_duration
+)
+
+
+def _loop_future_value_sip(monthly_investment, annual_rate, years, growth_rate):
+    monthly_rate = annual_rate / 12 / 100
+    months = years * 12
+    fv = 0
+    current_sip = monthly_investment
+    for month in range(1, months + 1):
+        if month > 1 and (month - 1) % 12 == 0:
+            current_sip = current_sip * (1 + growth_rate / 100)
+        fv += current_sip * math.pow(1 + monthly_rate, months - month + 1)
+    return fv
+
+
+def _loop_total_sip_invested(monthly_sip, years, growth_rate):
+    total = 0
+    current_sip = monthly_sip
+    for year in range(years):
+        if year > 0:
+            current_sip = current_sip * (1 + growth_rate / 100)
+        total += current_sip * 12
+    return total
+
+
+def _loop_sip_needed(target_amount, annual_rate, years, growth_rate):
+    low, high = 0, target_amount / (years * 12)
+    for _ in range(100):
+        mid = (low + high) / 2
+        fv = _loop_future_value_sip(mid, annual_rate, years, growth_rate)
+        if abs(fv - target_amount) < 1:
+            return mid
+        if fv < target_amount:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def _loop_swp_duration(initial_amount, monthly_withdrawal, annual_return, yearly_increase, increase_enabled):
+    monthly_return = annual_return / 12 / 100
+    balance = initial_amount
+    months = 0
+    current_withdrawal = monthly_withdrawal
+    while balance > 0 and months < 600:
+        balance = balance * (1 + monthly_return)
+        balance -= current_withdrawal
+        months += 1
+        if increase_enabled and months % 12 == 0:
+            current_withdrawal = current_withdrawal * (1 + yearly_increase / 100)
+        if balance < 0:
+            balance = 0
+            break
+    return months, max(0, balance)
+
+
+STEP_UP_CASES = [
+    (10000, 12, 15, 10),
+    (5000, 8, 1, 5),
+    (10000, 30, 50, 20),
+    (25000, 0.5, 30, 15),
+    (10000, 12, 20, 12),
+]
+
+
+@pytest.mark.parametrize("monthly_investment, annual_rate, years, growth_rate", STEP_UP_CASES)
+def test_step_up_sip_matches_loop(monthly_investment, annual_rate, years, growth_rate):
+    assert future_value_sip(monthly_investment, annual_rate, years, growth_rate) == pytest.approx(
+        _loop_future_value_sip(monthly_investment, annual_rate, years, growth_rate), rel=1e-9)
+    assert total_sip_invested(monthly_investment, years, growth_rate) == pytest.approx(
+        _loop_total_sip_invested(monthly_investment, years, growth_rate), rel=1e-9)
+
+
+@pytest.mark.parametrize("target_amount, annual_rate, years, growth_rate", [
+    (10000000, 12, 15, 10),
+    (500000, 8, 1, 5),
+    (1000000000, 30, 50, 20),
+    (25000000, 6, 25, 12),
+])
+def test_sip_need_matches_bisection(target_amount, annual_rate, years, growth_rate):
+    needed = calculate_sip_needed(target_amount, annual_rate, years, growth_rate)
+    # The bisection stopped within INR 1 of the target; the solver is exact
+    assert needed == pytest.approx(_loop_sip_needed(target_amount, annual_rate, years, growth_rate), rel=1e-6)
+    assert _loop_future_value_sip(needed, annual_rate, years, growth_rate) == pytest.approx(target_amount, abs=1e-3)
+
+
+@pytest.mark.parametrize("initial_amount, monthly_withdrawal, annual_return, yearly_increase, increase_enabled", [
+    (5000000, 40000, 8, 0, False),
+    (5000000, 40000, 8, 10, True),
+    (1000000, 5000, 12, 0, False),
+    (100000000, 10000, 15, 1, True),
+    (100000, 200000, 8, 5, True),
+    (3000000, 25000, 0, 5, True),
+])
+def test_swp_duration_matches_loop(initial_amount, monthly_withdrawal, annual_return, yearly_increase, increase_enabled):
+    months, balance = calculate_swp_duration(initial_amount, monthly_withdrawal, annual_return, yearly_increase,
+                                             increase_enabled)
+    expected_months, expected_balance = _loop_swp_duration(initial_amount, monthly_withdrawal, annual_return,
+                                                           yearly_increase, increase_enabled)
+    assert months == expected_months
+    assert balance == pytest.approx(expected_balance, rel=1e-9, abs=1e-6)
@@ -0,0 +1,66 @@
+import pytest
+
+from app.services import executor
+
+SIP_GROWTH = {"monthly_investment": 10000, "period_years": 15, "expected_returns": 12}
+
+
+def test_get_sets_etag_and_answers_304(client):
+    response = client.get("/api/financial/sip-growth", params=SIP_GROWTH)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert response.json() == client.post("/api/financial/sip-growth", json=SIP_GROWTH).json()
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        repeat = client.get("/api/financial/sip-growth", params=SIP_GROWTH, headers={"If-None-Match": header})
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+        assert repeat.headers["etag"] == etag
+
+    changed = client.get("/api/financial/sip-growth", params={**SIP_GROWTH, "period_years": 16},
+                         headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_costly_get_is_offloaded(client, monkeypatch):
+    monkeypatch.setattr(executor, "OFFLOAD_COST_THRESHOLD", 0)
+    monkeypatch.setattr(executor, "EXECUTOR_MODE", "thread")
+    offloaded = executor.CALCULATIONS._values.get(("offloaded",), 0)
+    response = client.get("/api/financial/sip-growth", params={**SIP_GROWTH, "period_years": 17})
+    assert response.status_code == 200
+    assert executor.CALCULATIONS._values.get(("offloaded",), 0) == offloaded + 1
+
+
+def test_get_rejects_invalid_query(client):
+    assert client.get("/api/financial/sip-growth", params={**SIP_GROWTH, "period_years": 0}).status_code == 422
+
+
+def test_xirr_converges_to_known_rate(client):
+    # 100000 in, 121000 back two years later: 10% a year
+    response = client.post("/api/quick-tools/xirr", json={"cash_flows": [
+        {"amount": -100000, "payment_date": "2021-01-01"},
+        {"amount": 121000, "payment_date": "2023-01-01"},
+    ]})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["converged"]
+    assert result["xirr"] == pytest.approx(10, abs=1e-6)
+    assert abs(result["residual"]) < 1e-6
+
+
+def test_xirr_of_monthly_sip_converges(client):
+    flows = [{"amount": -10000, "payment_date": f"{2015 + month // 12}-{month % 12 + 1:02d}-01"} for month in range(120)]
+    flows.append({"amount": 2300000, "payment_date": "2025-01-01"})
+    result = client.post("/api/quick-tools/xirr", json={"cash_flows": flows, "guess": 50}).json()
+    assert result["converged"]
+    assert 12 < result["xirr"] < 14
+
+
+def test_xirr_without_a_return_is_400(client):
+    response = client.post("/api/quick-tools/xirr", json={"cash_flows": [
+        {"amount": -100000, "payment_date": "2020-01-01"},
+        {"amount": -1000, "payment_date": "2022-01-01"},
+    ]})
+    assert response.status_code == 400
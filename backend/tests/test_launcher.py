@@ -0,0 +1,34 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from app.config import OFFLOAD_COST_THRESHOLD
+from app.main import app
+from app.models.financial import SIPGrowthInput
+from app.services import executor
+from app.services.executor import run_calculation
+from app.services.financial_service import SIPGrowthCalculator
+from app.warmup import warmup
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_offloaded_calculation_runs_in_worker_forked_after_warmup():
+    # Like python -m app: warm up (goal seek is offloaded, starting the pool), then fork
+    report = asyncio.run(warmup(app))
+    assert report["warmup_failures"] == 0
+    assert executor._executor is not None
+
+    data = SIPGrowthInput(monthly_investment=10000, period_years=15, expected_returns=12)
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            signal.alarm(10)
+            result = asyncio.run(run_calculation(SIPGrowthCalculator.calculate, data, cost=OFFLOAD_COST_THRESHOLD))
+            code = 0 if result.future_value > 0 else 1
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+import pytest
+
+from app.main import app
+from app.metrics import REQUESTS, Collected, Counter, Histogram, Registry
+from app.warmup import warmup
+
+
+def test_warmup_traffic_is_not_counted(client):
+    asyncio.run(warmup(app))
+    assert REQUESTS.snapshot() == {}
+    client.get("/api/quick-tools/single-amount", params={"calculate_type": "future_value", "amount": 1000, "years": 1})
+    assert REQUESTS.snapshot() == {("/api/quick-tools/single-amount", "GET", "200"): 1}
+
+
+def test_collected_counters_count_from_reset():
+    hits = {("local",): 5}
+    registry = Registry()
+    metric = registry.register(Collected("hits_total", "Hits", "counter", ("tier",), lambda: dict(hits)))
+    registry.reset()
+    hits[("local",)] = 7
+    assert metric.snapshot() == {("local",): 2}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_workers_are_rendered_as_one(tmp_path):
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ("route",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    registry.register(Collected("open", "Open sessions", "gauge", (), lambda: {(): 4}))
+    registry.share_across_workers(str(tmp_path))
+
+    # A worker that handled traffic and has since exited
+    pid = os.fork()
+    if pid == 0:
+        requests.inc("/a", amount=2)
+        latency.observe(0.5)
+        registry.publish()
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    requests.inc("/a")
+    requests.inc("/b")
+    latency.observe(0.05)
+    lines = registry.render().splitlines()
+    assert 'requests_total{route="/a"} 3' in lines
+    assert 'requests_total{route="/b"} 1' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+    # Gauges are per live worker
+    assert [line for line in lines if line.startswith("open")] == [f'open{{worker="{os.getpid()}"}} 4']
@@ -0,0 +1,30 @@
+from app.models.financial import SIPGrowthInput
+from app.routers.routing import ValidatedJSONRequest
+
+SIP_GROWTH = {"monthly_investment": 10000, "period_years": 15, "expected_returns": 12}
+
+
+def test_body_is_validated_once_from_raw_json(client, monkeypatch):
+    # Fails if FastAPI stops reading bodies through Request.json()
+    bodies = []
+    json = ValidatedJSONRequest.json
+
+    async def recorded(self):
+        bodies.append(await json(self))
+        return bodies[-1]
+
+    monkeypatch.setattr(ValidatedJSONRequest, "json", recorded)
+    response = client.post("/api/financial/sip-growth", json=SIP_GROWTH)
+    assert response.status_code == 200
+    assert bodies == [SIPGrowthInput(**SIP_GROWTH)]
+    assert isinstance(bodies[0], SIPGrowthInput)
+
+
+def test_invalid_body_falls_back_to_framework_errors(client):
+    response = client.post("/api/financial/sip-growth", json={**SIP_GROWTH, "period_years": 0})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "period_years"]
+
+    response = client.post("/api/financial/sip-growth", content=b"{not json", headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "json_invalid"
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from app.services.sessions import CalculatorSession
+
+RETIREMENT = {"present_age": 30, "retirement_age": 60, "monthly_expenses": 50000, "expected_returns": 12}
+
+
+def test_session_flow(client):
+    with client.websocket_connect("/api/sessions/retirement") as ws:
+        assert ws.receive_json() == {"calculator": "retirement", "parts": ["result", "schedule", "simulation"]}
+
+        ws.send_json({"seq": 1, "inputs": {"present_age": 30}})
+        message = ws.receive_json()
+        assert message["seq"] == 1
+        assert [error["loc"] for error in message["errors"]] == [["retirement_age"], ["monthly_expenses"], ["expected_returns"]]
+
+        ws.send_json({"seq": 2, "inputs": RETIREMENT, "parts": ["result", "schedule"]})
+        message = ws.receive_json()
+        assert message["seq"] == 2
+        assert set(message["results"]) == {"result", "schedule"}
+        assert len(message["results"]["schedule"]) == 55
+        sip = message["results"]["result"]["monthly_sip"]
+
+        ws.send_json({"seq": 3, "inputs": {"expected_returns": 10}})
+        message = ws.receive_json()
+        assert message["seq"] == 3
+        assert message["results"]["result"]["monthly_sip"] > sip
+
+        # Only the simulation depends on its settings
+        ws.send_json({"seq": 4, "parts": ["result", "simulation"], "simulation": {"paths": 100, "seed": 1}})
+        assert set(ws.receive_json()["results"]) == {"simulation"}
+        ws.send_json({"seq": 5, "simulation": {"return_volatility": 20}})
+        assert set(ws.receive_json()["results"]) == {"simulation"}
+
+        ws.send_json({"seq": 6, "inputs": {"bogus": 1}})
+        assert ws.receive_json() == {"error": "Unknown inputs fields: bogus"}
+
+        ws.send_json({"seq": 7, "inputs": {"present_age": 70}})
+        assert ws.receive_json() == {"seq": 7, "error": "Retirement age must be greater than present age"}
+
+
+def test_session_accepts_binary_frames(client):
+    with client.websocket_connect("/api/sessions/sip-need") as ws:
+        ws.receive_json()
+        ws.send_bytes(b"\xff")
+        assert "error" in ws.receive_json()
+        ws.send_bytes(json.dumps({"seq": 1, "inputs": {"target_amount": 1e7, "period_years": 15, "expected_returns": 12}}).encode())
+        message = ws.receive_json()
+        assert message["seq"] == 1
+        assert message["results"]["result"]["monthly_sip"] > 0
+
+
+def test_unknown_calculator_is_refused(client):
+    try:
+        with client.websocket_connect("/api/sessions/nope") as ws:
+            ws.receive_json()
+    except Exception as e:
+        assert getattr(e, "code", None) == 1008
+    else:
+        raise AssertionError("session was accepted")
+
+
+def test_unchanged_goal_name_is_not_recomputed():
+    session = CalculatorSession("other-goal")
+    session.apply({"inputs": {"years_remaining": 10, "cost_today": 5e6, "expected_returns": 12}})
+    assert asyncio.run(session.recompute())["results"]
+    session.sent()
+    session.apply({"inputs": {"goal_name": "House"}})
+    assert asyncio.run(session.recompute()) is None
+
+
+def test_dropped_push_is_sent_again():
+    session = CalculatorSession("sip-need")
+    session.apply({"inputs": {"target_amount": 1e7, "period_years": 15, "expected_returns": 12}})
+    first = asyncio.run(session.recompute())
+    # Newer input arrived before the push; it turns out to be the same state
+    session.dropped()
+    session.apply({"inputs": {"expected_returns": 12}})
+    assert asyncio.run(session.recompute())["results"] == first["results"]
+    session.sent()
+    assert asyncio.run(session.recompute()) is None
@@ -139,11 +139,12 @@ if [ "$HAS_BACKEND" = true ]; then
 
     # Start FastAPI backend with PM2
     echo "Starting FastAPI backend on port $BACKEND_PORT..."
-    pm2 start "$APP_DIR/backend/venv/bin/uvicorn" \
+    # python -m app preloads and warms the app, then forks the workers
+    pm2 start "$APP_DIR/backend/venv/bin/python" \
         --name "$BACKEND_NAME" \
         --cwd "$APP_DIR/backend" \
         --interpreter none \
-        -- app.main:app --host 0.0.0.0 --port $BACKEND_PORT
+        -- -m app --host 0.0.0.0 --port $BACKEND_PORT --workers ${WEB_WORKERS:-4}
 
     pm2 save
 
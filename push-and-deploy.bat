@@ -33,7 +33,7 @@ echo [2/2] Updating VPS...
 echo Connecting to 82.25.105.18...
 echo.
 
-ssh root@82.25.105.18 "cd /var/www/vsfintech/Investment-Calculator && git pull origin main && cd frontend && rm -rf .next && npm run build && cd .. && pm2 stop investment-calculator-backend investment-calculator-frontend || true && pm2 delete investment-calculator-backend investment-calculator-frontend || true && cd backend && pm2 start 'venv/bin/uvicorn app.main:app --host 0.0.0.0 --port 5003' --name investment-calculator-backend && cd ../frontend && pm2 start npm --name investment-calculator-frontend -- start && pm2 save && sleep 2 && pm2 list"
+ssh root@82.25.105.18 "cd /var/www/vsfintech/Investment-Calculator && git pull origin main && cd frontend && rm -rf .next && npm run build && cd .. && pm2 stop investment-calculator-backend investment-calculator-frontend || true && pm2 delete investment-calculator-backend investment-calculator-frontend || true && cd backend && pm2 start 'venv/bin/python -m app --host 0.0.0.0 --port 5003 --workers 4' --name investment-calculator-backend && cd ../frontend && pm2 start npm --name investment-calculator-frontend -- start && pm2 save && sleep 2 && pm2 list"
 
 if errorlevel 1 (
     echo.
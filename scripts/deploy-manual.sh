@@ -25,11 +25,12 @@ source venv/bin/activate
 pip install -r requirements.txt
 
 # Kill old backend process if running
-pkill -f "uvicorn app.main:app"
+pkill -f "uvicorn app.main:app" || true
+pkill -f "python -m app" || true
 
-# Start backend in background
+# Start backend in background (warmed, preforked workers)
 echo "→ Starting Backend on port 8000..."
-nohup uvicorn app.main:app --host 0.0.0.0 --port 8000 > /var/log/backend.log 2>&1 &
+nohup python -m app --host 0.0.0.0 --port 8000 --workers ${WEB_WORKERS:-4} > /var/log/backend.log 2>&1 &
 
 # Setup Frontend
 echo "→ Setting up Frontend..."
@@ -67,9 +67,9 @@ pm2 delete investment-calculator-backend investment-calculator-frontend 2>/dev/n
 echo -e "${GREEN}✓ Old processes stopped${NC}"
 
 # Start backend with PM2
-echo -e "${YELLOW}→ Starting backend (uvicorn)...${NC}"
+echo -e "${YELLOW}→ Starting backend (preforked workers, warmed before serving)...${NC}"
 cd "$APP_DIR/backend"
-pm2 start "venv/bin/uvicorn app.main:app --host 0.0.0.0 --port 5003" --name investment-calculator-backend
+pm2 start "venv/bin/python -m app --host 0.0.0.0 --port 5003 --workers ${WEB_WORKERS:-4}" --name investment-calculator-backend
 echo -e "${GREEN}✓ Backend started${NC}"
 
 # Start frontend with PM2
@@ -89,7 +89,7 @@ sleep 3
 # Show running processes
 echo ""
 echo -e "${GREEN}✓ Services status:${NC}"
-ps aux | grep -E "uvicorn app.main:app|next start" | grep -v grep
+ps aux | grep -E "python -m app|next start" | grep -v grep
 
 echo ""
 echo -e "${GREEN}========================================="